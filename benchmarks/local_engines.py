@@ -0,0 +1,126 @@
+import argparse
+import difflib
+import json
+import logging
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+SENTENCES = [
+    "Start Game",
+    "Options",
+    "Continue",
+    "Save and Exit",
+    "Press any key to continue",
+    "Your inventory is full.",
+    "The bridge to the northern village has collapsed after the storm.",
+    "Bring ten wolf pelts to the blacksmith and he will forge you a new sword.",
+    "Are you sure you want to overwrite the existing save file?",
+    "Quest completed! You received 500 gold and a mysterious key that opens the old tower door.",
+]
+
+
+def max_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Linux 上 ru_maxrss 单位为 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_engine(engine: str, model: str, model_dir: Optional[str], repeat: int,
+               num_beams: Optional[int], max_new_tokens: Optional[int]) -> Dict:
+    from screen_translator.translator.local_translator import LocalTranslator
+
+    start = time.perf_counter()
+    translator = LocalTranslator(model, num_beams=num_beams, max_new_tokens=max_new_tokens,
+                                 engine=engine, model_dir=model_dir)
+    load_time = time.perf_counter() - start
+
+    outputs = translator.translate_batch(SENTENCES)
+
+    latencies = []
+    for _ in range(repeat):
+        for sentence in SENTENCES:
+            start = time.perf_counter()
+            translator.translate(sentence)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        translator.translate_batch(SENTENCES)
+    batch_time = time.perf_counter() - start
+
+    return {
+        'engine': engine,
+        'load_time_s': round(load_time, 3),
+        'sentence_p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'sentence_p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'sentence_mean_ms': round(statistics.mean(latencies) * 1000, 2),
+        'batch_sentences_per_s': round(len(SENTENCES) * repeat / batch_time, 2),
+        'max_rss_mb': max_rss_mb(),
+        'outputs': outputs,
+    }
+
+
+def compare_quality(reference: List[str], outputs: List[str]) -> Dict[str, float]:
+    exact = sum(1 for a, b in zip(reference, outputs) if a == b)
+    similarity = [difflib.SequenceMatcher(None, a or '', b or '').ratio() for a, b in zip(reference, outputs)]
+    return {
+        'exact_match': round(exact / len(reference), 3),
+        'char_similarity': round(statistics.mean(similarity), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare LocalTranslator inference engines")
+    parser.add_argument("--model", default="Helsinki-NLP/opus-mt-en-zh")
+    parser.add_argument("--model-dir", default=None, help="local PyTorch model directory")
+    parser.add_argument("--onnx-dir", default=None, help="local exported ONNX model directory")
+    parser.add_argument("--engines", nargs="+", default=["torch", "torch-int8", "onnx"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--num-beams", type=int, default=None)
+    parser.add_argument("--max-new-tokens", type=int, default=None)
+    parser.add_argument("--output", default=None, help="write JSON report to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    results = []
+    for engine in args.engines:
+        model_dir = args.onnx_dir if engine == 'onnx' else args.model_dir
+        if engine == 'onnx' and not model_dir:
+            log.info("Skipping onnx engine: --onnx-dir not given")
+            continue
+
+        # 每个引擎在独立进程中运行，内存峰值互不影响
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            result = executor.submit(
+                run_engine, engine, args.model, model_dir, args.repeat, args.num_beams, args.max_new_tokens
+            ).result()
+        results.append(result)
+
+    if results:
+        reference = results[0]['outputs']
+        for result in results:
+            result['quality_vs_' + results[0]['engine']] = compare_quality(reference, result['outputs'])
+
+    report = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from benchmarks.local_engines import max_rss_mb, percentile
+
+log = logging.getLogger(__name__)
+
+WORDS = ["Start", "Game", "Options", "Continue", "Inventory", "Quest", "Save", "Exit", "Village", "Sword"]
+
+DEFAULT_RESOLUTIONS = ["1280x720", "1920x1080"]
+DEFAULT_DENSITIES = [5, 50, 200]
+
+
+def render_screenshot(width: int, height: int, line_count: int, font_scale: float = 0.6,
+                      seed: int = 0) -> Tuple[np.ndarray, List[Dict]]:
+    # 按网格排布已知文字，返回截图和每行文字的真实位置
+    rng = np.random.default_rng(seed)
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+
+    line_height = int(32 * font_scale) + 8
+    rows = max(1, (height - 20) // line_height)
+    columns = max(1, -(-line_count // rows))
+    column_width = width // columns
+
+    lines = []
+    for idx in range(line_count):
+        words = rng.choice(WORDS, size=int(rng.integers(1, 4)))
+        text = " ".join(words)
+        x = 10 + (idx // rows) * column_width
+        y = 10 + (idx % rows) * line_height + line_height - 8
+        (w, h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 1)
+        w = min(w, column_width - 20)
+        cv2.putText(image, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 0, 0), 1)
+        top = y - h - 2
+        lines.append({
+            'text': text,
+            'poly': np.array([[x, top], [x + w, top], [x + w, y + baseline], [x, y + baseline]]),
+        })
+
+    return image, lines
+
+
+class KnownTextOCR:
+
+    def __init__(self):
+        # 未安装 PaddleOCR 时使用：直接返回渲染时记录的文字，只测量 OCREngine 的后处理
+        self.lines: List[Dict] = []
+
+    def predict(self, image):
+        return [{
+            'rec_texts': [line['text'] for line in self.lines],
+            'rec_polys': [line['poly'] for line in self.lines],
+            'rec_scores': [0.95] * len(self.lines),
+        }]
+
+
+def create_ocr_engine(kind: str):
+    from screen_translator.ocr_engine import OCREngine
+
+    engine = OCREngine(lang=['en'], load=False)
+    if kind == 'paddle':
+        engine.warm_up()
+        if engine.ocr is not None:
+            return engine, None
+        log.info("PaddleOCR unavailable, falling back to known-text OCR")
+
+    known = KnownTextOCR()
+    engine.ocr = known
+    return engine, known
+
+
+def mock_http_transport(latency: float):
+    import httpx
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        time.sleep(latency)
+        text = request.url.params.get('q', '')
+        return httpx.Response(200, json=[[[f"[mock]{text}", text, None, None]]])
+
+    return httpx.MockTransport(handler)
+
+
+def create_translators(http_latency: float, http_concurrency: int) -> Dict:
+    from screen_translator.translator.google_translator import GoogleTranslator
+    from screen_translator.translator.no_translator import NoTranslator
+    from screen_translator.translator.rate_limiter import AdaptiveRateLimiter
+    from screen_translator.translator.translator import create_default_translator
+
+    translators = {}
+    for name, backend in (
+        ('no', NoTranslator()),
+        ('http', GoogleTranslator(
+            max_concurrency=http_concurrency,
+            transport=mock_http_transport(http_latency),
+            rate_limiter=AdaptiveRateLimiter(rate=100000.0, burst=100000),
+        )),
+    ):
+        manager = create_default_translator()
+        # 关闭缓存，测量每帧实际的翻译开销
+        manager.set_cache_enabled(False)
+        manager.add_translator(backend)
+        translators[name] = manager
+    return translators
+
+
+def create_display(render_mode: str):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from screen_translator.overlay_display import DisplayManager
+
+    display_manager = DisplayManager()
+    display_manager.set_display_options(render_mode)
+    display_manager.initialize()
+    return display_manager
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'mean_ms': round(statistics.mean(values) * 1000, 3),
+    }
+
+
+def run_scenario(width: int, height: int, line_count: int, frames: int, engine, known: Optional[KnownTextOCR],
+                 translators: Dict, displays: Dict) -> Dict:
+    from screen_translator.screen_translator import filter_text_boxes
+
+    screenshots = [render_screenshot(width, height, line_count, seed=idx) for idx in range(frames)]
+
+    timings: Dict[str, List[float]] = {'ocr': [], 'filter': []}
+    for name in translators:
+        timings[f'translate:{name}'] = []
+    for name in displays:
+        timings[f'overlay:{name}'] = []
+    for image, lines in screenshots:
+        if known is not None:
+            known.lines = lines
+        start = time.perf_counter()
+        text_boxes = engine.recognize_text_with_filter(image, ['en'])
+        timings['ocr'].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        filtered = filter_text_boxes(text_boxes, 2, 'zh')
+        timings['filter'].append(time.perf_counter() - start)
+
+        translations = []
+        for name, manager in translators.items():
+            start = time.perf_counter()
+            results = manager.translate_batch(filtered.texts, 'zh', 'en')
+            timings[f'translate:{name}'].append(time.perf_counter() - start)
+            translations = [
+                (text, result or text, *rect)
+                for text, result, rect in zip(filtered.texts, results, filtered.rects.tolist())
+            ]
+
+        for name, display_manager in displays.items():
+            start = time.perf_counter()
+            display_manager.show_translations(translations)
+            display_manager.overlay_window.grab()
+            display_manager.process_events()
+            timings[f'overlay:{name}'].append(time.perf_counter() - start)
+
+    # 每帧只走一个翻译器和一种显示模式，按组合分别计算 fps
+    paths = {}
+    for translator_name in translators:
+        stages = ['ocr', 'filter', f'translate:{translator_name}']
+        for display_name in displays or [None]:
+            path = stages + ([f'overlay:{display_name}'] if display_name else [])
+            key = f"{translator_name}+{display_name}" if display_name else translator_name
+            total = sum(sum(timings[stage]) for stage in path)
+            paths[key] = round(frames / total, 2) if total > 0 else 0.0
+
+    for display_manager in displays.values():
+        display_manager.clear_display()
+
+    return {
+        'name': f"{width}x{height}_{line_count}lines",
+        'resolution': [width, height],
+        'lines': line_count,
+        'frames': frames,
+        'stages': {stage: summarize(values) for stage, values in timings.items() if values},
+        'fps': paths,
+    }
+
+
+def compare_with_baseline(report: Dict, baseline: Dict, tolerance: float, min_delta_ms: float = 1.0) -> List[Dict]:
+    # p95 延迟或 fps 相对基线变差超过容忍比例即视为回归，延迟还需超过绝对阈值以忽略计时抖动
+    baseline_scenarios = {scenario['name']: scenario for scenario in baseline.get('scenarios', [])}
+    regressions = []
+
+    for scenario in report['scenarios']:
+        previous = baseline_scenarios.get(scenario['name'])
+        if previous is None:
+            continue
+
+        for stage, stats in scenario['stages'].items():
+            old = previous['stages'].get(stage)
+            if (old and stats['p95_ms'] > old['p95_ms'] * (1 + tolerance)
+                    and stats['p95_ms'] - old['p95_ms'] > min_delta_ms):
+                regressions.append({
+                    'scenario': scenario['name'], 'metric': f'{stage}.p95_ms',
+                    'baseline': old['p95_ms'], 'current': stats['p95_ms'],
+                })
+
+        for path, fps in scenario['fps'].items():
+            old_fps = previous['fps'].get(path, 0) if isinstance(previous['fps'], dict) else 0
+            if old_fps > 0 and fps < old_fps * (1 - tolerance):
+                regressions.append({
+                    'scenario': scenario['name'], 'metric': f'fps:{path}',
+                    'baseline': old_fps, 'current': fps,
+                })
+
+    return regressions
+
+
+def parse_resolution(value: str) -> Tuple[int, int]:
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end OCR -> translate -> overlay benchmark")
+    parser.add_argument("--resolutions", nargs="+", default=DEFAULT_RESOLUTIONS)
+    parser.add_argument("--densities", nargs="+", type=int, default=DEFAULT_DENSITIES, help="text lines per frame")
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--ocr", choices=["paddle", "known"], default="paddle",
+                        help="paddle: real PaddleOCR (falls back to known if unavailable); known: ground-truth text")
+    parser.add_argument("--http-latency", type=float, default=0.02, help="mocked HTTP backend latency (s)")
+    parser.add_argument("--http-concurrency", type=int, default=5)
+    parser.add_argument("--render-modes", nargs="*", default=["labels", "painter"])
+    parser.add_argument("--baseline", default=None, help="baseline JSON report to compare against")
+    parser.add_argument("--save-baseline", default=None, help="write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore latency changes smaller than this")
+    parser.add_argument("--output", default=None, help="write JSON report to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    # 所有场景共用一个 OCR 引擎，只加载一次模型
+    engine, known = create_ocr_engine(args.ocr)
+    translators = create_translators(args.http_latency, args.http_concurrency)
+    displays = {mode: create_display(mode) for mode in args.render_modes}
+
+    scenarios = []
+    for resolution in args.resolutions:
+        width, height = parse_resolution(resolution)
+        for density in args.densities:
+            log.info(f"Running {width}x{height} with {density} lines")
+            scenarios.append(run_scenario(width, height, density, args.frames, engine, known, translators, displays))
+
+    report = {
+        'environment': {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'ocr': 'known' if known is not None else args.ocr,
+            'http_latency_s': args.http_latency,
+        },
+        'scenarios': scenarios,
+        'max_rss_mb': max_rss_mb(),
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_with_baseline(report, json.load(f), args.tolerance, args.min_delta_ms)
+        report['regressions'] = regressions
+        for regression in regressions:
+            log.info(f"Regression: {regression}")
+        exit_code = 1 if regressions else 0
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+    for display_manager in displays.values():
+        display_manager.quit()
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,36 +1,21 @@
 import logging
-import logging.config
 import signal
 import sys
 
-import yaml
+from screen_translator.startup_timing import startup_timer
 
-from screen_translator.config import get_config
-from screen_translator.screen_translator import ScreenTranslator
-from screen_translator.translator.baidu_translator import BaiduTranslator
-from screen_translator.translator.google_translator import GoogleTranslator
-from screen_translator.translator.local_translator import LocalTranslator
-from screen_translator.translator.no_translator import NoTranslator
+with startup_timer.measure("import", "screen_translator"):
+    from screen_translator.config import get_config
+    from screen_translator.frame_replay import ReplayCapture, SessionRecorder
+    from screen_translator.logging_setup import logging_init
+    from screen_translator.profiler import SignalTrigger
+    from screen_translator.screen_translator import ScreenTranslator
+    from screen_translator.translator.registry import create_translator
 
 
 log = logging.getLogger(__name__)
 
 
-def logging_init():
-    try:
-        with open("logging.yaml", "rt") as f:
-            config = yaml.safe_load(f.read())
-        logging.config.dictConfig(config)
-        log.info("Logging configuration restored after PaddleOCR initialization")
-    except Exception as e:
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(asctime)s [%(threadName)s] %(levelname)s %(name)s - [%(module)s,%(funcName)s,%(lineno)d] - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
-        log.info(f"Used basic logging config due to error: {e}")
-
-
 def setup_signal_handlers(translator):
     def signal_handler(signum, frame):
         log.info(f"\nReceived signal {signum}, stopping translator...")
@@ -40,6 +25,16 @@ def setup_signal_handlers(translator):
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
+    # Windows 没有 SIGUSR1，可改用热键或配置触发
+    if not hasattr(signal, 'SIGUSR1'):
+        return None
+
+    # 需要 Qt 事件循环唤醒，先创建 QApplication
+    translator.display_manager.initialize()
+    profile_trigger = SignalTrigger(signal.SIGUSR1, translator.start_profiling)
+    profile_trigger.start()
+    return profile_trigger
+
 
 def create_translator_with_config():
     config = get_config()
@@ -47,19 +42,50 @@ def create_translator_with_config():
     translator = ScreenTranslator(config.source_languages, config.target_language, config.capture_interval)
 
     translator.set_min_text_length(config.min_text_length)
+    translator.set_capture_backend(
+        config.capture_backend, config.capture_ring_slots, **config.capture_backend_options
+    )
+    if config.replay_source:
+        translator.set_frame_source(ReplayCapture(
+            config.replay_source, config.replay_pace, config.replay_loop, config.capture_interval
+        ))
+    if config.record_session:
+        translator.screen_capture.set_recorder(SessionRecorder(config.record_session))
+    translator.set_pipeline_queue_size(config.pipeline_queue_size)
+    translator.set_change_detection(config.change_detection_enabled, config.change_threshold)
+    translator.set_text_tracking(
+        config.text_tracking_enabled, config.tracking_iou_threshold, config.tracking_similarity_threshold
+    )
+    translator.set_metrics(
+        config.metrics_enabled, config.metrics_port, config.metrics_file, config.metrics_file_interval
+    )
+    translator.set_profiler(
+        config.profile_output_dir, config.profile_duration, config.profile_interval,
+        config.profile_on_start, config.profile_hotkey
+    )
+    translator.display_manager.set_display_options(
+        config.display_mode, config.display_duration, config.font_size, config.background_opacity
+    )
 
+    translator.ocr_engine.set_ocr_mode(config.ocr_mode, config.recognition_cache_size)
     translator.ocr_engine.set_confidence_threshold(config.min_confidence)
     translator.ocr_engine.set_min_text_size(config.min_text_size)
+    translator.ocr_engine.set_preprocess(
+        config.ocr_scale, config.ocr_auto_scale, config.ocr_grayscale, config.ocr_min_scaled_text_height
+    )
+    translator.ocr_engine.set_crop_region(config.capture_region)
+    translator.ocr_engine.set_incremental(config.incremental_ocr, config.ocr_tile_size, config.ocr_tile_margin)
 
     translator.translator.set_cache_enabled(config.translation_cache_enabled)
-    if config.translator.type == 'baidu' and config.translator.baidu:
-        translator.add_translator(BaiduTranslator(config.translator.baidu.baidu_app_id, config.translator.baidu.baidu_secret_key))
-    elif config.translator.type == 'google':
-        translator.add_translator(GoogleTranslator())
-    elif config.translator.type == 'local':
-        translator.add_translator(LocalTranslator())
-    else:
-        translator.add_translator(NoTranslator())
+    translator.translator.set_cache_limits(
+        config.translation_cache_max_entries,
+        config.translation_cache_max_bytes,
+        config.translation_cache_ttl,
+    )
+    if config.persistent_cache_enabled:
+        translator.translator.set_persistent_cache(config.persistent_cache_path)
+
+    translator.add_translator(create_translator(config))
     return translator
 
 
@@ -76,6 +102,7 @@ def print_usage():
 
     log.info("Controls:")
     log.info("  Ctrl+C                      - Stop translator")
+    log.info("  kill -USR1 <pid>            - Profile pipeline threads (see profile_* in config)")
 
     log.info("Config file: config.yaml")
     log.info("Supported languages: English(en), Japanese(ja), Korean(ko)")
@@ -84,10 +111,12 @@ def print_usage():
 def main():
     logging_init()
     print_usage()
+    profile_trigger = None
     try:
         translator = create_translator_with_config()
+        startup_timer.report()
 
-        setup_signal_handlers(translator)
+        profile_trigger = setup_signal_handlers(translator)
 
         log.info("Starting translator...")
         log.info("Tip: Make sure game or application window is visible")
@@ -103,6 +132,8 @@ def main():
     finally:
         if "translator" in locals():
             translator.exit()
+        if profile_trigger is not None:
+            profile_trigger.stop()
 
         log.info("Program exited")
 
@@ -0,0 +1,320 @@
+import glob
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from screen_translator.startup_timing import timed_import
+
+log = logging.getLogger(__name__)
+
+Region = Tuple[int, int, int, int]
+
+# 源通道顺序 -> 目标通道顺序 的转换方式，None 表示直接拷贝（可能只取前 3 个通道）
+CHANNEL_CONVERSIONS: Dict[Tuple[str, str], Optional[int]] = {
+    ('BGR', 'BGR'): None,
+    ('BGRA', 'BGR'): None,
+    ('RGB', 'BGR'): cv2.COLOR_RGB2BGR,
+    ('RGBA', 'BGR'): cv2.COLOR_RGBA2BGR,
+    ('RGB', 'RGB'): None,
+    ('RGBA', 'RGB'): None,
+    ('BGR', 'RGB'): cv2.COLOR_BGR2RGB,
+    ('BGRA', 'RGB'): cv2.COLOR_BGRA2RGB,
+}
+
+
+def write_frame(source: np.ndarray, source_order: str, target: np.ndarray, target_order: str = 'BGR'):
+    # 一次遍历把源数据写入预分配的缓冲区，不产生中间数组
+    code = CHANNEL_CONVERSIONS[(source_order, target_order)]
+    if code is None:
+        np.copyto(target, source[:, :, :target.shape[2]])
+    else:
+        cv2.cvtColor(source, code, dst=target)
+
+
+class FrameRingBuffer:
+
+    def __init__(self, slots: int = 4, channels: int = 3):
+        self.slots = max(2, slots)
+        self.channels = channels
+        self.shape: Optional[Tuple[int, int, int]] = None
+        self.buffers: List[np.ndarray] = []
+        # 槽位被取出后直到 release 之前都视为使用中，不会被下一次截图覆盖
+        self.busy: List[bool] = []
+        self.index = 0
+        self.allocated_bytes = 0
+        self.fallback_allocations = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, height: int, width: int) -> np.ndarray:
+        with self._lock:
+            shape = (height, width, self.channels)
+            if shape != self.shape:
+                # 分辨率变化时才重新分配；仍被引用的旧缓冲区不再回收，由持有者自然释放
+                self.shape = shape
+                self.buffers = [np.empty(shape, dtype=np.uint8) for _ in range(self.slots)]
+                self.busy = [False] * self.slots
+                self.allocated_bytes += sum(buffer.nbytes for buffer in self.buffers)
+                self.index = 0
+
+            for step in range(self.slots):
+                idx = (self.index + step) % self.slots
+                if not self.busy[idx]:
+                    self.busy[idx] = True
+                    self.index = (idx + 1) % self.slots
+                    return self.buffers[idx]
+
+            # 所有槽位都在使用中（OCR 比截图慢），临时分配一帧而不是覆盖正在识别的帧
+            self.fallback_allocations += 1
+            self.allocated_bytes += int(np.prod(shape))
+            return np.empty(shape, dtype=np.uint8)
+
+    def release(self, frame: np.ndarray):
+        with self._lock:
+            for idx, buffer in enumerate(self.buffers):
+                if buffer is frame:
+                    self.busy[idx] = False
+                    return
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'slots': self.slots,
+            'bytes': sum(buffer.nbytes for buffer in self.buffers),
+            'allocated_bytes': self.allocated_bytes,
+            'in_use': sum(self.busy),
+            'fallback_allocations': self.fallback_allocations,
+        }
+
+
+class CaptureBackend(ABC):
+
+    name = 'base'
+    # 后端原生输出的通道顺序，写入缓冲区时据此选择转换方式
+    native_order = 'BGR'
+
+    def __init__(self):
+        # 单次截图在缓冲区之外额外分配的字节数
+        self.last_allocated_bytes = 0
+
+    @abstractmethod
+    def screen_size(self) -> Tuple[int, int]:
+        pass
+
+    @abstractmethod
+    def grab(self, region: Optional[Region], ring: FrameRingBuffer, channel_order: str = 'BGR') -> Optional[np.ndarray]:
+        pass
+
+    def grab_pil(self, region: Optional[Region]):
+        from PIL import Image
+
+        frame = self.grab(region, FrameRingBuffer(slots=2), 'RGB')
+        return None if frame is None else Image.fromarray(frame)
+
+    def close(self):
+        pass
+
+
+class PyAutoGUIBackend(CaptureBackend):
+
+    name = 'pyautogui'
+    native_order = 'RGB'
+
+    def __init__(self):
+        super().__init__()
+        self.pyautogui = timed_import("pyautogui")
+        self.pyautogui.FAILSAFE = False
+
+    def screen_size(self) -> Tuple[int, int]:
+        width, height = self.pyautogui.size()
+        return width, height
+
+    def grab(self, region: Optional[Region], ring: FrameRingBuffer, channel_order: str = 'BGR') -> Optional[np.ndarray]:
+        screenshot = self.pyautogui.screenshot(region=region) if region else self.pyautogui.screenshot()
+
+        # PIL 图像 -> numpy 视图，转换通道时直接写入环形缓冲区
+        image = np.asarray(screenshot)
+        self.last_allocated_bytes = image.nbytes * 2
+        frame = ring.acquire(image.shape[0], image.shape[1])
+        write_frame(image, 'RGBA' if image.shape[2] == 4 else self.native_order, frame, channel_order)
+        return frame
+
+    def grab_pil(self, region: Optional[Region]):
+        return self.pyautogui.screenshot(region=region) if region else self.pyautogui.screenshot()
+
+
+class MSSBackend(CaptureBackend):
+
+    name = 'mss'
+    native_order = 'BGRA'
+
+    def __init__(self, monitor: int = 1):
+        super().__init__()
+        try:
+            self.mss = timed_import("mss")
+        except ImportError as e:
+            raise ImportError(
+                "The mss capture backend requires mss; install the 'capture' extra "
+                "(uv sync --extra capture / pip install 'screen-translate[capture]')"
+            ) from e
+        # mss 实例不能跨线程使用，每个线程各自创建
+        self._local = threading.local()
+        self.monitor_index = monitor
+
+        with self.mss.mss() as sct:
+            self.monitor = dict(sct.monitors[monitor])
+
+    def _sct(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            sct = self._local.sct = self.mss.mss()
+        return sct
+
+    def screen_size(self) -> Tuple[int, int]:
+        return self.monitor['width'], self.monitor['height']
+
+    def grab(self, region: Optional[Region], ring: FrameRingBuffer, channel_order: str = 'BGR') -> Optional[np.ndarray]:
+        if region:
+            x, y, w, h = region
+            area = {'left': self.monitor['left'] + x, 'top': self.monitor['top'] + y, 'width': w, 'height': h}
+        else:
+            area = self.monitor
+
+        shot = self._sct().grab(area)
+        # 原始 BGRA 数据零拷贝包装为数组，只取 BGR 三个通道写入缓冲区
+        image = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        self.last_allocated_bytes = image.nbytes
+        frame = ring.acquire(shot.height, shot.width)
+        write_frame(image, self.native_order, frame, channel_order)
+        return frame
+
+    def close(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is not None:
+            sct.close()
+            self._local.sct = None
+
+
+class SyntheticBackend(CaptureBackend):
+
+    name = 'synthetic'
+
+    def __init__(self, width: int = 1280, height: int = 720, lines: Optional[Sequence[str]] = None,
+                 font_scale: float = 1.0):
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.font_scale = font_scale
+        self.lines = list(lines) if lines is not None else ["Start Game", "Options", "Exit"]
+        self.frame_index = 0
+
+    def set_lines(self, lines: Sequence[str]):
+        self.lines = list(lines)
+
+    def screen_size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    def render(self, frame: np.ndarray):
+        frame.fill(255)
+        line_height = int(40 * self.font_scale)
+        for idx, line in enumerate(self.lines):
+            cv2.putText(frame, line, (20, (idx + 1) * line_height), cv2.FONT_HERSHEY_SIMPLEX,
+                        self.font_scale, (0, 0, 0), 2)
+
+    def grab(self, region: Optional[Region], ring: FrameRingBuffer, channel_order: str = 'BGR') -> Optional[np.ndarray]:
+        x, y, w, h = region if region else (0, 0, self.width, self.height)
+        frame = ring.acquire(h, w)
+        # 直接在缓冲区里绘制，不产生任何额外分配
+        if region:
+            full = np.empty((self.height, self.width, 3), dtype=np.uint8)
+            self.render(full)
+            np.copyto(frame, full[y:y + h, x:x + w])
+            self.last_allocated_bytes = full.nbytes
+        else:
+            self.render(frame)
+            self.last_allocated_bytes = 0
+        self.frame_index += 1
+        return frame
+
+
+class FileBackend(CaptureBackend):
+
+    name = 'file'
+
+    def __init__(self, path: str, loop: bool = True):
+        super().__init__()
+        if os.path.isdir(path):
+            self.paths = sorted(
+                p for p in glob.glob(os.path.join(path, '*'))
+                if os.path.splitext(p)[1].lower() in ('.png', '.jpg', '.jpeg', '.bmp')
+            )
+        else:
+            self.paths = [path]
+        if not self.paths:
+            raise ValueError(f"No images found in {path}")
+
+        self.loop = loop
+        self.index = 0
+        # 图片解码后缓存，重复播放时不再读盘
+        self._images: Dict[str, np.ndarray] = {}
+
+    def _load(self, path: str) -> np.ndarray:
+        image = self._images.get(path)
+        if image is None:
+            image = cv2.imread(path, cv2.IMREAD_COLOR)
+            if image is None:
+                raise ValueError(f"Failed to read image {path}")
+            self._images[path] = image
+        return image
+
+    def screen_size(self) -> Tuple[int, int]:
+        height, width = self._load(self.paths[0]).shape[:2]
+        return width, height
+
+    def grab(self, region: Optional[Region], ring: FrameRingBuffer, channel_order: str = 'BGR') -> Optional[np.ndarray]:
+        if self.index >= len(self.paths):
+            if not self.loop:
+                return None
+            self.index = 0
+
+        image = self._load(self.paths[self.index])
+        self.index += 1
+
+        if region:
+            x, y, w, h = region
+            image = image[y:y + h, x:x + w]
+
+        self.last_allocated_bytes = 0
+        frame = ring.acquire(image.shape[0], image.shape[1])
+        write_frame(image, self.native_order, frame, channel_order)
+        return frame
+
+
+CAPTURE_BACKENDS: Dict[str, Callable[..., CaptureBackend]] = {
+    'pyautogui': PyAutoGUIBackend,
+    'mss': MSSBackend,
+    'synthetic': SyntheticBackend,
+    'file': FileBackend,
+}
+
+
+def register_capture_backend(name: str, factory: Callable[..., CaptureBackend]):
+    CAPTURE_BACKENDS[name] = factory
+
+
+def create_capture_backend(name: str = 'auto', **options) -> CaptureBackend:
+    if name == 'auto':
+        # 优先使用更快的 mss，不可用时退回 pyautogui
+        try:
+            return MSSBackend(**options)
+        except Exception as e:
+            log.info(f"mss capture backend unavailable, falling back to pyautogui: {e}")
+            return PyAutoGUIBackend()
+
+    factory = CAPTURE_BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown capture backend: {name}")
+    return factory(**options)
@@ -6,22 +6,43 @@ from typing import Optional
 
 log = logging.getLogger(__name__)
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
+class RateLimitConfig(BaseModel):
+    rate: float = Field(10.0, description="最大请求速率（次/秒）")
+    burst: int = 1
+    min_rate: float = 0.2
+    backoff_factor: float = 0.5
+    recovery_step: float = 0.5
+
+
 class BaiduConfig(BaseModel):
     baidu_app_id: str
     baidu_secret_key: str
+    rate_limit: RateLimitConfig = RateLimitConfig(rate=1.0, burst=1)
+
+
+class GoogleConfig(BaseModel):
+    rate_limit: RateLimitConfig = RateLimitConfig(rate=10.0, burst=5)
 
 
 class LocalConfig(BaseModel):
-    model: str
+    model: str = "Helsinki-NLP/opus-mt-en-zh"
+    num_beams: Optional[int] = None
+    max_new_tokens: Optional[int] = None
+    num_threads: Optional[int] = None
+    max_batch_size: int = 16
+    max_batch_tokens: int = 2048
+    engine: str = Field("torch", description="推理引擎: torch, torch-int8, onnx")
+    model_dir: Optional[str] = None
 
 
 class TranslatorConfig(BaseModel):
     type: str = Field(..., description="翻译器类型: google, baidu, local")
     baidu: Optional[BaiduConfig] = None
+    google: Optional[GoogleConfig] = None
     local: Optional[LocalConfig] = None
 
 
@@ -32,19 +53,46 @@ class AppConfig(BaseModel):
     # 截图设置
     capture_interval: float = 2.0
     capture_region: Optional[List[int]] = None
+    capture_backend: str = Field("auto", description="截图后端: auto, mss, pyautogui, synthetic, file")
+    capture_backend_options: Dict[str, Any] = {}
+    capture_ring_slots: int = 4
+    replay_source: Optional[str] = None
+    replay_pace: str = Field("realtime", description="回放速度: realtime, fast")
+    replay_loop: bool = False
+    record_session: Optional[str] = None
+    change_detection_enabled: bool = True
+    change_threshold: float = 0.0005
 
     # OCR 设置
     ocr_language: str = "ch"
+    ocr_mode: str = Field("pipeline", description="OCR 模式: pipeline, split")
+    recognition_cache_size: int = 2048
     min_confidence: float = 0.5
     min_text_size: int = 10
     min_text_length: int = 2
+    incremental_ocr: bool = False
+    ocr_tile_size: int = 128
+    ocr_tile_margin: int = 32
+    ocr_scale: float = 1.0
+    ocr_auto_scale: bool = False
+    ocr_min_scaled_text_height: int = 16
+    ocr_grayscale: bool = False
 
     # 翻译设置
     source_languages: List[str] = ["en"]
     target_language: str = "ch"
     translation_cache_enabled: bool = True
+    translation_cache_max_entries: int = 10000
+    translation_cache_max_bytes: int = 0
+    translation_cache_ttl: float = 0.0
+    persistent_cache_enabled: bool = False
+    persistent_cache_path: str = "cache/translations.db"
+    text_tracking_enabled: bool = True
+    tracking_iou_threshold: float = 0.3
+    tracking_similarity_threshold: float = 0.6
 
     # 显示设置
+    display_mode: str = Field("labels", description="显示模式: labels, painter")
     show_original: bool = True
     display_duration: int = 5000
     font_size: int = 12
@@ -52,8 +100,20 @@ class AppConfig(BaseModel):
 
     # 性能设置
     max_concurrent_translations: int = 5
+    pipeline_queue_size: int = 1
     enable_gpu_acceleration: bool = False
 
+    # 监控设置
+    metrics_enabled: bool = True
+    metrics_port: Optional[int] = None
+    metrics_file: Optional[str] = None
+    metrics_file_interval: float = 10.0
+    profile_output_dir: str = "profiles"
+    profile_duration: float = 10.0
+    profile_interval: float = 0.005
+    profile_on_start: bool = False
+    profile_hotkey: Optional[str] = None
+
 
 def get_config():
     with open("config.yaml", "r", encoding="utf-8") as f:
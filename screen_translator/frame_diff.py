@@ -0,0 +1,155 @@
+import logging
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+
+class FrameChangeDetector:
+
+    def __init__(self, threshold: float = 0.0005, pixel_delta: int = 24, sample_width: int = 320):
+        # threshold: 下采样后变化像素所占比例超过该值才视为画面变化
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.sample_width = sample_width
+
+        self.previous_sample: Optional[np.ndarray] = None
+
+    def set_threshold(self, threshold: float):
+        self.threshold = threshold
+
+    def reset(self):
+        self.previous_sample = None
+
+    def _downsample(self, image: np.ndarray) -> np.ndarray:
+        if image.ndim == 3:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = image.copy()
+
+        height, width = gray.shape[:2]
+        if width > self.sample_width:
+            sample_height = max(1, round(height * self.sample_width / width))
+            gray = cv2.resize(gray, (self.sample_width, sample_height), interpolation=cv2.INTER_AREA)
+
+        return gray
+
+    def change_ratio(self, previous: np.ndarray, current: np.ndarray) -> float:
+        diff = cv2.absdiff(previous, current)
+        return np.count_nonzero(diff > self.pixel_delta) / diff.size
+
+    def has_changed(self, image: np.ndarray) -> bool:
+        sample = self._downsample(image)
+        previous = self.previous_sample
+        self.previous_sample = sample
+
+        if previous is None or previous.shape != sample.shape:
+            return True
+
+        return self.change_ratio(previous, sample) > self.threshold
+
+
+Rect = Tuple[int, int, int, int]
+
+
+def rects_intersect(a: Rect, b: Rect) -> bool:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+
+def rect_contains(rect: Rect, x: int, y: int) -> bool:
+    rx, ry, rw, rh = rect
+    return rx <= x < rx + rw and ry <= y < ry + rh
+
+
+def expand_rects(rects: List[Rect], margin: int, width: int, height: int) -> List[Rect]:
+    expanded = []
+    for x, y, w, h in rects:
+        x0 = max(0, x - margin)
+        y0 = max(0, y - margin)
+        x1 = min(width, x + w + margin)
+        y1 = min(height, y + h + margin)
+        expanded.append((x0, y0, x1 - x0, y1 - y0))
+
+    # 扩展后可能重叠，合并以免同一区域识别两次
+    merged = True
+    while merged:
+        merged = False
+        result: List[Rect] = []
+        for rect in expanded:
+            for i, other in enumerate(result):
+                if rects_intersect(rect, other):
+                    x0 = min(rect[0], other[0])
+                    y0 = min(rect[1], other[1])
+                    x1 = max(rect[0] + rect[2], other[0] + other[2])
+                    y1 = max(rect[1] + rect[3], other[1] + other[3])
+                    result[i] = (x0, y0, x1 - x0, y1 - y0)
+                    merged = True
+                    break
+            else:
+                result.append(rect)
+        expanded = result
+
+    return expanded
+
+
+class TileChangeDetector:
+
+    def __init__(self, tile_size: int = 128, pixel_delta: int = 24):
+        self.tile_size = tile_size
+        self.pixel_delta = pixel_delta
+
+        self.previous_gray: Optional[np.ndarray] = None
+
+    def set_tile_size(self, tile_size: int):
+        self.tile_size = tile_size
+        self.reset()
+
+    def reset(self):
+        self.previous_gray = None
+
+    def _changed_tiles(self, previous: np.ndarray, current: np.ndarray) -> np.ndarray:
+        mask = cv2.absdiff(previous, current) > self.pixel_delta
+
+        height, width = mask.shape
+        rows = -(-height // self.tile_size)
+        cols = -(-width // self.tile_size)
+        padded = np.zeros((rows * self.tile_size, cols * self.tile_size), dtype=bool)
+        padded[:height, :width] = mask
+
+        tiles = padded.reshape(rows, self.tile_size, cols, self.tile_size)
+        return tiles.any(axis=(1, 3))
+
+    def changed_regions(self, image: np.ndarray) -> Optional[List[Rect]]:
+        if image.ndim == 3:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = image.copy()
+
+        previous = self.previous_gray
+        self.previous_gray = gray
+
+        # 没有可比较的上一帧时返回 None，调用方需要整帧识别
+        if previous is None or previous.shape != gray.shape:
+            return None
+
+        tiles = self._changed_tiles(previous, gray)
+        if not tiles.any():
+            return []
+
+        height, width = gray.shape
+        count, _, stats, _ = cv2.connectedComponentsWithStats(tiles.astype(np.uint8), connectivity=8)
+
+        regions = []
+        for label in range(1, count):
+            col, row, cols, rows = stats[label][:4]
+            x = int(col) * self.tile_size
+            y = int(row) * self.tile_size
+            w = min(width, (int(col) + int(cols)) * self.tile_size) - x
+            h = min(height, (int(row) + int(rows)) * self.tile_size) - y
+            regions.append((x, y, w, h))
+
+        return regions
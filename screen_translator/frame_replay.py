@@ -0,0 +1,226 @@
+import bisect
+import glob
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from screen_translator.screen_capture import ContinuousCapture
+
+log = logging.getLogger(__name__)
+
+SESSION_FILE = "session.json"
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov', '.webm')
+
+
+class ImageSequenceSource:
+
+    def __init__(self, paths: List[str], timestamps: List[float]):
+        self.paths = paths
+        self.timestamps = timestamps
+
+    @classmethod
+    def from_directory(cls, path: str, frame_interval: float = 1.0) -> 'ImageSequenceSource':
+        paths = sorted(p for p in glob.glob(os.path.join(path, '*')) if p.lower().endswith(IMAGE_EXTENSIONS))
+        if not paths:
+            raise ValueError(f"No images found in {path}")
+        return cls(paths, [idx * frame_interval for idx in range(len(paths))])
+
+    @classmethod
+    def from_session(cls, path: str) -> 'ImageSequenceSource':
+        with open(os.path.join(path, SESSION_FILE), "r", encoding="utf-8") as f:
+            session = json.load(f)
+        frames = session['frames']
+        return cls([os.path.join(path, frame['file']) for frame in frames], [frame['t'] for frame in frames])
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    @property
+    def frame_count(self) -> Optional[int]:
+        return len(self.paths)
+
+    def index_at(self, elapsed: float) -> int:
+        return bisect.bisect_right(self.timestamps, elapsed) - 1
+
+    def read(self, index: int) -> Optional[np.ndarray]:
+        return cv2.imread(self.paths[index], cv2.IMREAD_COLOR)
+
+    def close(self):
+        pass
+
+
+class VideoSource:
+
+    def __init__(self, path: str):
+        self.path = path
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise ValueError(f"Failed to open video {path}")
+
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 30.0
+        # CAP_PROP_FRAME_COUNT 来自容器元数据，可能不准或为 0，读到结尾时才确定帧数
+        self.frame_count: Optional[int] = None
+        self.position = 0
+
+    def index_at(self, elapsed: float) -> int:
+        index = int(elapsed * self.fps)
+        return index if self.frame_count is None else min(index, self.frame_count - 1)
+
+    def read(self, index: int) -> Optional[np.ndarray]:
+        if index < self.position:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+            self.position = index
+
+        # 跳过的帧只 grab 不解码
+        while self.position < index:
+            if not self.capture.grab():
+                self.frame_count = self.position
+                return None
+            self.position += 1
+
+        ok, frame = self.capture.read()
+        if not ok:
+            self.frame_count = self.position
+            return None
+        self.position += 1
+        return frame
+
+    def close(self):
+        self.capture.release()
+
+
+def open_frame_source(path: str, frame_interval: float = 1.0):
+    if os.path.isdir(path):
+        if os.path.exists(os.path.join(path, SESSION_FILE)):
+            return ImageSequenceSource.from_session(path)
+        return ImageSequenceSource.from_directory(path, frame_interval)
+
+    if path.lower().endswith(IMAGE_EXTENSIONS):
+        return ImageSequenceSource([path], [0.0])
+
+    if path.lower().endswith(VIDEO_EXTENSIONS):
+        return VideoSource(path)
+
+    raise ValueError(f"Unsupported replay source: {path}")
+
+
+class ReplayCapture(ContinuousCapture):
+
+    PACES = ('realtime', 'fast')
+
+    def __init__(self, source, pace: str = 'fast', loop: bool = False, capture_interval: float = 1.0,
+                 change_threshold: float = 0.0005, frame_interval: float = 1.0):
+        super().__init__(capture_interval, change_threshold)
+        if pace not in self.PACES:
+            raise ValueError(f"Unsupported replay pace: {pace}")
+
+        self.source = open_frame_source(source, frame_interval) if isinstance(source, str) else source
+        # realtime: 按录制时间戳回放并按截图间隔取帧；fast: 每次调用返回下一帧，结果可复现
+        self.pace = pace
+        self.loop = loop
+
+        self.position = 0
+        self.start_time = 0.0
+        self.finished = False
+
+    def start_capture(self):
+        self.position = 0
+        self.start_time = time.time()
+        self.last_capture_time = 0
+        self.finished = False
+        self.change_detector.reset()
+        self.is_running = True
+
+    def _next_index(self) -> Optional[int]:
+        if self.pace == 'fast':
+            return self.position
+
+        if not self.should_capture():
+            return None
+
+        # 取已经到时间的最新一帧，中间来不及处理的帧直接丢弃
+        elapsed = time.time() - self.start_time
+        index = self.source.index_at(elapsed)
+        if index < self.position:
+            return self.position if self._at_end(self.position) else None
+        return index
+
+    def _at_end(self, index: int) -> bool:
+        # 视频帧数在读取失败时才确定，之前一直视为未结束
+        frame_count = self.source.frame_count
+        return frame_count is not None and index >= frame_count
+
+    def get_latest_screenshot(self) -> Optional[np.ndarray]:
+        if not self.is_running or self.finished:
+            return None
+
+        index = self._next_index()
+        if index is None:
+            return None
+
+        if self._at_end(index):
+            if not self.loop or not self.source.frame_count:
+                self.finished = True
+                return None
+            self.start_capture()
+            index = 0
+
+        self.position = index + 1
+        # 视频读取失败即到达结尾，下一次调用再结束或从头循环
+        screenshot = self.source.read(index)
+        if screenshot is None:
+            return None
+
+        self.captured_frames += 1
+
+        if self.change_detection_enabled and not self.change_detector.has_changed(screenshot):
+            self.skipped_frames += 1
+            return None
+
+        return screenshot
+
+    def get_stats(self) -> Optional[Dict]:
+        return {
+            'backend': 'replay',
+            'pace': self.pace,
+            'position': self.position,
+            'frames': self.source.frame_count,
+            'finished': self.finished,
+        }
+
+
+class SessionRecorder:
+
+    def __init__(self, path: str, image_format: str = '.png'):
+        self.path = path
+        self.image_format = image_format
+        self.frames: List[Dict] = []
+        self.start_time: Optional[float] = None
+
+        os.makedirs(path, exist_ok=True)
+
+    def record(self, frame: np.ndarray, timestamp: Optional[float] = None):
+        now = time.time() if timestamp is None else timestamp
+        if self.start_time is None:
+            self.start_time = now
+
+        name = f"{len(self.frames):06d}{self.image_format}"
+        try:
+            # 低压缩级别，减少录制对截图循环的影响
+            cv2.imwrite(os.path.join(self.path, name), frame, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+        except Exception as e:
+            log.info(f"Failed to record frame: {e}")
+            return
+
+        self.frames.append({'file': name, 't': round(now - self.start_time, 4)})
+
+    def close(self):
+        with open(os.path.join(self.path, SESSION_FILE), "w", encoding="utf-8") as f:
+            json.dump({'version': 1, 'frames': self.frames}, f, indent=1)
+        log.info(f"Recorded {len(self.frames)} frames to {self.path}")
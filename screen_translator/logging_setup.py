@@ -0,0 +1,21 @@
+import logging
+import logging.config
+
+import yaml
+
+log = logging.getLogger(__name__)
+
+
+def logging_init():
+    try:
+        with open("logging.yaml", "rt") as f:
+            config = yaml.safe_load(f.read())
+        logging.config.dictConfig(config)
+        log.info("Logging configuration restored after PaddleOCR initialization")
+    except Exception as e:
+        logging.basicConfig(
+            level=logging.INFO,
+            format="%(asctime)s [%(threadName)s] %(levelname)s %(name)s - [%(module)s,%(funcName)s,%(lineno)d] - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
+        log.info(f"Used basic logging config due to error: {e}")
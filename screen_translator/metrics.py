@@ -0,0 +1,313 @@
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# 延迟直方图的桶上界（秒），覆盖 0.5ms ~ 30s
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def make_labels(labels: Optional[Dict[str, str]]) -> Labels:
+    return tuple(sorted((labels or {}).items()))
+
+
+def format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in items) + '}'
+
+
+class Histogram:
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        # 只做一次二分查找和几次加法，单次开销在微秒级
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q: float) -> float:
+        # 按桶内线性插值估算分位数
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if total == 0:
+            return 0.0
+
+        rank = q * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if cumulative + count >= rank and count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def snapshot(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+        }
+
+
+class Counter:
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+
+class MetricsRegistry:
+
+    def __init__(self, prefix: str = 'screen_translator'):
+        self.prefix = prefix
+        self.enabled = True
+
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.counters: Dict[str, Dict[Labels, Counter]] = {}
+        # 导出时才读取的计数（队列丢帧、缓存命中等），采集路径上没有任何开销
+        self.callbacks: Dict[str, Dict[Labels, Callable[[], float]]] = {}
+        self.help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, labels: Optional[Dict[str, str]] = None, help_text: str = '') -> Histogram:
+        key = make_labels(labels)
+        series = self.histograms.get(name)
+        if series is not None:
+            histogram = series.get(key)
+            if histogram is not None:
+                return histogram
+
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            if help_text:
+                self.help.setdefault(name, help_text)
+            return series.setdefault(key, Histogram())
+
+    def counter(self, name: str, labels: Optional[Dict[str, str]] = None, help_text: str = '') -> Counter:
+        key = make_labels(labels)
+        series = self.counters.get(name)
+        if series is not None:
+            counter = series.get(key)
+            if counter is not None:
+                return counter
+
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            if help_text:
+                self.help.setdefault(name, help_text)
+            return series.setdefault(key, Counter())
+
+    def describe(self, name: str, help_text: str):
+        self.help[name] = help_text
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        if self.enabled:
+            self.histogram(name, labels).observe(value)
+
+    def inc(self, name: str, amount: int = 1, labels: Optional[Dict[str, str]] = None):
+        if self.enabled:
+            self.counter(name, labels).inc(amount)
+
+    @contextmanager
+    def time(self, name: str, labels: Optional[Dict[str, str]] = None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, labels)
+
+    def register_callback(self, name: str, callback: Callable[[], float], labels: Optional[Dict[str, str]] = None,
+                          help_text: str = ''):
+        with self._lock:
+            self.callbacks.setdefault(name, {})[make_labels(labels)] = callback
+            if help_text:
+                self.help.setdefault(name, help_text)
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.callbacks.clear()
+
+    def _callback_values(self) -> Dict[str, Dict[Labels, float]]:
+        values: Dict[str, Dict[Labels, float]] = {}
+        for name, series in list(self.callbacks.items()):
+            for labels, callback in list(series.items()):
+                try:
+                    values.setdefault(name, {})[labels] = float(callback())
+                except Exception as e:
+                    log.info(f"Metric callback {name} failed: {e}")
+        return values
+
+    def to_prometheus(self) -> str:
+        lines: List[str] = []
+
+        for name, series in list(self.histograms.items()):
+            full_name = f"{self.prefix}_{name}"
+            if name in self.help:
+                lines.append(f"# HELP {full_name} {self.help[name]}")
+            lines.append(f"# TYPE {full_name} histogram")
+            for labels, histogram in list(series.items()):
+                with histogram._lock:
+                    counts, total, value_sum = list(histogram.counts), histogram.count, histogram.sum
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, counts):
+                    cumulative += count
+                    lines.append(f"{full_name}_bucket{format_labels(labels, ('le', repr(bound)))} {cumulative}")
+                lines.append(f"{full_name}_bucket{format_labels(labels, ('le', '+Inf'))} {total}")
+                lines.append(f"{full_name}_sum{format_labels(labels)} {value_sum}")
+                lines.append(f"{full_name}_count{format_labels(labels)} {total}")
+
+        counters: Dict[str, Dict[Labels, float]] = {
+            name: {labels: counter.value for labels, counter in list(series.items())}
+            for name, series in list(self.counters.items())
+        }
+        for name, series in self._callback_values().items():
+            counters.setdefault(name, {}).update(series)
+
+        for name, series in counters.items():
+            full_name = f"{self.prefix}_{name}"
+            if name in self.help:
+                lines.append(f"# HELP {full_name} {self.help[name]}")
+            lines.append(f"# TYPE {full_name} {'counter' if name.endswith('_total') else 'gauge'}")
+            for labels, value in series.items():
+                lines.append(f"{full_name}{format_labels(labels)} {value:g}")
+
+        return '\n'.join(lines) + '\n'
+
+    def to_json(self) -> Dict:
+        def series_key(name: str, labels: Labels) -> str:
+            return name + format_labels(labels)
+
+        histograms = {
+            series_key(name, labels): histogram.snapshot()
+            for name, series in list(self.histograms.items())
+            for labels, histogram in list(series.items())
+        }
+        counters = {
+            series_key(name, labels): counter.value
+            for name, series in list(self.counters.items())
+            for labels, counter in list(series.items())
+        }
+        for name, series in self._callback_values().items():
+            for labels, value in series.items():
+                counters[series_key(name, labels)] = value
+
+        return {'timestamp': time.time(), 'histograms': histograms, 'counters': counters}
+
+
+class MetricsServer:
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = '127.0.0.1'):
+        self.registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.startswith('/metrics.json'):
+                    body = json.dumps(registry.to_json()).encode('utf-8')
+                    content_type = 'application/json'
+                elif self.path.startswith('/metrics'):
+                    body = registry.to_prometheus().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4'
+                else:
+                    self.send_error(404)
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        # 只监听本机地址
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def start(self):
+        self.thread.start()
+        log.info(f"Metrics endpoint: http://127.0.0.1:{self.port}/metrics (JSON: /metrics.json)")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class MetricsFileWriter:
+
+    def __init__(self, registry: MetricsRegistry, path: str, interval: float = 10.0):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='metrics-file', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def write(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # 先写临时文件再替换，读取方不会看到写了一半的内容
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            if self.path.endswith('.json'):
+                json.dump(self.registry.to_json(), f)
+            else:
+                f.write(self.registry.to_prometheus())
+        os.replace(tmp_path, self.path)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.write()
+            except Exception as e:
+                log.info(f"Failed to write metrics file {self.path}: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+        try:
+            self.write()
+        except Exception as e:
+            log.info(f"Failed to write metrics file {self.path}: {e}")
+
+
+metrics = MetricsRegistry()
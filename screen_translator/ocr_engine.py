@@ -1,145 +1,260 @@
 import logging
+import threading
+import time
 from typing import Dict, List, Optional, Tuple
 
 import cv2
 import numpy as np
-from paddleocr import PaddleOCR
 
-log = logging.getLogger(__name__)
-
-
-class TextBox:
-
-    def __init__(self, text: str, bbox: List[List[int]], confidence: float):
-        self.text = text
-        self.bbox = bbox
-        self.confidence = confidence
-
-        self.center_x, self.center_y = self._calculate_center()
-        self.width, self.height = self._calculate_size()
-
-    def _calculate_center(self) -> Tuple[int, int]:
-        x_coords = [point[0] for point in self.bbox]
-        y_coords = [point[1] for point in self.bbox]
-
-        center_x = int(sum(x_coords) / len(x_coords))
-        center_y = int(sum(y_coords) / len(y_coords))
+from screen_translator.frame_diff import TileChangeDetector, expand_rects
+from screen_translator.logging_setup import logging_init
+from screen_translator.ocr_preprocess import FrameTransform, OCRPreprocessor
+from screen_translator.script_detect import ScriptClassifier, normalize_language
+from screen_translator.split_ocr import SplitOCR
+from screen_translator.startup_timing import startup_timer, timed_import
+from screen_translator.text_boxes import TextBox, TextBoxArray
 
-        return center_x, center_y
-
-    def _calculate_size(self) -> Tuple[int, int]:
-        x_coords = [point[0] for point in self.bbox]
-        y_coords = [point[1] for point in self.bbox]
-
-        width = max(x_coords) - min(x_coords)
-        height = max(y_coords) - min(y_coords)
-
-        return width, height
-
-    def get_rect(self) -> Tuple[int, int, int, int]:
-        x_coords = [point[0] for point in self.bbox]
-        y_coords = [point[1] for point in self.bbox]
-
-        x = min(x_coords)
-        y = min(y_coords)
-        width = max(x_coords) - x
-        height = max(y_coords) - y
+log = logging.getLogger(__name__)
 
-        return x, y, width, height
 
-    def __str__(self):
-        return f"TextBox(text='{self.text}', center=({self.center_x}, {self.center_y}), confidence={self.confidence:.2f})"
+class OCREngine:
 
+    def __init__(self, lang=['en'], load: bool = True):
+        self.lang = lang
+        self.ocr = None
+        self._load_lock = threading.Lock()
+        # 加载失败后按指数退避重试，避免每帧都重新导入和构建模型
+        self.load_failures = 0
+        self.next_load_time = 0.0
+        self.load_retry_interval = 30.0
+        self.max_load_retry_interval = 600.0
+
+        # pipeline: PaddleOCR 整体流程；split: 检测与识别分开，识别结果按文本行截图哈希缓存
+        self.ocr_mode = 'pipeline'
+        self.recognition_cache_size = 2048
+
+        self.min_confidence = 0.5
+
+        self.min_text_size = 10
+
+        self.incremental = False
+        self.tile_detector = TileChangeDetector()
+        self.tile_margin = 32
+        self.full_frame_ratio = 0.5
+        self.previous_boxes = TextBoxArray.empty()
+
+        self.script_classifier = ScriptClassifier(lang)
+
+        self.preprocessor = OCRPreprocessor()
+        self._transform = FrameTransform()
+        self.last_timings: Dict[str, float] = {'preprocess': 0.0, 'ocr': 0.0}
+
+        if load:
+            self.load()
+
+    def load(self):
+        with self._load_lock:
+            if self.ocr is not None:
+                return
+
+            try:
+                paddleocr = timed_import("paddleocr")
+                with startup_timer.measure("init", f"PaddleOCR ({self.ocr_mode})"):
+                    if self.ocr_mode == 'split':
+                        self.ocr = SplitOCR(
+                            paddleocr.TextDetection(),
+                            paddleocr.TextRecognition(),
+                            cache_size=self.recognition_cache_size,
+                        )
+                    else:
+                        self.ocr = paddleocr.PaddleOCR()
+
+                logging_init()
+
+                self.load_failures = 0
+                log.info(f"OCR engine initialized successfully, language: {self.lang}")
+
+            except Exception as e:
+                self.ocr = None
+                self.load_failures += 1
+                delay = min(self.max_load_retry_interval, self.load_retry_interval * 2 ** (self.load_failures - 1))
+                self.next_load_time = time.monotonic() + delay
+                log.info(f"OCR engine initialization failed: {e}, retrying in {delay:.0f}s")
+
+    def warm_up(self):
+        self.load()
+        if self.ocr is None:
+            return
 
-class OCREngine:
+        # 首次 predict 需要构建计算图、分配内存，用合成图片提前触发
+        image = np.full((96, 480, 3), 255, dtype=np.uint8)
+        cv2.putText(image, "Warm up 123", (10, 64), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3)
 
-    def __init__(self, lang=['en']):
         try:
-            self.ocr = PaddleOCR()
-
-            from main import logging_init
-            logging_init()
+            with startup_timer.measure("warmup", "OCR"):
+                self.ocr.predict(image)
+        except Exception as e:
+            log.info(f"OCR warm-up failed: {e}")
 
-            self.min_confidence = 0.5
+    def set_ocr_mode(self, mode: str, recognition_cache_size: Optional[int] = None):
+        if mode not in ('pipeline', 'split'):
+            raise ValueError(f"Unsupported OCR mode: {mode}")
 
-            self.min_text_size = 10
+        if recognition_cache_size is not None:
+            self.recognition_cache_size = recognition_cache_size
 
-            log.info(f"OCR engine initialized successfully, language: {lang}")
+        if mode != self.ocr_mode:
+            self.ocr_mode = mode
+            if self.ocr is not None:
+                self.ocr = None
+                self.load()
 
-        except Exception as e:
-            log.info(f"OCR engine initialization failed: {e}")
-            self.ocr = None
+    def get_recognition_cache_stats(self) -> Optional[Dict[str, float]]:
+        if isinstance(self.ocr, SplitOCR):
+            return self.ocr.cache.get_stats()
+        return None
 
     def set_confidence_threshold(self, threshold: float):
         self.min_confidence = threshold
 
     def set_min_text_size(self, size: int):
         self.min_text_size = size
+        self.preprocessor.set_min_text_size(size)
+
+    def set_preprocess(self, scale: float = 1.0, auto_scale: bool = False, grayscale: bool = False,
+                       min_scaled_text_height: Optional[int] = None):
+        self.preprocessor.set_scale(scale, auto_scale, min_scaled_text_height)
+        self.preprocessor.set_grayscale(grayscale)
+
+    def set_crop_region(self, region: Optional[List[int]]):
+        self.preprocessor.set_crop_region(region)
+
+    def set_incremental(self, enabled: bool, tile_size: Optional[int] = None, margin: Optional[int] = None):
+        self.incremental = enabled
+        if tile_size is not None:
+            self.tile_detector.set_tile_size(tile_size)
+        if margin is not None:
+            self.tile_margin = margin
+        self.tile_detector.reset()
+        self.previous_boxes = TextBoxArray.empty()
+
+    def _run_ocr(self, image: np.ndarray, offset: Tuple[int, int] = (0, 0)) -> TextBoxArray:
+        results = self.ocr.predict(image)
+
+        texts, polys, scores = [], [], []
+        for result in results:
+            texts.extend(result["rec_texts"])
+            polys.extend(result["rec_polys"])
+            scores.extend(result["rec_scores"])
+
+        text_boxes = TextBoxArray.from_polys(texts, polys, scores)
+        text_boxes = text_boxes.filter(text_boxes.confidence_mask(self.min_confidence))
+        if not len(text_boxes):
+            return text_boxes
 
-    def recognize_text(self, image: np.ndarray) -> List[TextBox]:
+        # 整帧多边形一次性映射回屏幕坐标
+        text_boxes = TextBoxArray(text_boxes.texts, self._transform.to_screen_poly(text_boxes.polys, offset),
+                                  text_boxes.scores)
+        return text_boxes.filter(text_boxes.size_mask(self.min_text_size))
+
+    def _grow_regions(self, regions: List[Tuple[int, int, int, int]], width: int,
+                      height: int) -> List[Tuple[int, int, int, int]]:
+        # 变化区域扩大到完整包含与之相交的上一帧文本框，避免长文本只被重识别一部分
+        previous = self.previous_boxes
+        while True:
+            grown = []
+            for region in regions:
+                x0, y0, w, h = region
+                x1, y1 = x0 + w, y0 + h
+                touching = previous.filter(previous.intersects_mask(self._transform.to_screen_rect(region)))
+                for rect in touching.rects.tolist():
+                    bx, by, bw, bh = self._transform.to_processed_rect(rect)
+                    x0, y0 = min(x0, bx), min(y0, by)
+                    x1, y1 = max(x1, bx + bw), max(y1, by + bh)
+                grown.append((max(0, x0), max(0, y0), min(width, x1) - max(0, x0), min(height, y1) - max(0, y0)))
+
+            grown = expand_rects(grown, 0, width, height)
+            if sorted(grown) == sorted(regions):
+                return grown
+            regions = grown
+
+    def _recognize_incremental(self, image: np.ndarray) -> TextBoxArray:
+        height, width = image.shape[:2]
+        dirty_rects = self.tile_detector.changed_regions(image)
+
+        if dirty_rects is None:
+            text_boxes = self._run_ocr(image)
+        elif not dirty_rects:
+            text_boxes = self.previous_boxes
+        elif sum(w * h for _, _, w, h in dirty_rects) > width * height * self.full_frame_ratio:
+            text_boxes = self._run_ocr(image)
+        else:
+            # 未变化区域沿用上一帧结果，变化区域（加边距并包含相交的旧文本框）重新识别
+            regions = self._grow_regions(expand_rects(dirty_rects, self.tile_margin, width, height), width, height)
+            if sum(w * h for _, _, w, h in regions) > width * height * self.full_frame_ratio:
+                text_boxes = self._run_ocr(image)
+            else:
+                text_boxes = self._merge_regions(image, regions)
+
+        self.previous_boxes = text_boxes
+        return text_boxes
+
+    def _merge_regions(self, image: np.ndarray, regions: List[Tuple[int, int, int, int]]) -> TextBoxArray:
+        # 旧框和新框用同一规则（中心点落在重识别区域内）决定去留
+        previous = self.previous_boxes
+        screen_rects = [self._transform.to_screen_rect(region) for region in regions]
+        stale = np.zeros(len(previous), dtype=bool)
+        for rect in screen_rects:
+            stale |= previous.center_in_mask(rect)
+        parts = [previous.filter(~stale)]
+
+        for (x, y, w, h), screen_rect in zip(regions, screen_rects):
+            boxes = self._run_ocr(image[y:y + h, x:x + w], offset=(x, y))
+            parts.append(boxes.filter(boxes.center_in_mask(screen_rect)))
+
+        return TextBoxArray.concat(parts)
+
+    def recognize_text(self, image: np.ndarray) -> TextBoxArray:
+        if self.ocr is None and time.monotonic() >= self.next_load_time:
+            # 预热未完成或失败时按需加载，加载锁保证与后台预热不会重复加载
+            self.load()
         if self.ocr is None:
-            log.info("OCR engine not initialized")
-            return []
+            return TextBoxArray.empty()
 
         try:
-            results = self.ocr.predict(image)
-
-            text_boxes = []
-
-            for result in results:
-                for i in range(len(result["rec_texts"])):
-                    bbox = result["rec_polys"][i]
-                    text = result["rec_texts"][i]
-                    confidence = result["rec_scores"][i]
-
-                    if confidence >= self.min_confidence:
-                        text_box = TextBox(text, bbox, confidence)
-
-                        if text_box.width >= self.min_text_size and text_box.height >= self.min_text_size:
-                            text_boxes.append(text_box)
-
+            start_time = time.perf_counter()
+            image, self._transform = self.preprocessor.process(image)
+            ocr_start_time = time.perf_counter()
+
+            if self.incremental:
+                text_boxes = self._recognize_incremental(image)
+            else:
+                text_boxes = self._run_ocr(image)
+
+            self.last_timings = {
+                'preprocess': ocr_start_time - start_time,
+                'ocr': time.perf_counter() - ocr_start_time,
+            }
             return text_boxes
 
         except Exception as e:
             log.info(f"Text recognition failed: {e}")
-            return []
+            self.tile_detector.reset()
+            return TextBoxArray.empty()
 
     def recognize_text_with_filter(self, image: np.ndarray,
-                                 target_languages: Optional[List[str]] = None) -> List[TextBox]:
+                                 target_languages: Optional[List[str]] = None) -> TextBoxArray:
         text_boxes = self.recognize_text(image)
 
-        if not target_languages:
+        if not target_languages or not len(text_boxes):
             return text_boxes
 
-        filtered_boxes = []
+        if self.script_classifier.source_languages != [normalize_language(lang) for lang in target_languages]:
+            self.script_classifier = ScriptClassifier(target_languages)
 
-        for text_box in text_boxes:
-            text = text_box.text
-
-            if self._contains_target_language(text, target_languages):
-                filtered_boxes.append(text_box)
-
-        return filtered_boxes
-
-    def _contains_target_language(self, text: str, target_languages: List[str]) -> bool:
-        for lang in target_languages:
-            if lang == 'en':
-                if any(ord('a') <= ord(c.lower()) <= ord('z') for c in text):
-                    return True
-            elif lang == 'ja':
-                if any(0x3040 <= ord(c) <= 0x309F or
-                      0x30A0 <= ord(c) <= 0x30FF or
-                      0x4E00 <= ord(c) <= 0x9FAF
-                      for c in text):
-                    return True
-            elif lang == 'ko':
-                if any(0xAC00 <= ord(c) <= 0xD7AF for c in text):
-                    return True
-            elif lang == 'zh':
-                if any(0x4E00 <= ord(c) <= 0x9FAF for c in text):
-                    return True
-
-        return False
+        # 每个文本框按主要文字系统归类到源语言，只保留配置的源语言和需要自动检测的文本
+        text_boxes.set_languages(self.script_classifier.classify_all(text_boxes.texts))
+        return text_boxes.filter(text_boxes.language_mask(self.script_classifier.accepted_languages))
 
     def draw_text_boxes(self, image: np.ndarray, text_boxes: List[TextBox]) -> np.ndarray:
         result_image = image.copy()
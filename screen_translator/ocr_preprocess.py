@@ -0,0 +1,96 @@
+import logging
+from typing import Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+Rect = Tuple[int, int, int, int]
+
+
+class FrameTransform:
+
+    def __init__(self, scale: float = 1.0, offset: Tuple[int, int] = (0, 0)):
+        # 预处理后图像坐标 -> 屏幕坐标: screen = processed / scale + offset
+        self.scale = scale
+        self.offset = offset
+
+    def to_screen_poly(self, poly, local_offset: Tuple[int, int] = (0, 0)) -> np.ndarray:
+        points = np.asarray(poly, dtype=np.float32) + np.array(local_offset, dtype=np.float32)
+        if self.scale != 1.0:
+            points = points / self.scale
+        return np.rint(points + np.array(self.offset, dtype=np.float32)).astype(np.int32)
+
+    def to_screen_rect(self, rect: Rect) -> Rect:
+        x, y, w, h = rect
+        return (
+            int(x / self.scale) + self.offset[0],
+            int(y / self.scale) + self.offset[1],
+            int(np.ceil(w / self.scale)),
+            int(np.ceil(h / self.scale)),
+        )
+
+    def to_processed_rect(self, rect: Rect) -> Rect:
+        x, y, w, h = rect
+        x0 = int(np.floor((x - self.offset[0]) * self.scale))
+        y0 = int(np.floor((y - self.offset[1]) * self.scale))
+        x1 = int(np.ceil((x + w - self.offset[0]) * self.scale))
+        y1 = int(np.ceil((y + h - self.offset[1]) * self.scale))
+        return x0, y0, x1 - x0, y1 - y0
+
+
+class OCRPreprocessor:
+
+    def __init__(self):
+        self.scale = 1.0
+        self.auto_scale = False
+        self.min_text_size = 10
+        # 识别模型能稳定识别的最小文字高度（像素），自动缩放时保证最小文字缩放后不低于该值
+        self.min_scaled_text_height = 16
+        self.grayscale = False
+        self.crop_region: Optional[Rect] = None
+
+    def set_scale(self, scale: float, auto_scale: bool = False, min_scaled_text_height: Optional[int] = None):
+        self.scale = scale
+        self.auto_scale = auto_scale
+        if min_scaled_text_height is not None:
+            self.min_scaled_text_height = min_scaled_text_height
+
+    def set_min_text_size(self, size: int):
+        self.min_text_size = size
+
+    def set_grayscale(self, enabled: bool):
+        self.grayscale = enabled
+
+    def set_crop_region(self, region: Optional[Sequence[int]]):
+        self.crop_region = tuple(region) if region else None
+
+    def get_scale(self) -> float:
+        if self.auto_scale and self.min_text_size > 0:
+            return min(1.0, self.min_scaled_text_height / self.min_text_size)
+        if self.scale <= 0:
+            return 1.0
+        return min(1.0, self.scale)
+
+    def process(self, image: np.ndarray) -> Tuple[np.ndarray, FrameTransform]:
+        offset = (0, 0)
+
+        if self.crop_region:
+            height, width = image.shape[:2]
+            x, y, w, h = self.crop_region
+            x0, y0 = max(0, x), max(0, y)
+            x1, y1 = min(width, x + w), min(height, y + h)
+            if x1 > x0 and y1 > y0:
+                image = image[y0:y1, x0:x1]
+                offset = (x0, y0)
+
+        scale = self.get_scale()
+        if scale < 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        if self.grayscale and image.ndim == 3:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            image = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+        return image, FrameTransform(scale, offset)
@@ -1,16 +1,29 @@
 import logging
 import sys
-from typing import List, Tuple
+import time
+from typing import Dict, List, Optional, Tuple
 
 from PyQt6.QtCore import QRect, Qt, QTimer
-from PyQt6.QtGui import QFont
+from PyQt6.QtGui import QColor, QFont, QPainter, QRegion, QStaticText
 from PyQt6.QtWidgets import QApplication, QLabel, QWidget
 
 log = logging.getLogger(__name__)
 
 
+LABEL_STYLE = """
+    QLabel {
+        color: green;
+        border: none;
+        font-size: 12px;
+        font-weight: bold;
+    }
+"""
+
+
 class TranslationLabel(QLabel):
 
+    _font: Optional[QFont] = None
+
     def __init__(
         self,
         original_text: str,
@@ -22,56 +35,107 @@ class TranslationLabel(QLabel):
     ):
         super().__init__()
 
-        self.original_text = original_text
-        self.translated_text = translated_text
-        self.original_rect = QRect(x, y, width, height)
+        self.original_text = ""
+        self.translated_text = ""
+        self.original_rect = QRect()
 
-        self.setText(translated_text)
+        # 样式表由 OverlayWindow 统一设置，字体所有标签共用
+        self.setFont(self.shared_font())
 
-        self.setStyleSheet(
-            """
-            QLabel {
-                color: green;
-                border: none;
-                font-size: 12px;
-                font-weight: bold;
-            }
-        """
-        )
+        self.opacity = 1.0
+        self.fade_deadline = 0.0
 
-        font = QFont()
-        font.setPointSize(10)
-        font.setBold(True)
-        self.setFont(font)
+        self.update_translation(original_text, translated_text, x, y, width, height)
 
-        self.adjustSize()
+    @staticmethod
+    def shared_font() -> QFont:
+        if TranslationLabel._font is None:
+            font = QFont()
+            font.setPointSize(10)
+            font.setBold(True)
+            TranslationLabel._font = font
+        return TranslationLabel._font
 
-        self.move(x, y + height + 5)
+    def update_translation(
+        self,
+        original_text: str,
+        translated_text: str,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+    ):
+        if translated_text != self.translated_text:
+            self.translated_text = translated_text
+            self.setText(translated_text)
+            self.adjustSize()
 
-        self.setToolTip(f"Original: {original_text}")
+        if original_text != self.original_text:
+            self.original_text = original_text
+            self.setToolTip(f"Original: {original_text}")
 
-        self.fade_timer = QTimer()
-        self.fade_timer.timeout.connect(self.fade_out)
-        self.opacity = 1.0
+        rect = QRect(x, y, width, height)
+        if rect != self.original_rect:
+            self.original_rect = rect
+            self.move(x, y + height + 5)
 
     def start_fade_timer(self, delay_ms: int = 5000):
-        self.fade_timer.start(delay_ms)
+        # 不再为每个标签创建 QTimer，由 OverlayWindow 的共享定时器检查到期时间
+        self.fade_deadline = time.monotonic() + delay_ms / 1000
+        if self.opacity != 1.0:
+            self.opacity = 1.0
+            self.setWindowOpacity(self.opacity)
 
     def fade_out(self):
         self.opacity -= 0.1
         if self.opacity <= 0:
             self.hide()
-            self.fade_timer.stop()
         else:
             self.setWindowOpacity(self.opacity)
 
 
+class PaintedTranslation:
+
+    __slots__ = ('original_text', 'translated_text', 'static_text', 'rect', 'fade_deadline')
+
+    def __init__(self, original_text: str, translated_text: str, static_text: QStaticText, rect: QRect):
+        self.original_text = original_text
+        self.translated_text = translated_text
+        self.static_text = static_text
+        self.rect = rect
+        self.fade_deadline = 0.0
+
+
 class OverlayWindow(QWidget):
 
+    RENDER_MODES = ('labels', 'painter')
+
     def __init__(self):
         super().__init__()
 
+        # labels: 每条翻译一个 QLabel；painter: 在 paintEvent 中统一绘制所有翻译
+        self.render_mode = 'labels'
+
         self.translation_labels: List[TranslationLabel] = []
+        # 隐藏后的标签放回池中复用，避免每帧创建/销毁控件
+        self.label_pool: List[TranslationLabel] = []
+        self.max_pool_size = 200
+        self.display_duration = 5000
+
+        self.painted: Dict[Tuple[str, int, int, int, int], PaintedTranslation] = {}
+        self.static_text_cache: Dict[str, QStaticText] = {}
+        self.max_static_text_cache = 1024
+        self.text_padding = 3
+        self.paint_font = QFont()
+        self.background_color = QColor(0, 0, 0, 180)
+        self.text_color = QColor('green')
+        self.last_update_region = QRegion()
+        self.set_paint_style(12, 180)
+
+        self.fade_timer = QTimer(self)
+        self.fade_timer.setInterval(100)
+        self.fade_timer.timeout.connect(self._fade_tick)
+
         self.init_ui()
 
     def init_ui(self):
@@ -85,8 +149,118 @@ class OverlayWindow(QWidget):
 
         self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
 
+        self.setStyleSheet(LABEL_STYLE)
+
         self.showFullScreen()
 
+    def set_render_mode(self, mode: str):
+        if mode not in self.RENDER_MODES:
+            raise ValueError(f"Unsupported render mode: {mode}")
+        if mode != self.render_mode:
+            self.clear_translations()
+            self.render_mode = mode
+
+    def set_display_duration(self, duration_ms: int):
+        self.display_duration = duration_ms
+
+    def set_paint_style(self, font_size: int, background_opacity: int):
+        self.paint_font = QFont()
+        self.paint_font.setPixelSize(font_size)
+        self.paint_font.setBold(True)
+        self.background_color = QColor(0, 0, 0, max(0, min(255, background_opacity)))
+        # 字体变化后缓存的排版结果失效
+        self.static_text_cache.clear()
+        if self.painted:
+            self.update()
+
+    def _static_text(self, text: str) -> QStaticText:
+        static_text = self.static_text_cache.get(text)
+        if static_text is None:
+            if len(self.static_text_cache) >= self.max_static_text_cache:
+                self.static_text_cache.clear()
+            static_text = QStaticText(text)
+            static_text.setTextFormat(Qt.TextFormat.PlainText)
+            static_text.prepare(font=self.paint_font)
+            self.static_text_cache[text] = static_text
+        return static_text
+
+    def _make_painted(
+        self,
+        original_text: str,
+        translated_text: str,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+    ) -> PaintedTranslation:
+        static_text = self._static_text(translated_text)
+        size = static_text.size()
+        rect = QRect(
+            x,
+            y + height + 5,
+            int(size.width() + 0.999) + self.text_padding * 2,
+            int(size.height() + 0.999) + self.text_padding * 2,
+        )
+        return PaintedTranslation(original_text, translated_text, static_text, rect)
+
+    def _repaint(self, region: QRegion):
+        self.last_update_region = region
+        if not region.isEmpty():
+            self.update(region)
+
+    def _update_painted(
+        self, translations: List[Tuple[str, str, int, int, int, int]]
+    ):
+        fade_deadline = time.monotonic() + self.display_duration / 1000
+        painted: Dict[Tuple[str, int, int, int, int], PaintedTranslation] = {}
+        dirty = QRegion()
+
+        for original, translated, x, y, w, h in translations:
+            key = (original, x, y, w, h)
+            item = painted.get(key) or self.painted.get(key)
+            if item is None or item.translated_text != translated:
+                if item is not None:
+                    dirty = dirty.united(item.rect)
+                item = self._make_painted(original, translated, x, y, w, h)
+                dirty = dirty.united(item.rect)
+            item.fade_deadline = fade_deadline
+            painted[key] = item
+
+        # 本次不再显示的翻译需要擦除
+        for key, item in self.painted.items():
+            if key not in painted:
+                dirty = dirty.united(item.rect)
+
+        self.painted = painted
+        self._repaint(dirty)
+
+        if painted and not self.fade_timer.isActive():
+            self.fade_timer.start()
+
+    def _acquire_label(
+        self,
+        original_text: str,
+        translated_text: str,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+    ) -> TranslationLabel:
+        if self.label_pool:
+            label = self.label_pool.pop()
+            label.update_translation(original_text, translated_text, x, y, width, height)
+        else:
+            label = TranslationLabel(original_text, translated_text, x, y, width, height)
+            label.setParent(self)
+        return label
+
+    def _release_label(self, label: TranslationLabel):
+        label.hide()
+        if len(self.label_pool) < self.max_pool_size:
+            self.label_pool.append(label)
+        else:
+            label.deleteLater()
+
     def add_translation(
         self,
         original_text: str,
@@ -96,32 +270,142 @@ class OverlayWindow(QWidget):
         width: int,
         height: int,
     ):
-        label = TranslationLabel(original_text, translated_text, x, y, width, height)
-        label.setParent(self)
+        label = self._acquire_label(original_text, translated_text, x, y, width, height)
         label.show()
 
-        label.start_fade_timer(5000)
+        label.start_fade_timer(self.display_duration)
 
         self.translation_labels.append(label)
 
+        if not self.fade_timer.isActive():
+            self.fade_timer.start()
+
     def clear_translations(self):
         for label in self.translation_labels:
-            label.hide()
-            label.deleteLater()
+            self._release_label(label)
 
         self.translation_labels.clear()
 
+        if self.painted:
+            dirty = QRegion()
+            for item in self.painted.values():
+                dirty = dirty.united(item.rect)
+            self.painted = {}
+            self._repaint(dirty)
+
+        self.fade_timer.stop()
+
     def update_translations(
         self, translations: List[Tuple[str, str, int, int, int, int]]
     ):
-        self.clear_translations()
+        if self.render_mode == 'painter':
+            self._update_painted(translations)
+            return
 
-        for original, translated, x, y, w, h in translations:
-            self.add_translation(original, translated, x, y, w, h)
+        # 按原文+位置精确匹配，其次按位置匹配已有标签；只移动/改字，不重建控件
+        exact: Dict[Tuple[str, int, int, int, int], List[TranslationLabel]] = {}
+        by_position: Dict[Tuple[int, int], List[TranslationLabel]] = {}
+        for label in self.translation_labels:
+            rect = label.original_rect
+            exact.setdefault((label.original_text, rect.x(), rect.y(), rect.width(), rect.height()), []).append(label)
+
+        kept: List[TranslationLabel] = []
+        pending = []
+        for item in translations:
+            original, _, x, y, w, h = item
+            labels = exact.get((original, x, y, w, h))
+            if labels:
+                label = labels.pop()
+                label.update_translation(*item)
+                kept.append(label)
+            else:
+                pending.append(item)
+
+        kept_ids = {id(label) for label in kept}
+        unmatched = [label for label in self.translation_labels if id(label) not in kept_ids]
+        for label in unmatched:
+            rect = label.original_rect
+            by_position.setdefault(self._position_key(rect.x(), rect.y()), []).append(label)
+
+        for item in pending:
+            _, _, x, y, _, _ = item
+            labels = by_position.get(self._position_key(x, y))
+            if labels:
+                label = labels.pop()
+            else:
+                label = self._acquire_label(*item)
+            label.update_translation(*item)
+            kept.append(label)
+
+        for labels in by_position.values():
+            for label in labels:
+                self._release_label(label)
+
+        for label in kept:
+            label.start_fade_timer(self.display_duration)
+            if label.isHidden():
+                label.show()
+
+        self.translation_labels = kept
+
+        if kept and not self.fade_timer.isActive():
+            self.fade_timer.start()
+
+    def keep_alive(self):
+        # 画面未变化时不会有新的翻译，延长当前翻译的显示时间
+        fade_deadline = time.monotonic() + self.display_duration / 1000
+        for item in self.painted.values():
+            item.fade_deadline = fade_deadline
+        for label in self.translation_labels:
+            if not label.isHidden():
+                label.start_fade_timer(self.display_duration)
+
+    @staticmethod
+    def _position_key(x: int, y: int) -> Tuple[int, int]:
+        return x // 16, y // 16
+
+    def _fade_tick(self):
+        now = time.monotonic()
+
+        if self.painted:
+            expired = [key for key, item in self.painted.items() if item.fade_deadline <= now]
+            dirty = QRegion()
+            for key in expired:
+                dirty = dirty.united(self.painted.pop(key).rect)
+            self._repaint(dirty)
+
+        visible = []
+        for label in self.translation_labels:
+            if label.fade_deadline <= now:
+                label.fade_out()
+            if label.isHidden():
+                self._release_label(label)
+            else:
+                visible.append(label)
+
+        self.translation_labels = visible
+        if not visible and not self.painted:
+            self.fade_timer.stop()
 
     def paintEvent(self, event):
         super().paintEvent(event)
 
+        if not self.painted:
+            return
+
+        # 只绘制与本次重绘区域相交的翻译
+        clip = event.rect()
+        painter = QPainter(self)
+        painter.setFont(self.paint_font)
+        painter.setPen(self.text_color)
+        for item in self.painted.values():
+            if not item.rect.intersects(clip):
+                continue
+            painter.fillRect(item.rect, self.background_color)
+            painter.drawStaticText(item.rect.x() + self.text_padding, item.rect.y() + self.text_padding,
+                                   item.static_text)
+        painter.end()
+
 
 class DisplayManager:
 
@@ -130,6 +414,29 @@ class DisplayManager:
         self.overlay_window = None
         self.is_initialized = False
 
+        self.render_mode = 'labels'
+        self.display_duration = 5000
+        self.font_size = 12
+        self.background_opacity = 180
+
+    def set_display_options(self, render_mode: str = 'labels', display_duration: int = 5000,
+                            font_size: int = 12, background_opacity: int = 180):
+        if render_mode not in OverlayWindow.RENDER_MODES:
+            raise ValueError(f"Unsupported render mode: {render_mode}")
+
+        self.render_mode = render_mode
+        self.display_duration = display_duration
+        self.font_size = font_size
+        self.background_opacity = background_opacity
+
+        if self.overlay_window:
+            self._apply_display_options()
+
+    def _apply_display_options(self):
+        self.overlay_window.set_render_mode(self.render_mode)
+        self.overlay_window.set_display_duration(self.display_duration)
+        self.overlay_window.set_paint_style(self.font_size, self.background_opacity)
+
     def initialize(self):
         if not self.is_initialized:
             if not QApplication.instance():
@@ -138,6 +445,7 @@ class DisplayManager:
                 self.app = QApplication.instance()
 
             self.overlay_window = OverlayWindow()
+            self._apply_display_options()
 
             self.is_initialized = True
 
@@ -150,6 +458,10 @@ class DisplayManager:
         if self.overlay_window:
             self.overlay_window.update_translations(translations)
 
+    def keep_alive(self):
+        if self.overlay_window:
+            self.overlay_window.keep_alive()
+
     def clear_display(self):
         if self.overlay_window:
             self.overlay_window.clear_translations()
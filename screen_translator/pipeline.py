@@ -0,0 +1,111 @@
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from screen_translator.metrics import metrics
+
+log = logging.getLogger(__name__)
+
+
+class LatestQueue:
+
+    def __init__(self, name: str, maxsize: int = 1, on_drop: Optional[Callable[[Any], None]] = None):
+        self.name = name
+        self.maxsize = max(1, maxsize)
+        # 被丢弃或清空的项交给 on_drop 处理，例如归还截图缓冲区
+        self.on_drop = on_drop
+
+        self._items = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+        self.total = 0
+        self.dropped = 0
+
+    def put(self, item: Any):
+        with self._condition:
+            # 队列已满时丢弃最旧的一项，保证下游总是处理最新的帧
+            if len(self._items) >= self.maxsize:
+                self._drop(self._items.popleft())
+                self.dropped += 1
+
+            self._items.append(item)
+            self.total += 1
+            self._condition.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        with self._condition:
+            self._condition.wait_for(lambda: self._items or self._closed, timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def _drop(self, item: Any):
+        if self.on_drop is not None:
+            try:
+                self.on_drop(item)
+            except Exception as e:
+                log.info(f"{self.name} queue drop handler failed: {e}")
+
+    def reset(self):
+        with self._condition:
+            while self._items:
+                self._drop(self._items.popleft())
+            self._closed = False
+
+    def depth(self) -> int:
+        return len(self._items)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'depth': self.depth(),
+            'total': self.total,
+            'dropped': self.dropped,
+        }
+
+
+class StageWorker(threading.Thread):
+
+    def __init__(self, name: str, input_queue: LatestQueue, handler: Callable[[Any], Any],
+                 output_queue: Optional[LatestQueue] = None):
+        super().__init__(name=name, daemon=True)
+        self.input_queue = input_queue
+        self.handler = handler
+        self.output_queue = output_queue
+
+        self.processed = 0
+        self.errors = 0
+
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+        self.input_queue.close()
+
+    def run(self):
+        log.info(f"{self.name} stage started")
+
+        while not self._stop_event.is_set():
+            item = self.input_queue.get(timeout=0.5)
+            if item is None:
+                continue
+
+            try:
+                result = self.handler(item)
+                self.processed += 1
+            except Exception as e:
+                self.errors += 1
+                metrics.inc('errors_total', labels={'stage': self.name})
+                log.info(f"{self.name} stage error: {e}")
+                continue
+
+            if result is not None and self.output_queue is not None:
+                self.output_queue.put(result)
+
+        log.info(f"{self.name} stage ended")
@@ -0,0 +1,238 @@
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+# 热键修饰键 -> Windows RegisterHotKey 标志位
+HOTKEY_MODIFIERS = {'alt': 0x1, 'ctrl': 0x2, 'shift': 0x4, 'win': 0x8}
+WM_HOTKEY = 0x0312
+WM_QUIT = 0x0012
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame, max_depth: int = 128) -> List[str]:
+    # 从栈顶向下遍历，返回从根到栈顶的帧名
+    labels = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class SamplingProfiler:
+
+    def __init__(self, output_dir: str = "profiles", interval: float = 0.005,
+                 thread_stages: Optional[Callable[[], Dict[int, str]]] = None):
+        self.output_dir = output_dir
+        self.interval = interval
+        # 返回 线程 ident -> 流水线阶段名；为空时按线程名采样所有线程
+        self.thread_stages = thread_stages
+
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.last_output: Optional[str] = None
+        self.thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, duration: float = 10.0) -> bool:
+        with self._lock:
+            if self.is_running:
+                log.info("Profiler is already running")
+                return False
+
+            self._stop_event.clear()
+            self.thread = threading.Thread(target=self._run, args=(duration,), name='profiler', daemon=True)
+            self.thread.start()
+
+        log.info(f"Profiling pipeline threads for {duration:.1f}s...")
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_running and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+
+    def _stages(self) -> Dict[int, str]:
+        if self.thread_stages is not None:
+            return self.thread_stages()
+        return {thread.ident: thread.name for thread in threading.enumerate() if thread.ident is not None}
+
+    def sample(self):
+        own_ident = threading.get_ident()
+        stages = self._stages()
+        # 只读取各线程当前栈帧，被采样线程不需要暂停或配合
+        for ident, frame in sys._current_frames().items():
+            stage = stages.get(ident)
+            if stage is None or ident == own_ident:
+                continue
+            self.samples[';'.join([stage] + collapse_stack(frame))] += 1
+        self.sample_count += 1
+
+    def _run(self, duration: float):
+        self.samples = Counter()
+        self.sample_count = 0
+
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline and not self._stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                log.info(f"Profiler sample failed: {e}")
+            self._stop_event.wait(self.interval)
+
+        try:
+            self.last_output = self.write()
+        except Exception as e:
+            log.info(f"Failed to write profile: {e}")
+
+    def stage_totals(self) -> Dict[str, int]:
+        totals: Counter = Counter()
+        for stack, count in self.samples.items():
+            totals[stack.split(';', 1)[0]] += count
+        return dict(totals)
+
+    def write(self, path: Optional[str] = None) -> str:
+        if path is None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            path = os.path.join(self.output_dir, time.strftime("profile-%Y%m%d-%H%M%S.collapsed"))
+
+        # collapsed-stack 格式，每行 "阶段;根帧;...;栈顶帧 次数"，可直接用 flamegraph.pl / speedscope 打开
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        totals = ', '.join(f"{stage}={count}" for stage, count in sorted(self.stage_totals().items()))
+        log.info(f"Profile written to {path} ({self.sample_count} samples: {totals})")
+        return path
+
+
+class SignalTrigger:
+
+    def __init__(self, signum: int, callback: Callable[[], None]):
+        self.signum = signum
+        self.callback = callback
+        self.reader: Optional[socket.socket] = None
+        self.writer: Optional[socket.socket] = None
+        self.notifier = None
+
+    def start(self):
+        from PyQt6.QtCore import QSocketNotifier
+
+        # Qt 事件循环空闲时不执行 Python 代码，Python 信号处理函数会被一直推迟；
+        # 解释器在收到信号时把信号编号写入 wakeup fd，由 QSocketNotifier 唤醒事件循环
+        self.reader, self.writer = socket.socketpair()
+        self.reader.setblocking(False)
+        self.writer.setblocking(False)
+        signal.set_wakeup_fd(self.writer.fileno())
+        # 信号处理函数里不做任何事，真正的处理放在 Qt 回调中
+        signal.signal(self.signum, lambda signum, frame: None)
+
+        self.notifier = QSocketNotifier(self.reader.fileno(), QSocketNotifier.Type.Read)
+        self.notifier.activated.connect(self._on_wakeup)
+
+    def _on_wakeup(self):
+        try:
+            data = self.reader.recv(64)
+        except (BlockingIOError, InterruptedError):
+            return
+
+        if self.signum in data:
+            log.info(f"Received signal {self.signum}, profiling pipeline threads...")
+            try:
+                self.callback()
+            except Exception as e:
+                log.info(f"Signal callback failed: {e}")
+
+    def stop(self):
+        if self.notifier is not None:
+            self.notifier.setEnabled(False)
+            self.notifier = None
+        signal.set_wakeup_fd(-1)
+        for sock in (self.reader, self.writer):
+            if sock is not None:
+                sock.close()
+        self.reader = self.writer = None
+
+
+def parse_hotkey(hotkey: str):
+    modifiers = 0
+    key = None
+    for part in hotkey.lower().replace(' ', '').split('+'):
+        if part in HOTKEY_MODIFIERS:
+            modifiers |= HOTKEY_MODIFIERS[part]
+        elif len(part) == 1 and part.isalnum():
+            key = ord(part.upper())
+        elif part.startswith('f') and part[1:].isdigit() and 1 <= int(part[1:]) <= 24:
+            key = 0x70 + int(part[1:]) - 1
+        else:
+            raise ValueError(f"Unsupported hotkey: {hotkey}")
+
+    if key is None:
+        raise ValueError(f"Hotkey has no key: {hotkey}")
+    return modifiers, key
+
+
+class GlobalHotkey:
+
+    def __init__(self, hotkey: str, callback: Callable[[], None]):
+        self.modifiers, self.key = parse_hotkey(hotkey)
+        self.hotkey = hotkey
+        self.callback = callback
+        self.thread: Optional[threading.Thread] = None
+        self.thread_id = 0
+
+    def start(self) -> bool:
+        if sys.platform != 'win32':
+            log.info(f"Global hotkey {self.hotkey} is only supported on Windows")
+            return False
+
+        self.thread = threading.Thread(target=self._run, name='hotkey', daemon=True)
+        self.thread.start()
+        return True
+
+    def _run(self):
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.windll.user32
+        kernel32 = ctypes.windll.kernel32
+        self.thread_id = kernel32.GetCurrentThreadId()
+
+        # 热键消息发到注册它的线程，因此注册和消息循环都在这个线程里
+        if not user32.RegisterHotKey(None, 1, self.modifiers, self.key):
+            log.info(f"Failed to register hotkey {self.hotkey}")
+            return
+
+        msg = wintypes.MSG()
+        try:
+            while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                if msg.message == WM_HOTKEY:
+                    try:
+                        self.callback()
+                    except Exception as e:
+                        log.info(f"Hotkey callback failed: {e}")
+        finally:
+            user32.UnregisterHotKey(None, 1)
+
+    def stop(self):
+        if self.thread_id:
+            import ctypes
+            ctypes.windll.user32.PostThreadMessageW(self.thread_id, WM_QUIT, 0, 0)
+            self.thread_id = 0
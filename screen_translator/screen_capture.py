@@ -1,37 +1,46 @@
 import logging
 import time
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
-import cv2
 import numpy as np
-import pyautogui
 from PIL import Image
 
+from screen_translator.capture_backends import FrameRingBuffer, create_capture_backend
+from screen_translator.frame_diff import FrameChangeDetector
+
 log = logging.getLogger(__name__)
 
 
 class ScreenCapture:
 
-    def __init__(self):
-        pyautogui.FAILSAFE = False
+    def __init__(self, backend: str = 'auto', ring_slots: int = 4, **backend_options):
+        self.backend = create_capture_backend(backend, **backend_options)
+        # OCR 使用 BGR，截图直接按该顺序写入环形缓冲区
+        self.channel_order = 'BGR'
+        self.ring = FrameRingBuffer(ring_slots)
 
-        self.screen_width, self.screen_height = pyautogui.size()
+        self.screen_width, self.screen_height = self.backend.screen_size()
 
         self.capture_region = None
 
+        self.captures = 0
+        self.last_capture_time = 0.0
+        self.avg_capture_time = 0.0
+
     def set_capture_region(self, x: int, y: int, width: int, height: int):
         self.capture_region = (x, y, width, height)
 
     def capture_screen(self) -> Optional[np.ndarray]:
         try:
-            if self.capture_region:
-                screenshot = pyautogui.screenshot(region=self.capture_region)
-            else:
-                screenshot = pyautogui.screenshot()
+            start_time = time.perf_counter()
 
-            img_array = np.array(screenshot)
+            # 返回的帧属于环形缓冲区，使用完后需调用 release_frame 归还槽位
+            img_bgr = self.backend.grab(self.capture_region, self.ring, self.channel_order)
 
-            img_bgr = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+            self.last_capture_time = time.perf_counter() - start_time
+            if img_bgr is not None:
+                self.captures += 1
+                self.avg_capture_time = self.avg_capture_time * 0.9 + self.last_capture_time * 0.1
 
             return img_bgr
 
@@ -41,12 +50,7 @@ class ScreenCapture:
 
     def capture_screen_pil(self) -> Optional[Image.Image]:
         try:
-            if self.capture_region:
-                screenshot = pyautogui.screenshot(region=self.capture_region)
-            else:
-                screenshot = pyautogui.screenshot()
-
-            return screenshot
+            return self.backend.grab_pil(self.capture_region)
 
         except Exception as e:
             log.info(f"Screenshot failed: {e}")
@@ -64,21 +68,77 @@ class ScreenCapture:
             log.info(f"Failed to save screenshot: {e}")
             return False
 
+    def release_frame(self, frame: np.ndarray):
+        self.ring.release(frame)
+
     def get_screen_size(self) -> Tuple[int, int]:
         return self.screen_width, self.screen_height
 
+    def get_stats(self) -> Dict:
+        return {
+            'backend': self.backend.name,
+            'captures': self.captures,
+            'last_latency_ms': self.last_capture_time * 1000,
+            'avg_latency_ms': self.avg_capture_time * 1000,
+            'allocated_bytes_per_capture': self.backend.last_allocated_bytes,
+            'ring': self.ring.get_stats(),
+        }
+
+    def close(self):
+        self.backend.close()
+
 
 class ContinuousCapture:
 
-    def __init__(self, capture_interval: float = 1.0):
-        self.screen_capture = ScreenCapture()
+    def __init__(self, capture_interval: float = 1.0, change_threshold: float = 0.0005):
+        # 截图后端在开始截图时才创建，避免构造时就导入 pyautogui 等依赖
+        self.screen_capture: Optional[ScreenCapture] = None
+        self.backend = 'auto'
+        self.backend_options: Dict = {}
+        self.ring_slots = 4
         self.capture_interval = capture_interval
         self.is_running = False
         self.last_capture_time = 0
 
+        self.change_detector = FrameChangeDetector(change_threshold)
+        self.change_detection_enabled = True
+
+        self.captured_frames = 0
+        self.skipped_frames = 0
+
+        # 录制实时截图，供之后无显示器环境下回放
+        self.recorder = None
+
+    def set_backend(self, backend: str, ring_slots: Optional[int] = None, **backend_options):
+        self.backend = backend
+        self.backend_options = backend_options
+        if ring_slots is not None:
+            self.ring_slots = ring_slots
+        if self.screen_capture is not None:
+            self.screen_capture.close()
+            self.screen_capture = None
+
+    def set_ring_slots(self, slots: int):
+        if slots != self.ring_slots:
+            self.set_backend(self.backend, slots, **self.backend_options)
+
+    def _ensure_capture(self) -> ScreenCapture:
+        if self.screen_capture is None:
+            self.screen_capture = ScreenCapture(self.backend, self.ring_slots, **self.backend_options)
+        return self.screen_capture
+
+    def set_recorder(self, recorder):
+        self.recorder = recorder
+
     def set_interval(self, interval: float):
         self.capture_interval = interval
 
+    def set_change_detection(self, enabled: bool, threshold: Optional[float] = None):
+        self.change_detection_enabled = enabled
+        if threshold is not None:
+            self.change_detector.set_threshold(threshold)
+        self.change_detector.reset()
+
     def should_capture(self) -> bool:
         current_time = time.time()
         if current_time - self.last_capture_time >= self.capture_interval:
@@ -87,16 +147,42 @@ class ContinuousCapture:
         return False
 
     def start_capture(self):
+        self._ensure_capture()
         self.is_running = True
 
     def stop_capture(self):
         self.is_running = False
+        if self.recorder is not None:
+            self.recorder.close()
 
     def get_latest_screenshot(self) -> Optional[np.ndarray]:
         if not self.is_running:
             return None
 
         if self.should_capture():
-            return self.screen_capture.capture_screen()
+            screenshot = self._ensure_capture().capture_screen()
+            if screenshot is None:
+                return None
+
+            self.captured_frames += 1
+            if self.recorder is not None:
+                self.recorder.record(screenshot)
+
+            if self.change_detection_enabled and not self.change_detector.has_changed(screenshot):
+                self.skipped_frames += 1
+                self.release_frame(screenshot)
+                return None
+
+            return screenshot
 
         return None
+
+    def release_frame(self, frame: np.ndarray):
+        # 下游用完截图后归还环形缓冲区槽位；回放等不使用缓冲区的来源无需处理
+        if self.screen_capture is not None:
+            self.screen_capture.release_frame(frame)
+
+    def get_stats(self) -> Optional[Dict]:
+        if self.screen_capture is None:
+            return None
+        return self.screen_capture.get_stats()
@@ -1,48 +1,214 @@
 import logging
+import threading
 import time
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 from PyQt6.QtCore import QThread, pyqtSignal
 
-from screen_translator.ocr_engine import OCREngine, TextBox
+from screen_translator.metrics import MetricsFileWriter, MetricsServer, metrics
+from screen_translator.ocr_engine import OCREngine
 from screen_translator.overlay_display import DisplayManager
+from screen_translator.pipeline import LatestQueue, StageWorker
+from screen_translator.profiler import GlobalHotkey, SamplingProfiler
+from screen_translator.script_detect import normalize_language
+from screen_translator.startup_timing import startup_timer
+from screen_translator.text_boxes import TextBoxArray
+from screen_translator.text_tracker import TextTracker
 from screen_translator.screen_capture import ContinuousCapture
 from screen_translator.translator.translator import create_default_translator
 
 log = logging.getLogger(__name__)
 
 
+def filter_text_boxes(text_boxes: TextBoxArray, min_text_length: int, target_lang: str) -> TextBoxArray:
+    if not len(text_boxes):
+        return text_boxes
+
+    stripped = [text.strip() for text in text_boxes.texts]
+    lengths = np.fromiter((len(text) for text in stripped), dtype=np.int32, count=len(stripped))
+
+    mask = lengths >= min_text_length
+    mask &= np.fromiter((not text.isdigit() and any(c.isalnum() for c in text) for text in stripped),
+                        dtype=bool, count=len(stripped))
+    # 已经是目标语言的文本无需翻译
+    mask &= ~text_boxes.language_mask([target_lang])
+
+    return text_boxes.filter(mask)
+
+
 class ScreenTranslator(QThread):
 
     update_signal = pyqtSignal(object)
+    # 截图因画面未变化被跳过时发出，保持当前翻译显示
+    keep_alive_signal = pyqtSignal()
+    ready_signal = pyqtSignal()
 
     def __init__(self, source_languages: List[str], target_language: str, capture_interval: float = 2.0):
         super().__init__()
         self.source_languages = source_languages
         self.target_language = target_language
+        # 配置中的 ch 等 OCR 语言代码统一为翻译接口使用的语言代码
+        self.target_lang = normalize_language(target_language)
         self.screen_capture = ContinuousCapture(capture_interval)
-        self.ocr_engine = OCREngine(lang=source_languages)
+        self.ocr_engine = OCREngine(lang=source_languages, load=False)
         self.translator = create_default_translator()
         self.display_manager = DisplayManager()
 
         self.is_running = False
         self.translation_thread = None
 
+        # 模型在后台加载并预热，完成后才开始截图
+        self.ready_event = threading.Event()
+        self.warm_up_thread: Optional[threading.Thread] = None
+
+        self.ocr_queue = LatestQueue('ocr', on_drop=self._release_frame)
+        self.translate_queue = LatestQueue('translate')
+        self.stage_workers: List[StageWorker] = []
+        self.capture_thread_id: Optional[int] = None
+
+        # 按需采样各流水线线程的调用栈，不影响正常运行
+        self.profiler = SamplingProfiler(thread_stages=self.get_thread_stages)
+        self.profile_duration = 10.0
+        self.profile_on_start = False
+        self.profile_hotkey: Optional[GlobalHotkey] = None
+
+        # 跨帧跟踪文本框，未变化的文本沿用上一帧的翻译
+        self.tracking_enabled = True
+        self.tracker = TextTracker()
+
         self.min_text_length = 2
         self.show_original = True
 
         self.stats = {
             'total_captures': 0,
+            'processed_frames': 0,
+            'skipped_frames': 0,
             'total_texts': 0,
             'total_translations': 0,
-            'avg_process_time': 0.0
+            'reused_translations': 0,
+            'avg_process_time': 0.0,
+            'avg_preprocess_time': 0.0,
+            'avg_ocr_time': 0.0
         }
 
+        self.metrics_server: Optional[MetricsServer] = None
+        self.metrics_writer: Optional[MetricsFileWriter] = None
+        self._register_metrics()
+
         log.info("Screen translator initialized successfully")
 
+    def _register_metrics(self):
+        metrics.describe('stage_seconds', 'Per-stage latency of the capture -> OCR -> translate -> display pipeline')
+        metrics.describe('frame_seconds', 'End-to-end latency from capture to translated output')
+        metrics.describe('translation_seconds', 'Latency of translation backend calls')
+        metrics.describe('cache_lookup_seconds', 'Translation cache lookup time per batch')
+
+        # 导出时才读取；lambda 每次取当前对象，替换截图源或队列后仍然有效
+        metrics.register_callback('frames_total', lambda: self.screen_capture.captured_frames,
+                                  help_text='Captured frames')
+        metrics.register_callback('skipped_frames_total', lambda: self.screen_capture.skipped_frames,
+                                  help_text='Frames skipped by change detection')
+        metrics.register_callback('dropped_frames_total', lambda: self.ocr_queue.dropped, {'queue': 'ocr'},
+                                  help_text='Frames dropped because the downstream stage was busy')
+        metrics.register_callback('dropped_frames_total', lambda: self.translate_queue.dropped, {'queue': 'translate'})
+        metrics.register_callback('queue_depth', lambda: self.ocr_queue.depth(), {'queue': 'ocr'})
+        metrics.register_callback('queue_depth', lambda: self.translate_queue.depth(), {'queue': 'translate'})
+        metrics.register_callback('cache_hits_total', lambda: self.translator.translation_cache.hits,
+                                  {'cache': 'translation'})
+        metrics.register_callback('cache_misses_total', lambda: self.translator.translation_cache.misses,
+                                  {'cache': 'translation'})
+        metrics.register_callback('cache_hits_total',
+                                  lambda: (self.ocr_engine.get_recognition_cache_stats() or {}).get('hits', 0),
+                                  {'cache': 'recognition'})
+        metrics.register_callback('cache_misses_total',
+                                  lambda: (self.ocr_engine.get_recognition_cache_stats() or {}).get('misses', 0),
+                                  {'cache': 'recognition'})
+
+    def set_metrics(self, enabled: bool = True, port: Optional[int] = None, file_path: Optional[str] = None,
+                    file_interval: float = 10.0):
+        metrics.enabled = enabled
+        self._stop_metrics_export()
+        if not enabled:
+            return
+
+        if port is not None:
+            try:
+                self.metrics_server = MetricsServer(metrics, port)
+                self.metrics_server.start()
+            except Exception as e:
+                log.info(f"Failed to start metrics endpoint on port {port}: {e}")
+                self.metrics_server = None
+
+        if file_path:
+            self.metrics_writer = MetricsFileWriter(metrics, file_path, file_interval)
+            self.metrics_writer.start()
+
+    def set_profiler(self, output_dir: str = "profiles", duration: float = 10.0, interval: float = 0.005,
+                     on_start: bool = False, hotkey: Optional[str] = None):
+        self.profiler.output_dir = output_dir
+        self.profiler.interval = interval
+        self.profile_duration = duration
+        self.profile_on_start = on_start
+
+        if self.profile_hotkey is not None:
+            self.profile_hotkey.stop()
+            self.profile_hotkey = None
+        if hotkey:
+            try:
+                self.profile_hotkey = GlobalHotkey(hotkey, self.start_profiling)
+                self.profile_hotkey.start()
+            except Exception as e:
+                log.info(f"Failed to set profiler hotkey {hotkey}: {e}")
+                self.profile_hotkey = None
+
+    def start_profiling(self, duration: Optional[float] = None) -> bool:
+        return self.profiler.start(duration or self.profile_duration)
+
+    def get_thread_stages(self) -> Dict[int, str]:
+        stages = {threading.main_thread().ident: 'display'}
+        if self.warm_up_thread is not None and self.warm_up_thread.ident is not None:
+            stages[self.warm_up_thread.ident] = 'warm-up'
+        # 回放模式下截图线程就是主线程，所有阶段都在其中同步执行
+        if self.capture_thread_id is not None:
+            stages[self.capture_thread_id] = 'capture'
+        for worker in self.stage_workers:
+            if worker.ident is not None:
+                stages[worker.ident] = worker.name
+        return stages
+
+    def _stop_metrics_export(self):
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        if self.metrics_writer is not None:
+            self.metrics_writer.stop()
+            self.metrics_writer = None
+
     def set_capture_interval(self, interval: float):
         self.screen_capture.set_interval(interval)
 
+    def set_change_detection(self, enabled: bool, threshold: Optional[float] = None):
+        self.screen_capture.set_change_detection(enabled, threshold)
+
+    def set_frame_source(self, frame_source: ContinuousCapture):
+        # 可替换为 ReplayCapture 等帧源，接口与 ContinuousCapture 一致
+        self.screen_capture = frame_source
+
+    def set_capture_backend(self, backend: str, ring_slots: Optional[int] = None, **backend_options):
+        self.screen_capture.set_backend(backend, ring_slots, **backend_options)
+
+    def set_pipeline_queue_size(self, size: int):
+        self.ocr_queue = LatestQueue('ocr', size, on_drop=self._release_frame)
+        self.translate_queue = LatestQueue('translate', size)
+        # 队列中 + OCR 处理中 + 正在写入 的帧各占一个槽位；槽位不够时会临时分配，不会覆盖使用中的帧
+        self.screen_capture.set_ring_slots(max(self.screen_capture.ring_slots, size + 2))
+
+    def set_text_tracking(self, enabled: bool, iou_threshold: Optional[float] = None,
+                          similarity_threshold: Optional[float] = None):
+        self.tracking_enabled = enabled
+        self.tracker.set_thresholds(iou_threshold, similarity_threshold)
+        self.tracker.reset()
 
     def set_min_text_length(self, length: int):
         self.min_text_length = length
@@ -50,77 +216,152 @@ class ScreenTranslator(QThread):
     def add_translator(self, translator):
         self.translator.add_translator(translator)
 
-    def process_frame(self) -> bool:
-        start_time = time.time()
+    def is_ready(self) -> bool:
+        return self.ready_event.is_set()
 
+    def warm_up(self):
         try:
-            screenshot = self.screen_capture.get_latest_screenshot()
-            if screenshot is None:
-                return False
+            with startup_timer.measure("warmup", "total"):
+                self.ocr_engine.warm_up()
+                self.translator.warm_up()
+        except Exception as e:
+            log.info(f"Warm-up error: {e}")
+
+        self.ready_event.set()
+        self.ready_signal.emit()
+        log.info("Translator engines are ready")
+
+    def start_warm_up(self):
+        if self.ready_event.is_set() or (self.warm_up_thread and self.warm_up_thread.is_alive()):
+            return
 
-            self.stats['total_captures'] += 1
+        self.warm_up_thread = threading.Thread(target=self.warm_up, name='warm-up', daemon=True)
+        self.warm_up_thread.start()
 
+    def _capture_stage(self) -> Optional[Tuple[float, np.ndarray]]:
+        start_time = time.time()
+
+        captured = self.screen_capture.captured_frames
+        skipped = self.screen_capture.skipped_frames
+        capture_start = time.perf_counter()
+        screenshot = self.screen_capture.get_latest_screenshot()
+        # 只统计真正截图的调用，未到截图间隔时直接返回的不计入
+        if self.screen_capture.captured_frames != captured:
+            metrics.observe('stage_seconds', time.perf_counter() - capture_start, {'stage': 'capture'})
+        self.stats['total_captures'] = self.screen_capture.captured_frames
+        self.stats['skipped_frames'] = self.screen_capture.skipped_frames
+        if screenshot is None:
+            if self.screen_capture.skipped_frames != skipped:
+                self.keep_alive_signal.emit()
+            return None
+
+        self.stats['processed_frames'] += 1
+        return start_time, screenshot
+
+    def _release_frame(self, frame: Tuple[float, np.ndarray]):
+        self.screen_capture.release_frame(frame[1])
+
+    def _ocr_stage(self, frame: Tuple[float, np.ndarray]) -> Optional[Tuple[float, TextBoxArray, Optional[np.ndarray]]]:
+        start_time, screenshot = frame
+
+        try:
             text_boxes = self.ocr_engine.recognize_text_with_filter(
                 screenshot, self.source_languages
             )
+        finally:
+            # 识别结束后截图不再被引用，立即归还缓冲区槽位
+            self._release_frame(frame)
 
-            if not text_boxes:
-                return True
+        timings = self.ocr_engine.last_timings
+        self.stats['avg_preprocess_time'] = self.stats['avg_preprocess_time'] * 0.9 + timings['preprocess'] * 0.1
+        self.stats['avg_ocr_time'] = self.stats['avg_ocr_time'] * 0.9 + timings['ocr'] * 0.1
+        metrics.observe('stage_seconds', timings['preprocess'], {'stage': 'preprocess'})
+        metrics.observe('stage_seconds', timings['ocr'], {'stage': 'ocr'})
 
-            filtered_texts = self._filter_texts(text_boxes)
-            if not filtered_texts:
-                return True
+        if not len(text_boxes):
+            return None
 
-            self.stats['total_texts'] += len(filtered_texts)
+        filter_start = time.perf_counter()
+        filtered_texts = self._filter_texts(text_boxes)
+        if not len(filtered_texts):
+            return None
 
-            translations = self._translate_texts(filtered_texts)
+        track_ids = self.tracker.update(filtered_texts) if self.tracking_enabled else None
+        metrics.observe('stage_seconds', time.perf_counter() - filter_start, {'stage': 'filter'})
 
-            if translations:
-                self.update_signal.emit(translations)
-                self.stats['total_translations'] += len(translations)
+        self.stats['total_texts'] += len(filtered_texts)
+        return start_time, filtered_texts, track_ids
 
-            process_time = time.time() - start_time
-            self.stats['avg_process_time'] = (
-                self.stats['avg_process_time'] * 0.9 + process_time * 0.1
-            )
-
-            return True
+    def _translate_stage(self, texts: Tuple[float, TextBoxArray, Optional[np.ndarray]]):
+        start_time, text_boxes, track_ids = texts
 
-        except Exception as e:
-            log.info(f"Error processing frame: {e}")
-            return False
+        translate_start = time.perf_counter()
+        translations = self._translate_texts(text_boxes, track_ids)
+        metrics.observe('stage_seconds', time.perf_counter() - translate_start, {'stage': 'translate'})
 
-    def _filter_texts(self, text_boxes: List[TextBox]) -> List[TextBox]:
-        filtered = []
+        if translations:
+            self.update_signal.emit(translations)
+            self.stats['total_translations'] += len(translations)
+            startup_timer.mark_first_translation()
 
-        for text_box in text_boxes:
-            text = text_box.text.strip()
+        process_time = time.time() - start_time
+        metrics.observe('frame_seconds', process_time)
+        self.stats['avg_process_time'] = (
+            self.stats['avg_process_time'] * 0.9 + process_time * 0.1
+        )
 
-            if len(text) < self.min_text_length:
-                continue
+    def process_frame(self) -> bool:
+        try:
+            frame = self._capture_stage()
+            if frame is None:
+                return False
 
-            if text.isdigit():
-                continue
+            texts = self._ocr_stage(frame)
+            if texts is not None:
+                self._translate_stage(texts)
 
-            if all(not c.isalnum() for c in text):
-                continue
+            return True
 
-            filtered.append(text_box)
+        except Exception as e:
+            metrics.inc('errors_total', labels={'stage': 'frame'})
+            log.info(f"Error processing frame: {e}")
+            return False
 
-        return filtered
+    def _filter_texts(self, text_boxes: TextBoxArray) -> TextBoxArray:
+        return filter_text_boxes(text_boxes, self.min_text_length, self.target_lang)
 
-    def _translate_texts(self, text_boxes: List[TextBox]) -> List[Tuple[str, str, int, int, int, int]]:
+    def _translate_texts(self, text_boxes: TextBoxArray,
+                         track_ids: Optional[np.ndarray] = None) -> List[Tuple[str, str, int, int, int, int]]:
         translations = []
-        
-        translated_texts = self.translator.translate_batch([x.text for x in text_boxes], 'zh')
 
-        for idx, text_box in enumerate(text_boxes):
-            original_text = text_box.text
+        if track_ids is None:
+            translated_texts: List[Optional[str]] = [None] * len(text_boxes)
+        else:
+            # 已跟踪且文字未变化的文本直接沿用轨迹上的翻译
+            translated_texts = self.tracker.get_translations(track_ids, text_boxes.texts)
+            self.stats['reused_translations'] += sum(1 for text in translated_texts if text)
+
+        # 按源语言分组翻译，未识别出语言的文本交给翻译接口自动检测
+        groups: Dict[str, List[int]] = {}
+        for idx, language in enumerate(text_boxes.languages):
+            if translated_texts[idx] is None:
+                groups.setdefault(language or 'auto', []).append(idx)
+
+        for source_lang, indices in groups.items():
+            results = self.translator.translate_batch(
+                [text_boxes.texts[idx] for idx in indices], self.target_lang, source_lang
+            )
+            for idx, result in zip(indices, results):
+                translated_texts[idx] = result
 
-            translated_text = translated_texts[idx]
+            if track_ids is not None:
+                self.tracker.set_translations(
+                    [track_ids[idx] for idx in indices], [text_boxes.texts[idx] for idx in indices], results
+                )
 
+        for original_text, translated_text, rect in zip(text_boxes.texts, translated_texts, text_boxes.rects.tolist()):
             if translated_text and translated_text != original_text:
-                x, y, width, height = text_box.get_rect()
+                x, y, width, height = rect
 
                 translations.append((
                     original_text,
@@ -129,28 +370,82 @@ class ScreenTranslator(QThread):
                 ))
         return translations
 
+    def run_replay(self, max_frames: Optional[int] = None) -> int:
+        # 无显示器环境下同步跑完整个回放：截图 -> OCR -> 翻译
+        if not self.is_ready():
+            self.warm_up()
+
+        self.capture_thread_id = threading.get_ident()
+        self.screen_capture.start_capture()
+        processed = 0
+        try:
+            while not getattr(self.screen_capture, 'finished', False):
+                if max_frames is not None and processed >= max_frames:
+                    break
+                if self.process_frame():
+                    processed += 1
+                elif self.screen_capture.is_running and getattr(self.screen_capture, 'pace', 'fast') == 'realtime':
+                    time.sleep(0.01)
+        finally:
+            self.screen_capture.stop_capture()
+
+        return processed
+
     def _display_translations(self, translations):
         try:
+            display_start = time.perf_counter()
             self.display_manager.show_translations(translations)
             self.display_manager.process_events()
+            metrics.observe('stage_seconds', time.perf_counter() - display_start, {'stage': 'display'})
         except Exception as e:
+            metrics.inc('errors_total', labels={'stage': 'display'})
             log.info(f"Error displaying translations: {e}")
 
+    def _start_stages(self):
+        self.ocr_queue.reset()
+        self.translate_queue.reset()
+
+        self.stage_workers = [
+            StageWorker('ocr', self.ocr_queue, self._ocr_stage, self.translate_queue),
+            StageWorker('translate', self.translate_queue, self._translate_stage),
+        ]
+        for worker in self.stage_workers:
+            worker.start()
+
+    def _stop_stages(self):
+        for worker in self.stage_workers:
+            worker.stop()
+        for worker in self.stage_workers:
+            if worker.is_alive() and worker is not threading.current_thread():
+                worker.join(timeout=2)
+        self.stage_workers = []
+
     def run(self):
         log.info("Translation loop started")
+        self.capture_thread_id = threading.get_ident()
+
+        while self.is_running and not self.ready_event.wait(0.1):
+            pass
+
+        self._start_stages()
 
         while self.is_running:
             try:
-                success = self.process_frame()
-                if not success:
+                frame = self._capture_stage()
+                if frame is None:
                     time.sleep(0.1)
+                else:
+                    self.ocr_queue.put(frame)
 
                 time.sleep(0.05)
 
             except Exception as e:
+                metrics.inc('errors_total', labels={'stage': 'capture'})
                 log.info(f"Translation loop error: {e}")
                 time.sleep(1)
 
+        self._stop_stages()
+
         log.info("Translation loop ended")
 
     def exec(self):
@@ -160,15 +455,21 @@ class ScreenTranslator(QThread):
 
         log.info("Starting real-time screen translation...")
 
-        self.display_manager.initialize()
+        with startup_timer.measure("init", "display"):
+            self.display_manager.initialize()
+
+        self.start_warm_up()
 
         self.screen_capture.start_capture()
 
         self.update_signal.connect(self._display_translations)
+        self.keep_alive_signal.connect(self.display_manager.keep_alive)
 
         self.is_running = True
 
         self.start()
+        if self.profile_on_start:
+            self.start_profiling()
         log.info("Real-time translation started")
         log.info("Press Ctrl+C to stop translation")
         self.display_manager.exec()
@@ -186,17 +487,69 @@ class ScreenTranslator(QThread):
         if self.translation_thread and self.translation_thread.is_alive():
             self.translation_thread.join(timeout=2)
 
+        self._stop_stages()
+
         self.display_manager.clear_display()
 
+        self._stop_metrics_export()
+
+        if self.profile_hotkey is not None:
+            self.profile_hotkey.stop()
+        # 正在采样时提前结束并写出已采集的部分
+        self.profiler.stop()
+
         log.info("Real-time translation stopped")
 
     def get_stats(self) -> Dict:
-        return self.stats.copy()
+        stats = self.stats.copy()
+        stats['queues'] = {
+            queue.name: queue.get_stats() for queue in (self.ocr_queue, self.translate_queue)
+        }
+        stats['capture'] = self.screen_capture.get_stats()
+        stats['translation_cache'] = self.translator.get_cache_stats()
+        stats['recognition_cache'] = self.ocr_engine.get_recognition_cache_stats()
+        stats['tracker'] = self.tracker.get_stats()
+        stats['ready'] = self.is_ready()
+        stats['latency'] = {
+            key: snapshot for key, snapshot in metrics.to_json()['histograms'].items()
+            if key.startswith(('stage_seconds', 'frame_seconds'))
+        }
+        return stats
 
     def print_stats(self):
         stats = self.get_stats()
         log.info(f"\n=== Performance Statistics ===")
         log.info(f"Total captures: {stats['total_captures']}")
+        log.info(f"Processed frames: {stats['processed_frames']}")
+        log.info(f"Skipped unchanged frames: {stats['skipped_frames']}")
         log.info(f"Recognized texts: {stats['total_texts']}")
         log.info(f"Translated texts: {stats['total_translations']}")
+        log.info(f"Reused tracked translations: {stats['reused_translations']}")
         log.info(f"Average processing time: {stats['avg_process_time']:.3f}s")
+        log.info(f"Average OCR preprocessing time: {stats['avg_preprocess_time']:.3f}s")
+        log.info(f"Average OCR time: {stats['avg_ocr_time']:.3f}s")
+        capture_stats = stats['capture']
+        if capture_stats:
+            log.info(
+                f"Capture ({capture_stats['backend']}): avg_latency={capture_stats['avg_latency_ms']:.1f}ms, "
+                f"allocated_per_capture={capture_stats['allocated_bytes_per_capture']}B, "
+                f"ring_bytes={capture_stats['ring']['bytes']}"
+            )
+        for name, queue_stats in stats['queues'].items():
+            log.info(f"Queue {name}: depth={queue_stats['depth']}, total={queue_stats['total']}, dropped={queue_stats['dropped']}")
+        cache_stats = stats['translation_cache']
+        log.info(
+            f"Translation cache: entries={cache_stats['entries']}, bytes={cache_stats['bytes']}, "
+            f"hit_rate={cache_stats['hit_rate']:.1%}, evictions={cache_stats['evictions']}"
+        )
+        recognition_stats = stats['recognition_cache']
+        if recognition_stats:
+            log.info(
+                f"Recognition cache: entries={recognition_stats['entries']}, "
+                f"hit_rate={recognition_stats['hit_rate']:.1%}"
+            )
+        for key, snapshot in stats['latency'].items():
+            log.info(
+                f"Latency {key}: p50={snapshot['p50'] * 1000:.1f}ms, p95={snapshot['p95'] * 1000:.1f}ms, "
+                f"p99={snapshot['p99'] * 1000:.1f}ms, count={snapshot['count']}"
+            )
@@ -0,0 +1,103 @@
+import logging
+import re
+from typing import Dict, List, Optional, Sequence
+
+log = logging.getLogger(__name__)
+
+# 各文字系统的字符范围，合并为一个预编译正则，一次扫描即可统计每种文字的字符数
+SCRIPT_RANGES = {
+    'latin': r'A-Za-z\u00C0-\u024F\u1E00-\u1EFF',
+    'kana': r'\u3040-\u309F\u30A0-\u30FF\u31F0-\u31FF\uFF66-\uFF9F',
+    'hangul': r'\u1100-\u11FF\u3130-\u318F\uAC00-\uD7AF',
+    'han': r'\u3400-\u4DBF\u4E00-\u9FFF\uF900-\uFAFF',
+    'cyrillic': r'\u0400-\u052F',
+    'greek': r'\u0370-\u03FF',
+    'arabic': r'\u0600-\u06FF\u0750-\u077F',
+    'hebrew': r'\u0590-\u05FF',
+    'thai': r'\u0E00-\u0E7F',
+    'devanagari': r'\u0900-\u097F',
+}
+
+SCRIPT_PATTERN = re.compile('|'.join(
+    f"(?P<{script}>[{chars}]+)" for script, chars in SCRIPT_RANGES.items()
+))
+
+# 每种文字对应的候选语言，第一个为默认语言
+SCRIPT_LANGUAGES: Dict[str, List[str]] = {
+    'latin': ['en', 'fr', 'de', 'es', 'it', 'pt', 'nl', 'vi', 'pl', 'cs', 'hu', 'ro', 'sl', 'sv', 'da', 'fi', 'et'],
+    'kana': ['ja'],
+    'hangul': ['ko'],
+    'han': ['zh', 'zh-tw', 'ja'],
+    'cyrillic': ['ru', 'uk', 'bg'],
+    'greek': ['el'],
+    'arabic': ['ar'],
+    'hebrew': ['he'],
+    'thai': ['th'],
+    'devanagari': ['hi'],
+}
+
+# PaddleOCR 等使用的语言代码 -> 通用语言代码
+LANGUAGE_ALIASES = {
+    'ch': 'zh',
+    'chinese_cht': 'zh-tw',
+    'japan': 'ja',
+    'korean': 'ko',
+    'cyrillic': 'ru',
+    'jp': 'ja',
+    'kor': 'ko',
+}
+
+
+def normalize_language(lang: str) -> str:
+    lang = lang.lower()
+    return LANGUAGE_ALIASES.get(lang, lang)
+
+
+def dominant_script(text: str) -> Optional[str]:
+    counts: Dict[str, int] = {}
+    for match in SCRIPT_PATTERN.finditer(text):
+        script = match.lastgroup
+        counts[script] = counts.get(script, 0) + match.end() - match.start()
+
+    if not counts:
+        return None
+
+    # 含假名的文本按日文处理，其中的汉字也计入日文
+    if 'kana' in counts:
+        counts['kana'] += counts.pop('han', 0)
+
+    return max(counts, key=counts.get)
+
+
+class ScriptClassifier:
+
+    def __init__(self, source_languages: Sequence[str]):
+        self.source_languages = [normalize_language(lang) for lang in source_languages]
+        # 无法确定源语言的文本框标为 auto，交给翻译器自动检测，过滤时同样保留
+        self.accepted_languages = self.source_languages + ['auto']
+
+        # 未收录的配置语言可能使用任何文字，对每种文字都算作候选
+        known = {lang for languages in SCRIPT_LANGUAGES.values() for lang in languages}
+        unknown = list(dict.fromkeys(lang for lang in self.source_languages if lang not in known))
+
+        # 只有唯一候选时才能确定源语言，例如只配置 ja 时纯汉字文本视为日文；
+        # 多个配置语言共用一种文字（如 en 和 fr）时交给翻译器自动检测
+        self.script_languages: Dict[str, str] = {}
+        for script, languages in SCRIPT_LANGUAGES.items():
+            candidates = [lang for lang in languages if lang in self.source_languages] + unknown
+            if len(candidates) == 1:
+                self.script_languages[script] = candidates[0]
+            elif candidates:
+                self.script_languages[script] = 'auto'
+            else:
+                # 没有配置使用该文字的语言，标为默认语言，随后被过滤掉
+                self.script_languages[script] = languages[0]
+
+    def classify(self, text: str) -> Optional[str]:
+        script = dominant_script(text)
+        if script is None:
+            return None
+        return self.script_languages[script]
+
+    def classify_all(self, texts: Sequence[str]) -> List[Optional[str]]:
+        return [self.classify(text) for text in texts]
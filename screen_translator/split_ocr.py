@@ -0,0 +1,120 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+CropKey = Tuple[Tuple[int, ...], bytes]
+
+
+def crop_text_line(image: np.ndarray, poly) -> np.ndarray:
+    points = np.asarray(poly, dtype=np.float32)
+    width = int(max(np.linalg.norm(points[0] - points[1]), np.linalg.norm(points[2] - points[3])))
+    height = int(max(np.linalg.norm(points[0] - points[3]), np.linalg.norm(points[1] - points[2])))
+    width, height = max(1, width), max(1, height)
+
+    target = np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(points, target)
+    crop = cv2.warpPerspective(image, matrix, (width, height), borderMode=cv2.BORDER_REPLICATE,
+                               flags=cv2.INTER_CUBIC)
+
+    # 竖排文字旋转为横排再识别
+    if height / width >= 1.5:
+        crop = np.rot90(crop)
+
+    return crop
+
+
+def crop_key(crop: np.ndarray) -> CropKey:
+    digest = hashlib.blake2b(np.ascontiguousarray(crop).tobytes(), digest_size=16).digest()
+    return crop.shape, digest
+
+
+class RecognitionCache:
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+
+        self._entries: OrderedDict[CropKey, Tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: CropKey) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: CropKey, value: Tuple[str, float]):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries),
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class SplitOCR:
+
+    def __init__(self, detector, recognizer, cache_size: int = 2048, batch_size: int = 16):
+        self.detector = detector
+        self.recognizer = recognizer
+        self.batch_size = batch_size
+        self.cache = RecognitionCache(cache_size)
+
+    def predict(self, image: np.ndarray) -> List[Dict]:
+        polys = []
+        for result in self.detector.predict(image):
+            polys.extend(result["dt_polys"])
+
+        crops = [crop_text_line(image, poly) for poly in polys]
+        keys = [crop_key(crop) for crop in crops]
+
+        recognized: Dict[CropKey, Tuple[str, float]] = {}
+        pending: Dict[CropKey, np.ndarray] = {}
+        for key, crop in zip(keys, crops):
+            if key in recognized or key in pending:
+                continue
+            cached = self.cache.get(key)
+            if cached is None:
+                pending[key] = crop
+            else:
+                recognized[key] = cached
+
+        # 只有缓存未命中的文本行才送入识别模型，并批量识别
+        if pending:
+            results = self.recognizer.predict(list(pending.values()), batch_size=self.batch_size)
+            for key, result in zip(pending, results):
+                value = (result["rec_text"], float(result["rec_score"]))
+                recognized[key] = value
+                self.cache.set(key, value)
+
+        return [{
+            "rec_polys": polys,
+            "rec_texts": [recognized[key][0] for key in keys],
+            "rec_scores": [recognized[key][1] for key in keys],
+        }]
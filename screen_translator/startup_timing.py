@@ -0,0 +1,46 @@
+import importlib
+import logging
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+
+class StartupTimer:
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.records: List[Tuple[str, str, float]] = []
+        self.first_translation_time: Optional[float] = None
+
+    @contextmanager
+    def measure(self, kind: str, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.records.append((kind, name, elapsed))
+            log.info(f"Startup {kind} {name}: {elapsed:.3f}s")
+
+    def mark_first_translation(self):
+        if self.first_translation_time is None:
+            self.first_translation_time = time.perf_counter() - self.start_time
+            log.info(f"Time to first translation: {self.first_translation_time:.3f}s")
+
+    def report(self):
+        total = time.perf_counter() - self.start_time
+        log.info("=== Startup Timing ===")
+        for kind, name, elapsed in sorted(self.records, key=lambda record: record[2], reverse=True):
+            log.info(f"  {kind:<6} {name:<50} {elapsed:.3f}s")
+        log.info(f"  total since process start: {total:.3f}s")
+
+
+startup_timer = StartupTimer()
+
+
+def timed_import(module_name: str) -> ModuleType:
+    with startup_timer.measure("import", module_name):
+        return importlib.import_module(module_name)
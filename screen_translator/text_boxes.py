@@ -0,0 +1,193 @@
+import logging
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+
+class TextBox:
+
+    __slots__ = ('text', 'bbox', 'confidence', 'center_x', 'center_y', 'width', 'height', '_rect')
+
+    def __init__(self, text: str, bbox: List[List[int]], confidence: float):
+        self.text = text
+        self.bbox = bbox
+        self.confidence = confidence
+        self._rect = None
+
+        self.center_x, self.center_y = self._calculate_center()
+        self.width, self.height = self._calculate_size()
+
+    @classmethod
+    def from_geometry(cls, text: str, bbox, confidence: float,
+                      rect: Tuple[int, int, int, int], center: Tuple[int, int]) -> 'TextBox':
+        text_box = cls.__new__(cls)
+        text_box.text = text
+        text_box.bbox = bbox
+        text_box.confidence = confidence
+        text_box._rect = rect
+        text_box.center_x, text_box.center_y = center
+        text_box.width, text_box.height = rect[2], rect[3]
+        return text_box
+
+    def _calculate_center(self) -> Tuple[int, int]:
+        x_coords = [point[0] for point in self.bbox]
+        y_coords = [point[1] for point in self.bbox]
+
+        center_x = int(sum(x_coords) / len(x_coords))
+        center_y = int(sum(y_coords) / len(y_coords))
+
+        return center_x, center_y
+
+    def _calculate_size(self) -> Tuple[int, int]:
+        x_coords = [point[0] for point in self.bbox]
+        y_coords = [point[1] for point in self.bbox]
+
+        width = max(x_coords) - min(x_coords)
+        height = max(y_coords) - min(y_coords)
+
+        return width, height
+
+    def get_rect(self) -> Tuple[int, int, int, int]:
+        if self._rect is not None:
+            return self._rect
+
+        x_coords = [point[0] for point in self.bbox]
+        y_coords = [point[1] for point in self.bbox]
+
+        x = min(x_coords)
+        y = min(y_coords)
+        width = max(x_coords) - x
+        height = max(y_coords) - y
+
+        return x, y, width, height
+
+    def __str__(self):
+        return f"TextBox(text='{self.text}', center=({self.center_x}, {self.center_y}), confidence={self.confidence:.2f})"
+
+
+def _to_quad(poly) -> np.ndarray:
+    points = np.asarray(poly, dtype=np.int32).reshape(-1, 2)
+    if len(points) == 4:
+        return points
+
+    # 非四边形多边形取外接矩形
+    x0, y0 = points.min(axis=0)
+    x1, y1 = points.max(axis=0)
+    return np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], dtype=np.int32)
+
+
+class TextBoxArray:
+
+    def __init__(self, texts: Sequence[str], polys: np.ndarray, scores: np.ndarray,
+                 languages: Optional[Sequence[Optional[str]]] = None):
+        # 一帧的所有文本框按列存储：polys (N,4,2)，几何量一次性向量化计算
+        self.texts = list(texts)
+        # 每个文本框的源语言，由文字系统分类得到，未分类时为 None
+        self.languages = list(languages) if languages is not None else [None] * len(self.texts)
+        self.polys = np.asarray(polys, dtype=np.int32).reshape(-1, 4, 2)
+        self.scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+
+        mins = self.polys.min(axis=1) if len(self.polys) else np.zeros((0, 2), dtype=np.int32)
+        maxs = self.polys.max(axis=1) if len(self.polys) else np.zeros((0, 2), dtype=np.int32)
+        self.rects = np.concatenate([mins, maxs - mins], axis=1)
+        self.centers = self.polys.sum(axis=1) // 4 if len(self.polys) else np.zeros((0, 2), dtype=np.int32)
+
+    @classmethod
+    def empty(cls) -> 'TextBoxArray':
+        return cls([], np.zeros((0, 4, 2), dtype=np.int32), np.zeros(0, dtype=np.float32))
+
+    @classmethod
+    def from_polys(cls, texts: Sequence[str], polys: Sequence, scores: Sequence[float]) -> 'TextBoxArray':
+        if not len(texts):
+            return cls.empty()
+        return cls(texts, np.stack([_to_quad(poly) for poly in polys]), np.asarray(scores, dtype=np.float32))
+
+    @classmethod
+    def from_text_boxes(cls, text_boxes: Sequence[TextBox]) -> 'TextBoxArray':
+        return cls.from_polys(
+            [box.text for box in text_boxes],
+            [box.bbox for box in text_boxes],
+            [box.confidence for box in text_boxes],
+        )
+
+    @staticmethod
+    def concat(arrays: Sequence['TextBoxArray']) -> 'TextBoxArray':
+        arrays = [array for array in arrays if len(array)]
+        if not arrays:
+            return TextBoxArray.empty()
+        if len(arrays) == 1:
+            return arrays[0]
+        return TextBoxArray(
+            [text for array in arrays for text in array.texts],
+            np.concatenate([array.polys for array in arrays]),
+            np.concatenate([array.scores for array in arrays]),
+            [language for array in arrays for language in array.languages],
+        )
+
+    @property
+    def widths(self) -> np.ndarray:
+        return self.rects[:, 2]
+
+    @property
+    def heights(self) -> np.ndarray:
+        return self.rects[:, 3]
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __getitem__(self, index: int) -> TextBox:
+        rect = tuple(self.rects[index].tolist())
+        center = tuple(self.centers[index].tolist())
+        return TextBox.from_geometry(self.texts[index], self.polys[index], float(self.scores[index]), rect, center)
+
+    def __iter__(self) -> Iterator[TextBox]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self):
+        return f"TextBoxArray({self.texts})"
+
+    def filter(self, mask: np.ndarray) -> 'TextBoxArray':
+        if mask.all():
+            return self
+        indices = np.flatnonzero(mask)
+        filtered = TextBoxArray.__new__(TextBoxArray)
+        filtered.texts = [self.texts[index] for index in indices]
+        filtered.languages = [self.languages[index] for index in indices]
+        filtered.polys = self.polys[indices]
+        filtered.scores = self.scores[indices]
+        filtered.rects = self.rects[indices]
+        filtered.centers = self.centers[indices]
+        return filtered
+
+    def confidence_mask(self, min_confidence: float) -> np.ndarray:
+        return self.scores >= min_confidence
+
+    def size_mask(self, min_size: int) -> np.ndarray:
+        return (self.widths >= min_size) & (self.heights >= min_size)
+
+    def set_languages(self, languages: Sequence[Optional[str]]):
+        self.languages = list(languages)
+
+    def language_mask(self, languages: Sequence[str]) -> np.ndarray:
+        return np.fromiter((language in languages for language in self.languages), dtype=bool,
+                           count=len(self.languages))
+
+    def text_mask(self, predicate: Callable[[str], bool]) -> np.ndarray:
+        return np.fromiter((predicate(text) for text in self.texts), dtype=bool, count=len(self.texts))
+
+    def intersects_mask(self, rect: Tuple[int, int, int, int]) -> np.ndarray:
+        x, y, w, h = rect
+        return (
+            (self.rects[:, 0] < x + w) & (x < self.rects[:, 0] + self.rects[:, 2])
+            & (self.rects[:, 1] < y + h) & (y < self.rects[:, 1] + self.rects[:, 3])
+        )
+
+    def center_in_mask(self, rect: Tuple[int, int, int, int]) -> np.ndarray:
+        x, y, w, h = rect
+        return (
+            (self.centers[:, 0] >= x) & (self.centers[:, 0] < x + w)
+            & (self.centers[:, 1] >= y) & (self.centers[:, 1] < y + h)
+        )
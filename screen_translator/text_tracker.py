@@ -0,0 +1,193 @@
+import difflib
+import itertools
+import logging
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from screen_translator.text_boxes import TextBoxArray
+from screen_translator.translator.translation_cache import normalize_text
+
+log = logging.getLogger(__name__)
+
+Rect = Tuple[int, int, int, int]
+
+
+def rect_iou(a: Rect, b: Rect) -> float:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = min(ax + aw, bx + bw) - max(ax, bx)
+    ih = min(ay + ah, by + bh) - max(ay, by)
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    return inter / float(aw * ah + bw * bh - inter)
+
+
+def text_similarity(a: str, b: str) -> float:
+    if a == b:
+        return 1.0
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+class GridIndex:
+
+    def __init__(self, cell_size: int = 128):
+        # 按网格划分屏幕，只在相邻格子里找匹配候选，避免两两比较
+        self.cell_size = max(1, cell_size)
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+
+    def _cells_for(self, rect: Rect) -> Iterator[Tuple[int, int]]:
+        x, y, w, h = rect
+        cx0, cy0 = x // self.cell_size, y // self.cell_size
+        cx1, cy1 = (x + max(w, 1) - 1) // self.cell_size, (y + max(h, 1) - 1) // self.cell_size
+        return itertools.product(range(cx0, cx1 + 1), range(cy0, cy1 + 1))
+
+    def insert(self, item: int, rect: Rect):
+        for cell in self._cells_for(rect):
+            self._cells.setdefault(cell, []).append(item)
+
+    def query(self, rect: Rect) -> Set[int]:
+        items: Set[int] = set()
+        for cell in self._cells_for(rect):
+            items.update(self._cells.get(cell, ()))
+        return items
+
+
+class Track:
+
+    __slots__ = ('track_id', 'text', 'key', 'rect', 'translation', 'age', 'missed')
+
+    def __init__(self, track_id: int, text: str, rect: Rect):
+        self.track_id = track_id
+        self.text = text
+        self.key = normalize_text(text)
+        self.rect = rect
+        self.translation: Optional[str] = None
+        self.age = 0
+        self.missed = 0
+
+
+class TextTracker:
+
+    def __init__(self, iou_threshold: float = 0.3, similarity_threshold: float = 0.6,
+                 max_missed: int = 2, cell_size: int = 128):
+        self.iou_threshold = iou_threshold
+        self.similarity_threshold = similarity_threshold
+        # 连续多少帧未匹配后丢弃轨迹，避免 OCR 偶尔漏检导致重新翻译
+        self.max_missed = max_missed
+        self.cell_size = cell_size
+
+        self.tracks: Dict[int, Track] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+        self.matched = 0
+        self.created = 0
+        self.changed = 0
+
+    def set_thresholds(self, iou_threshold: Optional[float] = None, similarity_threshold: Optional[float] = None):
+        if iou_threshold is not None:
+            self.iou_threshold = iou_threshold
+        if similarity_threshold is not None:
+            self.similarity_threshold = similarity_threshold
+
+    def reset(self):
+        with self._lock:
+            self.tracks.clear()
+
+    def _match(self, texts: Sequence[str], rects: Sequence[Rect], tracks: List[Track]) -> Dict[int, Track]:
+        index = GridIndex(self.cell_size)
+        for idx, track in enumerate(tracks):
+            index.insert(idx, track.rect)
+
+        candidates = []
+        for box_idx, (text, rect) in enumerate(zip(texts, rects)):
+            for track_idx in index.query(rect):
+                track = tracks[track_idx]
+                iou = rect_iou(rect, track.rect)
+                if iou < self.iou_threshold:
+                    continue
+                similarity = text_similarity(normalize_text(text), track.key)
+                if similarity < self.similarity_threshold:
+                    continue
+                candidates.append((iou + similarity, box_idx, track_idx))
+
+        # 按得分从高到低贪心匹配，每个轨迹、每个文本框只匹配一次
+        candidates.sort(reverse=True)
+        matches: Dict[int, Track] = {}
+        used_tracks: Set[int] = set()
+        for _, box_idx, track_idx in candidates:
+            if box_idx in matches or track_idx in used_tracks:
+                continue
+            matches[box_idx] = tracks[track_idx]
+            used_tracks.add(track_idx)
+
+        return matches
+
+    def update(self, text_boxes: TextBoxArray) -> np.ndarray:
+        texts = text_boxes.texts
+        rects = [tuple(rect) for rect in text_boxes.rects.tolist()]
+
+        with self._lock:
+            tracks = list(self.tracks.values())
+            matches = self._match(texts, rects, tracks)
+
+            track_ids = np.zeros(len(texts), dtype=np.int64)
+            seen: Set[int] = set()
+            for box_idx, (text, rect) in enumerate(zip(texts, rects)):
+                track = matches.get(box_idx)
+                if track is None:
+                    track = Track(self._next_id, text, rect)
+                    self._next_id += 1
+                    self.tracks[track.track_id] = track
+                    self.created += 1
+                else:
+                    key = normalize_text(text)
+                    if key != track.key:
+                        # 同一位置文字发生变化（如逐字出现的字幕），保留 ID 但需要重新翻译
+                        track.text, track.key, track.translation = text, key, None
+                        self.changed += 1
+                    track.rect = rect
+                    track.age += 1
+                    track.missed = 0
+                    self.matched += 1
+
+                track_ids[box_idx] = track.track_id
+                seen.add(track.track_id)
+
+            for track in tracks:
+                if track.track_id not in seen:
+                    track.missed += 1
+                    if track.missed > self.max_missed:
+                        del self.tracks[track.track_id]
+
+        return track_ids
+
+    def get_translations(self, track_ids: Sequence[int], texts: Sequence[str]) -> List[Optional[str]]:
+        results: List[Optional[str]] = []
+        with self._lock:
+            for track_id, text in zip(track_ids, texts):
+                track = self.tracks.get(int(track_id))
+                if track is not None and track.key == normalize_text(text):
+                    results.append(track.translation)
+                else:
+                    results.append(None)
+        return results
+
+    def set_translations(self, track_ids: Sequence[int], texts: Sequence[str], translations: Sequence[Optional[str]]):
+        with self._lock:
+            for track_id, text, translation in zip(track_ids, texts, translations):
+                track = self.tracks.get(int(track_id))
+                # 翻译期间轨迹文字可能已变化，只写回仍然对应的轨迹
+                if track is not None and translation and track.key == normalize_text(text):
+                    track.translation = translation
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'tracks': len(self.tracks),
+            'matched': self.matched,
+            'created': self.created,
+            'changed': self.changed,
+        }
@@ -1,50 +1,79 @@
 import hashlib
 import logging
 import random
-import time
 from typing import List, Optional
 
 import httpx
-from screen_translator.translator.translator import TranslatorBase, create_default_translator
+from screen_translator.translator.http_translator import HttpTranslatorBase
+from screen_translator.translator.rate_limiter import AdaptiveRateLimiter
 
 log = logging.getLogger(__name__)
 
-class BaiduTranslator(TranslatorBase):
+class BaiduTranslator(HttpTranslatorBase):
 
-    def __init__(self, app_id: str, secret_key: str):
+    # 百度接口建议单次请求 q 不超过 6000 字节
+    max_query_bytes = 6000
+    # 标准版 QPS 为 1
+    default_rate_limit = {'rate': 1.0, 'burst': 1}
+    # 54003: 访问频率受限
+    rate_limit_error_codes = {'54003'}
+    # 通用语言代码 -> 百度语言代码，覆盖 ScriptClassifier 可能给出的所有语言
+    language_codes = {
+        'auto': 'auto', 'zh': 'zh', 'zh-cn': 'zh', 'zh-tw': 'cht', 'zh-hant': 'cht', 'yue': 'yue',
+        'en': 'en', 'ja': 'jp', 'ko': 'kor', 'fr': 'fra', 'es': 'spa', 'th': 'th', 'ar': 'ara',
+        'ru': 'ru', 'pt': 'pt', 'de': 'de', 'it': 'it', 'el': 'el', 'nl': 'nl', 'pl': 'pl',
+        'bg': 'bul', 'et': 'est', 'da': 'dan', 'fi': 'fin', 'cs': 'cs', 'ro': 'rom', 'sl': 'slo',
+        'sv': 'swe', 'hu': 'hu', 'vi': 'vie', 'uk': 'ukr', 'he': 'heb', 'hi': 'hi',
+    }
+
+    def __init__(self, app_id: str, secret_key: str, max_concurrency: int = 5,
+                 transport: Optional[httpx.BaseTransport] = None,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None):
         self.app_id = app_id
         self.secret_key = secret_key
         self.base_url = "https://fanyi-api.baidu.com/api/trans/vip/translate"
+        super().__init__(max_concurrency, transport, rate_limiter=rate_limiter)
+
+    @property
+    def rate_limit_key(self) -> str:
+        return f"{self.__class__.__name__}:{self.app_id}"
 
     def _generate_sign(self, query: str, salt: str) -> str:
         sign_str = self.app_id + query + salt + self.secret_key
         return hashlib.md5(sign_str.encode('utf-8')).hexdigest()
 
-    def translate(self, text: str, target_lang: str = 'zh') -> Optional[str]:
-        if not text.strip():
-            return None
-
+    def _request(self, query: str, target_lang: str, source_lang: str = 'auto') -> Optional[List[str]]:
         try:
-            salt = str(random.randint(32768, 65536))
-            sign = self._generate_sign(text, salt)
+            for attempt in range(self.rate_limit_retries + 1):
+                salt = str(random.randint(32768, 65536))
+                sign = self._generate_sign(query, salt)
+
+                params = {
+                    'q': query,
+                    'from': source_lang,
+                    'to': target_lang,
+                    'appid': self.app_id,
+                    'salt': salt,
+                    'sign': sign
+                }
 
-            params = {
-                'q': text,
-                'from': 'auto',
-                'to': target_lang,
-                'appid': self.app_id,
-                'salt': salt,
-                'sign': sign
-            }
+                self.rate_limiter.acquire()
+                # 打包后的查询可能较长，使用 POST 避免 URL 超长
+                response = self.client.post(self.base_url, data=params)
 
-            with httpx.Client(timeout=10.0) as client:
-                response = client.get(self.base_url, params=params)
+                if response.status_code == 429:
+                    self.rate_limiter.on_rate_limited()
+                    continue
 
                 if response.status_code == 200:
                     result = response.json()
 
                     if 'trans_result' in result:
-                        return result['trans_result'][0]['dst']
+                        self.rate_limiter.on_success()
+                        return [item['dst'] for item in result['trans_result']]
+                    elif str(result.get('error_code')) in self.rate_limit_error_codes:
+                        self.rate_limiter.on_rate_limited()
+                        continue
                     else:
                         log.info(f"Baidu translation error: {result}")
                         return None
@@ -52,14 +81,97 @@ class BaiduTranslator(TranslatorBase):
                     log.info(f"Baidu translation request failed: {response.status_code}")
                     return None
 
+            log.info("Baidu translation rate limited")
+            return None
+
         except Exception as e:
             log.info(f"Baidu translation exception: {e}")
             return None
 
-    def translate_batch(self, texts: List[str], target_lang: str = 'zh') -> List[Optional[str]]:
-        results = []
+    def _language_code(self, lang: str) -> Optional[str]:
+        lang = lang.lower()
+        if lang in self.language_codes:
+            return self.language_codes[lang]
+        # 已经是百度语言代码（如 jp、kor）时直接使用
+        return lang if lang in self.language_codes.values() else None
+
+    def _pack_lines(self, lines: List[str]) -> List[List[int]]:
+        packs: List[List[int]] = []
+        current: List[int] = []
+        current_size = 0
+
+        for idx, line in enumerate(lines):
+            size = len(line.encode('utf-8'))
+            if current and current_size + 1 + size > self.max_query_bytes:
+                packs.append(current)
+                current = []
+                current_size = 0
+
+            current_size += size + (1 if current else 0)
+            current.append(idx)
+
+        if current:
+            packs.append(current)
+
+        return packs
+
+    def translate(self, text: str, target_lang: str = 'zh', source_lang: str = 'auto') -> Optional[str]:
+        if not text.strip():
+            return None
+
+        return self.translate_batch([text], target_lang, source_lang)[0]
+
+    def translate_batch(self, texts: List[str], target_lang: str = 'zh',
+                        source_lang: str = 'auto') -> List[Optional[str]]:
+        target_code = self._language_code(target_lang)
+        if target_code is None:
+            log.info(f"Baidu translation does not support target language {target_lang}")
+            return [None] * len(texts)
+
+        source_code = self._language_code(source_lang)
+        if source_code is None:
+            # 不支持的源语言交给百度自动检测，而不是发送无效的语言代码
+            log.info(f"Baidu translation does not support source language {source_lang}, using auto")
+            source_code = 'auto'
+        target_lang, source_lang = target_code, source_code
+
+        # 百度接口按换行拆分查询，每行返回一条结果，文本自身的换行也按行拆开，翻译后再拼回
+        lines: List[str] = []
+        layouts: List[List[Optional[int]]] = []
         for text in texts:
-            result = self.translate(text, target_lang)
-            results.append(result)
-            time.sleep(0.1)
+            layout = []
+            for line in text.splitlines():
+                if line.strip():
+                    layout.append(len(lines))
+                    lines.append(line.strip())
+                else:
+                    layout.append(None)
+            layouts.append(layout)
+
+        translated: List[Optional[str]] = [None] * len(lines)
+
+        packs = self._pack_lines(lines)
+        queries = ['\n'.join(lines[idx] for idx in pack) for pack in packs]
+        if len(queries) > 1 and self.max_concurrency > 1:
+            responses = list(self._get_executor().map(lambda query: self._request(query, target_lang, source_lang), queries))
+        else:
+            responses = [self._request(query, target_lang, source_lang) for query in queries]
+
+        for pack, response in zip(packs, responses):
+            if response is None:
+                continue
+            if len(response) != len(pack):
+                log.info(f"Baidu translation returned {len(response)} lines for {len(pack)} queries")
+                continue
+            for idx, dst in zip(pack, response):
+                translated[idx] = dst
+
+        results: List[Optional[str]] = []
+        for layout in layouts:
+            line_indices = [idx for idx in layout if idx is not None]
+            if not line_indices or any(translated[idx] is None for idx in line_indices):
+                results.append(None)
+                continue
+            results.append('\n'.join('' if idx is None else translated[idx] for idx in layout))
+
         return results
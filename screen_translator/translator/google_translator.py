@@ -1,25 +1,29 @@
 import logging
-import time
-from typing import List, Optional
+from typing import Optional
 
 import httpx
-from screen_translator.translator.translator import TranslatorBase, create_default_translator
+from screen_translator.translator.http_translator import HttpTranslatorBase
+from screen_translator.translator.rate_limiter import AdaptiveRateLimiter
 
 log = logging.getLogger(__name__)
 
-class GoogleTranslator(TranslatorBase):
+class GoogleTranslator(HttpTranslatorBase):
 
-    def __init__(self):
+    default_rate_limit = {'rate': 10.0, 'burst': 5}
+
+    def __init__(self, max_concurrency: int = 5, transport: Optional[httpx.BaseTransport] = None,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None):
+        super().__init__(max_concurrency, transport, rate_limiter=rate_limiter)
         self.base_url = "https://translate.googleapis.com/translate_a/single"
 
-    def translate(self, text: str, target_lang: str = 'zh') -> Optional[str]:
+    def translate(self, text: str, target_lang: str = 'zh', source_lang: str = 'auto') -> Optional[str]:
         if not text.strip():
             return None
 
         try:
             params = {
                 'client': 'gtx',
-                'sl': 'auto',
+                'sl': source_lang,
                 'tl': target_lang,
                 'dt': 't',
                 'q': text
@@ -29,10 +33,16 @@ class GoogleTranslator(TranslatorBase):
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
 
-            with httpx.Client(timeout=10.0) as client:
-                response = client.get(self.base_url, params=params, headers=headers)
+            for attempt in range(self.rate_limit_retries + 1):
+                self.rate_limiter.acquire()
+                response = self.client.get(self.base_url, params=params, headers=headers)
+
+                if response.status_code == 429:
+                    self.rate_limiter.on_rate_limited()
+                    continue
 
                 if response.status_code == 200:
+                    self.rate_limiter.on_success()
                     result = response.json()
 
                     if result and result[0]:
@@ -44,14 +54,9 @@ class GoogleTranslator(TranslatorBase):
                     log.info(f"Google translation request failed: {response.status_code}")
                     return None
 
+            log.info("Google translation rate limited")
+            return None
+
         except Exception as e:
             log.info(f"Google translation exception: {e}")
             return None
-
-    def translate_batch(self, texts: List[str], target_lang: str = 'zh') -> List[Optional[str]]:
-        results = []
-        for text in texts:
-            result = self.translate(text, target_lang)
-            results.append(result)
-            time.sleep(0.1)
-        return results
@@ -0,0 +1,69 @@
+import importlib.util
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from screen_translator.translator.rate_limiter import AdaptiveRateLimiter, get_rate_limiter
+from screen_translator.translator.translator import TranslatorBase
+
+log = logging.getLogger(__name__)
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class HttpTranslatorBase(TranslatorBase):
+
+    default_rate_limit: Dict[str, Any] = {'rate': 10.0, 'burst': 1}
+    rate_limit_retries = 1
+
+    def __init__(self, max_concurrency: int = 5, transport: Optional[httpx.BaseTransport] = None,
+                 timeout: float = 10.0, rate_limiter: Optional[AdaptiveRateLimiter] = None):
+        self.max_concurrency = max(1, max_concurrency)
+        # 同一后端的所有实例共享一个限速器
+        self.rate_limiter = rate_limiter or get_rate_limiter(self.rate_limit_key, **self.default_rate_limit)
+
+        # 长连接复用，避免每次请求都重新建立 TCP/TLS 连接
+        self.client = httpx.Client(
+            timeout=timeout,
+            transport=transport,
+            http2=transport is None and http2_available(),
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+        )
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def rate_limit_key(self) -> str:
+        return self.__class__.__name__
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix=self.__class__.__name__,
+                )
+            return self._executor
+
+    def translate_batch(self, texts: List[str], target_lang: str = 'zh',
+                        source_lang: str = 'auto') -> List[Optional[str]]:
+        if len(texts) <= 1 or self.max_concurrency == 1:
+            return [self.translate(text, target_lang, source_lang) for text in texts]
+
+        return list(self._get_executor().map(lambda text: self.translate(text, target_lang, source_lang), texts))
+
+    def close(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+        self.client.close()
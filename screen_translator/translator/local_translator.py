@@ -1,28 +1,139 @@
 import hashlib
 import logging
+import threading
 from typing import List, Optional
 
+import torch
 from transformers import MarianMTModel, MarianTokenizer
+from screen_translator.startup_timing import startup_timer
 from screen_translator.translator.translator import TranslatorBase
 
 log = logging.getLogger(__name__)
 
 
+def make_length_buckets(lengths: List[int], max_batch_size: int, max_batch_tokens: int) -> List[List[int]]:
+    # 按长度排序后分桶，避免短句被长句填充；每桶的 padding 后 token 数不超过 max_batch_tokens
+    order = sorted(range(len(lengths)), key=lambda idx: lengths[idx])
+
+    buckets: List[List[int]] = []
+    current: List[int] = []
+    for idx in order:
+        padded_tokens = lengths[idx] * (len(current) + 1)
+        if current and (len(current) >= max_batch_size or padded_tokens > max_batch_tokens):
+            buckets.append(current)
+            current = []
+        current.append(idx)
+
+    if current:
+        buckets.append(current)
+
+    return buckets
+
 
 class LocalTranslator(TranslatorBase):
 
     model_name = "Helsinki-NLP/opus-mt-en-zh"
+    # torch: 原始精度；torch-int8: 动态 int8 量化；onnx: 导出的 ONNX 模型（onnxruntime）
+    engines = ('torch', 'torch-int8', 'onnx')
+
+    def __init__(self, model_name: Optional[str] = None, num_beams: Optional[int] = None,
+                 max_new_tokens: Optional[int] = None, num_threads: Optional[int] = None,
+                 max_batch_size: int = 16, max_batch_tokens: int = 2048,
+                 engine: str = 'torch', model_dir: Optional[str] = None, load: bool = True):
+        if engine not in self.engines:
+            raise ValueError(f"Unsupported local translator engine: {engine}")
+        if engine == 'onnx' and not model_dir:
+            # Hub 上的模型没有 ONNX 权重，需要先导出到本地目录
+            raise ValueError("The onnx engine requires model_dir pointing to an exported ONNX model")
+
+        if model_name:
+            self.model_name = model_name
+        self.engine = engine
+        self.model_dir = model_dir
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_batch_tokens = max_batch_tokens
+
+        self.generate_kwargs = {}
+        if num_beams is not None:
+            self.generate_kwargs['num_beams'] = num_beams
+        if max_new_tokens is not None:
+            self.generate_kwargs['max_new_tokens'] = max_new_tokens
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+
+        self.tokenizer = None
+        self.model = None
+        self._load_lock = threading.Lock()
+
+        if load:
+            self.load()
+
+    def load(self):
+        with self._load_lock:
+            if self.model is not None:
+                return
+
+            # 指定 model_dir 时只从本地目录加载，不访问网络
+            source = self.model_dir or self.model_name
+            local_files_only = self.model_dir is not None
+
+            with startup_timer.measure("init", f"{self.model_name} ({self.engine})"):
+                self.tokenizer = MarianTokenizer.from_pretrained(source, local_files_only=local_files_only)
+                self.model = self._load_model(source, local_files_only)
+            log.info(f"{self.model_name} model loaded, engine: {self.engine}.")
+
+    def warm_up(self):
+        self.load()
+        with startup_timer.measure("warmup", self.model_name):
+            self.translate_batch(["Hello, welcome to the game."])
+
+    def _load_model(self, source: str, local_files_only: bool):
+        if self.engine == 'onnx':
+            try:
+                from optimum.onnxruntime import ORTModelForSeq2SeqLM
+            except ImportError as e:
+                raise ImportError(
+                    "The onnx engine requires optimum[onnxruntime]; install the 'onnx' extra "
+                    "(uv sync --extra onnx / pip install 'screen-translate[onnx]')"
+                ) from e
+
+            return ORTModelForSeq2SeqLM.from_pretrained(source, local_files_only=local_files_only)
+
+        model = MarianMTModel.from_pretrained(source, local_files_only=local_files_only)
+        model.eval()
+
+        if self.engine == 'torch-int8':
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+        return model
+
+    @property
+    def cache_name(self) -> str:
+        if self.engine == 'torch':
+            return f"{self.__class__.__name__}:{self.model_name}"
+        return f"{self.__class__.__name__}:{self.model_name}:{self.engine}"
+
+    def translate(self, text: str, target_lang: str = 'zh', source_lang: str = 'auto') -> Optional[str]:
+        return self.translate_batch([text], target_lang, source_lang)[0]
+
+    def translate_batch(self, texts: List[str], target_lang: str = 'zh',
+                        source_lang: str = 'auto') -> List[Optional[str]]:
+        results: List[Optional[str]] = [None] * len(texts)
+        if not texts:
+            return results
+
+        self.load()
 
-    def __init__(self):
-        self.tokenizer = MarianTokenizer.from_pretrained(self.model_name)
-        self.model = MarianMTModel.from_pretrained(self.model_name)
-        log.info(f"{self.model_name} model loaded.")
+        input_ids = self.tokenizer(texts, truncation=True)['input_ids']
+        buckets = make_length_buckets([len(ids) for ids in input_ids], self.max_batch_size, self.max_batch_tokens)
 
-    def translate(self, text: str, target_lang: str = 'zh') -> Optional[str]:
-        return self.translate_batch([text], target_lang)[0]
+        for bucket in buckets:
+            batch = self.tokenizer.pad({'input_ids': [input_ids[idx] for idx in bucket]}, return_tensors="pt")
+            with torch.inference_mode():
+                gen = self.model.generate(**batch, **self.generate_kwargs)
+            translated = self.tokenizer.batch_decode(gen, skip_special_tokens=True)
+            for idx, text in zip(bucket, translated):
+                results[idx] = text
 
-    def translate_batch(self, texts: List[str], target_lang: str = 'zh') -> List[Optional[str]]:
-        batch = self.tokenizer(texts, return_tensors="pt", padding=True)
-        gen = self.model.generate(**batch)
-        translated = [self.tokenizer.decode(t, skip_special_tokens=True) for t in gen]
-        return translated
\ No newline at end of file
+        return results
@@ -1,8 +1,6 @@
-import hashlib
 import logging
 from typing import List, Optional
 
-from transformers import MarianMTModel, MarianTokenizer
 from screen_translator.translator.translator import TranslatorBase
 
 log = logging.getLogger(__name__)
@@ -10,8 +8,9 @@ log = logging.getLogger(__name__)
 
 class NoTranslator(TranslatorBase):
 
-    def translate(self, text: str, target_lang: str = 'zh') -> Optional[str]:
+    def translate(self, text: str, target_lang: str = 'zh', source_lang: str = 'auto') -> Optional[str]:
         return f"[translate]{text}"
 
-    def translate_batch(self, texts: List[str], target_lang: str = 'zh') -> List[Optional[str]]:
+    def translate_batch(self, texts: List[str], target_lang: str = 'zh',
+                        source_lang: str = 'auto') -> List[Optional[str]]:
         return [f"[translate]{x}" for x in texts]
\ No newline at end of file
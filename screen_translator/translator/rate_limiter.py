@@ -0,0 +1,77 @@
+import logging
+import threading
+import time
+from typing import Dict
+
+log = logging.getLogger(__name__)
+
+
+class AdaptiveRateLimiter:
+
+    def __init__(self, rate: float = 10.0, burst: int = 1, min_rate: float = 0.2,
+                 backoff_factor: float = 0.5, recovery_step: float = 0.5):
+        # rate 为上限速率（次/秒），触发限流时乘以 backoff_factor 降速，
+        # 之后每成功一次按 recovery_step 线性恢复（AIMD）
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min(min_rate, rate)
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step
+
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+
+        self.total_wait = 0.0
+        self.rate_limited = 0
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+
+    def acquire(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            # 先预留令牌，在锁外等待，避免阻塞其他调用方
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.total_wait += wait
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            if self.rate < self.max_rate:
+                # 每秒约恢复 recovery_step 次/秒
+                self.rate = min(self.max_rate, self.rate + self.recovery_step / self.rate)
+
+    def on_rate_limited(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+            self._tokens = min(self._tokens, 0.0)
+            self.rate_limited += 1
+            log.info(f"Rate limited by backend, slowing down to {self.rate:.2f} req/s")
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            'rate': self.rate,
+            'rate_limited': self.rate_limited,
+            'total_wait': self.total_wait,
+        }
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, **kwargs) -> AdaptiveRateLimiter:
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = AdaptiveRateLimiter(**kwargs)
+            _limiters[name] = limiter
+        return limiter
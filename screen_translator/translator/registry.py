@@ -0,0 +1,82 @@
+import logging
+from typing import Callable, Dict
+
+from screen_translator.config import AppConfig, GoogleConfig, LocalConfig
+from screen_translator.startup_timing import startup_timer, timed_import
+from screen_translator.translator.translator import TranslatorBase
+
+log = logging.getLogger(__name__)
+
+
+TranslatorFactory = Callable[[AppConfig], TranslatorBase]
+
+
+def _create_baidu(config: AppConfig) -> TranslatorBase:
+    if not config.translator.baidu:
+        log.info("Baidu translator selected but not configured, falling back to no translator")
+        return _create_no(config)
+
+    baidu_translator = timed_import("screen_translator.translator.baidu_translator")
+    rate_limiter = timed_import("screen_translator.translator.rate_limiter")
+
+    baidu_config = config.translator.baidu
+    return baidu_translator.BaiduTranslator(
+        baidu_config.baidu_app_id,
+        baidu_config.baidu_secret_key,
+        config.max_concurrent_translations,
+        rate_limiter=rate_limiter.get_rate_limiter(
+            f"BaiduTranslator:{baidu_config.baidu_app_id}", **baidu_config.rate_limit.model_dump()
+        ),
+    )
+
+
+def _create_google(config: AppConfig) -> TranslatorBase:
+    google_translator = timed_import("screen_translator.translator.google_translator")
+    rate_limiter = timed_import("screen_translator.translator.rate_limiter")
+
+    google_config = config.translator.google or GoogleConfig()
+    return google_translator.GoogleTranslator(
+        config.max_concurrent_translations,
+        rate_limiter=rate_limiter.get_rate_limiter("GoogleTranslator", **google_config.rate_limit.model_dump()),
+    )
+
+
+def _create_local(config: AppConfig) -> TranslatorBase:
+    local_translator = timed_import("screen_translator.translator.local_translator")
+
+    local_config = config.translator.local or LocalConfig()
+    return local_translator.LocalTranslator(
+        local_config.model,
+        num_beams=local_config.num_beams,
+        max_new_tokens=local_config.max_new_tokens,
+        num_threads=local_config.num_threads,
+        max_batch_size=local_config.max_batch_size,
+        max_batch_tokens=local_config.max_batch_tokens,
+        engine=local_config.engine,
+        model_dir=local_config.model_dir,
+        load=False,
+    )
+
+
+def _create_no(config: AppConfig) -> TranslatorBase:
+    no_translator = timed_import("screen_translator.translator.no_translator")
+    return no_translator.NoTranslator()
+
+
+# 翻译器类型 -> 工厂函数，只有被配置选中的后端才会导入其依赖
+TRANSLATOR_FACTORIES: Dict[str, TranslatorFactory] = {
+    'baidu': _create_baidu,
+    'google': _create_google,
+    'local': _create_local,
+    'no': _create_no,
+}
+
+
+def register_translator(type_name: str, factory: TranslatorFactory):
+    TRANSLATOR_FACTORIES[type_name] = factory
+
+
+def create_translator(config: AppConfig) -> TranslatorBase:
+    factory = TRANSLATOR_FACTORIES.get(config.translator.type, _create_no)
+    with startup_timer.measure("init", f"translator {config.translator.type}"):
+        return factory(config)
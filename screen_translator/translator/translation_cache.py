@@ -0,0 +1,179 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+
+CacheKey = Tuple[str, str, str, str]
+
+
+def normalize_text(text: str) -> str:
+    return ' '.join(text.split())
+
+
+def make_cache_key(backend: str, source_lang: str, target_lang: str, text: str) -> CacheKey:
+    return backend, source_lang, target_lang, normalize_text(text)
+
+
+class MemoryTranslationCache:
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 0, ttl: float = 0.0):
+        # max_bytes / ttl 为 0 表示不限制
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._entries: OrderedDict[CacheKey, Tuple[str, float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def set_limits(self, max_entries: int, max_bytes: int = 0, ttl: float = 0.0):
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self.ttl = ttl
+            self._evict()
+
+    @staticmethod
+    def _entry_size(key: CacheKey, value: str) -> int:
+        return sum(len(part.encode('utf-8')) for part in key) + len(value.encode('utf-8'))
+
+    def _remove(self, key: CacheKey):
+        _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def _evict(self):
+        while self._entries and (
+            (self.max_entries and len(self._entries) > self.max_entries)
+            or (self.max_bytes and self.current_bytes > self.max_bytes)
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, stored_at, _ = entry
+            if self.ttl and time.monotonic() - stored_at > self.ttl:
+                self._remove(key)
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: CacheKey, value: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            size = self._entry_size(key, value)
+            self._entries[key] = (value, time.monotonic(), size)
+            self.current_bytes += size
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: CacheKey) -> bool:
+        return key in self._entries
+
+    def get_stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class PersistentTranslationCache:
+
+    def __init__(self, path: str):
+        self.path = path
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # WAL 模式下多个进程可以同时读，写入时通过 busy_timeout 等待
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS translations (
+                backend TEXT NOT NULL,
+                source_lang TEXT NOT NULL,
+                target_lang TEXT NOT NULL,
+                text TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (backend, source_lang, target_lang, text)
+            ) WITHOUT ROWID
+            """
+        )
+
+        log.info(f"Persistent translation cache opened: {path}")
+
+    def get(self, backend: str, source_lang: str, target_lang: str, text: str) -> Optional[str]:
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT translation FROM translations "
+                    "WHERE backend = ? AND source_lang = ? AND target_lang = ? AND text = ?",
+                    (backend, source_lang, target_lang, normalize_text(text)),
+                ).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            log.info(f"Persistent cache read failed: {e}")
+            return None
+
+    def set(self, backend: str, source_lang: str, target_lang: str, text: str, translation: str):
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO translations "
+                    "(backend, source_lang, target_lang, text, translation, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (backend, source_lang, target_lang, normalize_text(text), translation, time.time()),
+                )
+        except sqlite3.Error as e:
+            log.info(f"Persistent cache write failed: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM translations")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,8 +1,15 @@
 import logging
+import time
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional
 
-import httpx
+from screen_translator.metrics import metrics
+from screen_translator.translator.translation_cache import (
+    MemoryTranslationCache,
+    PersistentTranslationCache,
+    make_cache_key,
+    normalize_text,
+)
 
 log = logging.getLogger(__name__)
 
@@ -10,11 +17,19 @@ log = logging.getLogger(__name__)
 class TranslatorBase(ABC):
 
     @abstractmethod
-    def translate(self, text: str, target_lang: str = 'zh') -> Optional[str]:
+    def translate(self, text: str, target_lang: str = 'zh', source_lang: str = 'auto') -> Optional[str]:
         pass
 
     @abstractmethod
-    def translate_batch(self, texts: List[str], target_lang: str = 'zh') -> List[Optional[str]]:
+    def translate_batch(self, texts: List[str], target_lang: str = 'zh',
+                        source_lang: str = 'auto') -> List[Optional[str]]:
+        pass
+
+    @property
+    def cache_name(self) -> str:
+        return self.__class__.__name__
+
+    def warm_up(self):
         pass
 
 
@@ -26,8 +41,9 @@ class TranslatorManager:
         self.translators: List[TranslatorBase] = []
         self.current_translator_index = 0
 
-        self.translation_cache: Dict[str, str] = {}
+        self.translation_cache = MemoryTranslationCache()
         self.cache_enabled = True
+        self.persistent_cache: Optional[PersistentTranslationCache] = None
 
     def add_translator(self, translator: TranslatorBase):
         self.translators.append(translator)
@@ -35,41 +51,155 @@ class TranslatorManager:
     def set_cache_enabled(self, enabled: bool):
         self.cache_enabled = enabled
 
+    def warm_up(self):
+        for translator in self.translators:
+            try:
+                translator.warm_up()
+            except Exception as e:
+                log.info(f"Translator {translator.__class__.__name__} warm-up failed: {e}")
+
+    def set_cache_limits(self, max_entries: int, max_bytes: int = 0, ttl: float = 0.0):
+        self.translation_cache.set_limits(max_entries, max_bytes, ttl)
+
+    def get_cache_stats(self) -> Dict[str, float]:
+        return self.translation_cache.get_stats()
+
+    def set_persistent_cache(self, path: Optional[str]):
+        if self.persistent_cache is not None:
+            self.persistent_cache.close()
+            self.persistent_cache = None
+
+        if path:
+            try:
+                self.persistent_cache = PersistentTranslationCache(path)
+            except Exception as e:
+                log.info(f"Failed to open persistent translation cache {path}: {e}")
+
     def clear_cache(self):
         self.translation_cache.clear()
 
-    def translate(self, text: str, target_lang: str = 'zh') -> Optional[str]:
-        if not text.strip():
-            return None
+    def _active_backend(self) -> str:
+        if not self.translators:
+            return ''
+        return self.translators[self.current_translator_index].cache_name
+
+    def _cache_get(self, text: str, target_lang: str, source_lang: str = 'auto') -> Optional[str]:
+        key = make_cache_key(self._active_backend(), source_lang, target_lang, text)
 
-        cache_key = f"{text}_{target_lang}"
-        if self.cache_enabled and cache_key in self.translation_cache:
-            return self.translation_cache[cache_key]
+        cached = self.translation_cache.get(key)
+        if cached is None and self.persistent_cache is not None and self.translators:
+            cached = self.persistent_cache.get(*key)
+            if cached:
+                self.translation_cache.set(key, cached)
 
+        return cached
+
+    def _cache_set(self, translator: TranslatorBase, text: str, target_lang: str, result: str,
+                   source_lang: str = 'auto'):
+        key = make_cache_key(translator.cache_name, source_lang, target_lang, text)
+
+        self.translation_cache.set(key, result)
+        if self.persistent_cache is not None:
+            self.persistent_cache.set(*key, result)
+
+    def _translate_uncached(self, text: str, target_lang: str, source_lang: str = 'auto',
+                           exclude_index: Optional[int] = None) -> Optional[str]:
         for i in range(len(self.translators)):
             translator_index = (self.current_translator_index + i) % len(self.translators)
+            if translator_index == exclude_index:
+                continue
             translator = self.translators[translator_index]
 
             try:
-                result = translator.translate(text, target_lang)
+                start = time.perf_counter()
+                result = translator.translate(text, target_lang, source_lang)
+                metrics.observe('translation_seconds', time.perf_counter() - start,
+                                {'backend': translator.__class__.__name__})
                 if result:
                     self.current_translator_index = translator_index
 
                     if self.cache_enabled:
-                        self.translation_cache[cache_key] = result
+                        self._cache_set(translator, text, target_lang, result, source_lang)
 
                     return result
             except Exception as e:
+                metrics.inc('translation_errors_total', labels={'backend': translator.__class__.__name__})
                 log.info(f"Translator {translator.__class__.__name__} failed: {e}")
                 continue
 
         return None
 
-    def translate_batch(self, texts: List[str], target_lang: str = 'zh') -> List[Optional[str]]:
+    def translate(self, text: str, target_lang: str = 'zh', source_lang: str = 'auto') -> Optional[str]:
+        if not text.strip():
+            return None
+
+        if self.cache_enabled:
+            cached = self._cache_get(text, target_lang, source_lang)
+            if cached:
+                return cached
+
+        return self._translate_uncached(text, target_lang, source_lang)
+
+    def _translate_misses(self, texts: List[str], target_lang: str, source_lang: str) -> List[Optional[str]]:
+        # 记下本批使用的翻译器，逐条回退时 current_translator_index 可能会变
+        batch_index = self.current_translator_index
+        translator = self.translators[batch_index]
+
+        try:
+            start = time.perf_counter()
+            translated = translator.translate_batch(texts, target_lang, source_lang)
+            metrics.observe('translation_seconds', time.perf_counter() - start,
+                            {'backend': translator.__class__.__name__})
+            if len(translated) != len(texts):
+                raise ValueError(f"expected {len(texts)} results, got {len(translated)}")
+        except Exception as e:
+            metrics.inc('translation_errors_total', labels={'backend': translator.__class__.__name__})
+            log.info(f"Translator {translator.__class__.__name__} batch failed: {e}")
+            translated = [None] * len(texts)
+
         results = []
-        for text in texts:
-            result = self.translate(text, target_lang)
+        for text, result in zip(texts, translated):
+            if result:
+                if self.cache_enabled:
+                    self._cache_set(translator, text, target_lang, result, source_lang)
+            else:
+                # 批量翻译失败的条目逐条交给下一个翻译器
+                result = self._translate_uncached(text, target_lang, source_lang, exclude_index=batch_index)
             results.append(result)
+
+        return results
+
+    def translate_batch(self, texts: List[str], target_lang: str = 'zh',
+                        source_lang: str = 'auto') -> List[Optional[str]]:
+        results: List[Optional[str]] = [None] * len(texts)
+
+        positions: Dict[str, List[int]] = {}
+        unique_texts: Dict[str, str] = {}
+        for idx, text in enumerate(texts):
+            if not text.strip():
+                continue
+            key = normalize_text(text)
+            positions.setdefault(key, []).append(idx)
+            unique_texts.setdefault(key, text)
+
+        lookup_start = time.perf_counter()
+        misses = []
+        for key, text in unique_texts.items():
+            cached = self._cache_get(text, target_lang, source_lang) if self.cache_enabled else None
+            if cached:
+                for idx in positions[key]:
+                    results[idx] = cached
+            else:
+                misses.append(key)
+        if self.cache_enabled:
+            metrics.observe('cache_lookup_seconds', time.perf_counter() - lookup_start)
+
+        if misses and self.translators:
+            translated = self._translate_misses([unique_texts[key] for key in misses], target_lang, source_lang)
+            for key, result in zip(misses, translated):
+                for idx in positions[key]:
+                    results[idx] = result
+
         return results
 
 
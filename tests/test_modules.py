@@ -103,3 +103,1043 @@ def test_display_manager():
         log.info(f"✗ Display manager test failed: {e}")
         return False
 
+
+
+def test_frame_change_detector():
+    log.info("\n=== Testing Frame Change Detector ===")
+    import numpy as np
+    from screen_translator.frame_diff import FrameChangeDetector
+
+    detector = FrameChangeDetector(threshold=0.0005)
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+
+    assert detector.has_changed(frame)
+    assert not detector.has_changed(frame.copy())
+
+    changed = frame.copy()
+    changed[500:540, 800:1000] = 255
+    assert detector.has_changed(changed)
+    assert not detector.has_changed(changed)
+
+
+def test_tile_change_regions():
+    log.info("\n=== Testing Tile Change Detector ===")
+    import numpy as np
+    from screen_translator.frame_diff import TileChangeDetector, expand_rects
+
+    detector = TileChangeDetector(tile_size=100)
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+
+    assert detector.changed_regions(frame) is None
+    assert detector.changed_regions(frame.copy()) == []
+
+    changed = frame.copy()
+    changed[950:1000, 1850:1900] = 255
+    changed[120:150, 210:390] = 255
+    regions = sorted(detector.changed_regions(changed))
+    assert regions == [(200, 100, 200, 100), (1800, 900, 100, 100)]
+
+    crops = expand_rects(regions, 32, 1920, 1080)
+    assert (1768, 868, 152, 164) in crops
+
+
+def test_pipeline_latest_queue():
+    log.info("\n=== Testing Pipeline Queues ===")
+    from screen_translator.pipeline import LatestQueue, StageWorker
+
+    queue = LatestQueue('ocr', maxsize=1)
+    for frame in range(3):
+        queue.put(frame)
+    assert queue.get_stats() == {'depth': 1, 'total': 3, 'dropped': 2}
+    assert queue.get(timeout=0.1) == 2
+    assert queue.get(timeout=0.01) is None
+
+    output = LatestQueue('translate', maxsize=4)
+    worker = StageWorker('double', queue, lambda x: x * 2, output)
+    worker.start()
+    queue.put(21)
+    assert output.get(timeout=2) == 42
+    worker.stop()
+    worker.join(timeout=2)
+    assert not worker.is_alive()
+
+
+def test_persistent_translation_cache(tmp_path):
+    log.info("\n=== Testing Persistent Translation Cache ===")
+    from screen_translator.translator.no_translator import NoTranslator
+    from screen_translator.translator.translation_cache import PersistentTranslationCache
+    from screen_translator.translator.translator import create_default_translator
+
+    path = str(tmp_path / "translations.db")
+
+    translator = create_default_translator()
+    translator.add_translator(NoTranslator())
+    translator.set_persistent_cache(path)
+    assert translator.translate("Start  Game") == "[translate]Start  Game"
+    translator.persistent_cache.close()
+
+    cache = PersistentTranslationCache(path)
+    assert cache.get("NoTranslator", "auto", "zh", "Start Game") == "[translate]Start  Game"
+    assert cache.get("NoTranslator", "auto", "en", "Start Game") is None
+    assert len(cache) == 1
+    cache.close()
+
+
+def test_memory_translation_cache():
+    log.info("\n=== Testing Memory Translation Cache ===")
+    from screen_translator.translator.translation_cache import MemoryTranslationCache, make_cache_key
+
+    cache = MemoryTranslationCache(max_entries=2)
+    first = make_cache_key("NoTranslator", "auto", "zh", "Hello")
+    second = make_cache_key("NoTranslator", "auto", "zh", "World")
+    third = make_cache_key("NoTranslator", "auto", "zh", "Game")
+
+    cache.set(first, "你好")
+    cache.set(second, "世界")
+    assert cache.get(first) == "你好"
+    cache.set(third, "游戏")
+
+    assert second not in cache
+    assert cache.get(second) is None
+    assert make_cache_key("NoTranslator", "auto", "zh", "a_zh") != make_cache_key("NoTranslator", "auto", "zh_zh", "a")
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['entries']) == (1, 1, 1, 2)
+
+    expiring = MemoryTranslationCache(ttl=0.01)
+    expiring.set(first, "你好")
+    time.sleep(0.02)
+    assert expiring.get(first) is None
+
+
+def test_translator_manager_batch():
+    log.info("\n=== Testing Translator Manager Batch ===")
+    from typing import List, Optional
+    from screen_translator.translator.no_translator import NoTranslator
+    from screen_translator.translator.translator import TranslatorBase, create_default_translator
+
+    class RecordingTranslator(TranslatorBase):
+
+        def __init__(self):
+            self.batches = []
+
+        def translate(self, text: str, target_lang: str = 'zh', source_lang: str = 'auto') -> Optional[str]:
+            return None
+
+        def translate_batch(self, texts: List[str], target_lang: str = 'zh',
+                            source_lang: str = 'auto') -> List[Optional[str]]:
+            self.batches.append(list(texts))
+            return [None if text == "Broken" else text.upper() for text in texts]
+
+    recording = RecordingTranslator()
+    translator = create_default_translator()
+    translator.add_translator(recording)
+    translator.add_translator(NoTranslator())
+
+    results = translator.translate_batch(["Hello", "World", "Hello", "", "Broken"])
+    assert results == ["HELLO", "WORLD", "HELLO", None, "[translate]Broken"]
+    assert recording.batches == [["Hello", "World", "Broken"]]
+
+    translator.current_translator_index = 0
+    assert translator.translate_batch(["World", "Hello"]) == ["WORLD", "HELLO"]
+    assert len(recording.batches) == 1
+
+    class PrefixTranslator(TranslatorBase):
+
+        def __init__(self, prefix: Optional[str]):
+            self.prefix = prefix
+            self.calls = 0
+
+        def translate(self, text: str, target_lang: str = 'zh', source_lang: str = 'auto') -> Optional[str]:
+            self.calls += 1
+            if self.prefix is None:
+                raise RuntimeError("backend down")
+            return f"{self.prefix}:{text}"
+
+        def translate_batch(self, texts: List[str], target_lang: str = 'zh',
+                            source_lang: str = 'auto') -> List[Optional[str]]:
+            return [self.translate(text, target_lang, source_lang) for text in texts]
+
+    # 第一个翻译器整批失败后，每条都应回退到第二个，而不是跳过它或重试失败的翻译器
+    failing, second, third = PrefixTranslator(None), PrefixTranslator("B"), PrefixTranslator("C")
+    translator = create_default_translator()
+    translator.set_cache_enabled(False)
+    for backend in (failing, second, third):
+        translator.add_translator(backend)
+
+    assert translator.translate_batch(["one", "two", "three"]) == ["B:one", "B:two", "B:three"]
+    assert failing.calls == 1 and third.calls == 0
+
+
+def test_google_translator_pooled_batch():
+    log.info("\n=== Testing Pooled HTTP Translator ===")
+    import threading
+    import httpx
+    from screen_translator.translator.google_translator import GoogleTranslator
+
+    lock = threading.Lock()
+    in_flight = {'current': 0, 'peak': 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        with lock:
+            in_flight['current'] += 1
+            in_flight['peak'] = max(in_flight['peak'], in_flight['current'])
+        time.sleep(0.3)
+        with lock:
+            in_flight['current'] -= 1
+        text = request.url.params['q']
+        return httpx.Response(200, json=[[[f"<{text}>", text]]])
+
+    translator = GoogleTranslator(max_concurrency=4, transport=httpx.MockTransport(handler))
+    texts = [f"line {i}" for i in range(8)]
+
+    assert translator.translate_batch(texts) == [f"<{text}>" for text in texts]
+    assert in_flight['peak'] > 1
+    translator.close()
+
+
+def test_baidu_translator_packing():
+    log.info("\n=== Testing Baidu Request Packing ===")
+    import httpx
+    from urllib.parse import parse_qs
+    from screen_translator.translator.baidu_translator import BaiduTranslator
+    from screen_translator.translator.rate_limiter import AdaptiveRateLimiter
+
+    queries = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = parse_qs(request.content.decode('utf-8'))['q'][0]
+        queries.append(query)
+        lines = query.split('\n')
+        return httpx.Response(200, json={'trans_result': [{'src': x, 'dst': x.upper()} for x in lines]})
+
+    translator = BaiduTranslator("app", "secret", transport=httpx.MockTransport(handler),
+                                 rate_limiter=AdaptiveRateLimiter(rate=100.0, burst=10))
+    texts = ["start game", "line one\nline two", "", "options"]
+
+    assert translator.translate_batch(texts) == ["START GAME", "LINE ONE\nLINE TWO", None, "OPTIONS"]
+    assert queries == ["start game\nline one\nline two\noptions"]
+
+    translator.max_query_bytes = 20
+    queries.clear()
+    assert translator.translate_batch(texts) == ["START GAME", "LINE ONE\nLINE TWO", None, "OPTIONS"]
+    assert sorted(queries) == ["line two\noptions", "start game\nline one"]
+    translator.close()
+
+    # 脚本路由可能给出的每种源语言都要映射成百度接受的代码
+    from screen_translator.script_detect import SCRIPT_LANGUAGES
+    for languages in SCRIPT_LANGUAGES.values():
+        for lang in languages:
+            assert translator._language_code(lang) is not None, lang
+    assert [translator._language_code(lang) for lang in ("zh-TW", "da", "fi", "sv", "ro", "sl", "et")] == [
+        "cht", "dan", "fin", "swe", "rom", "slo", "est",
+    ]
+    assert translator._language_code("xx") is None
+
+
+def test_adaptive_rate_limiter():
+    log.info("\n=== Testing Adaptive Rate Limiter ===")
+    import httpx
+    from screen_translator.translator.google_translator import GoogleTranslator
+    from screen_translator.translator.rate_limiter import AdaptiveRateLimiter, get_rate_limiter
+
+    limiter = AdaptiveRateLimiter(rate=20.0, burst=2, min_rate=1.0)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    assert 0.15 <= time.monotonic() - start < 1.0
+
+    limiter.on_rate_limited()
+    assert limiter.rate == 10.0
+    limiter.on_success()
+    assert 10.0 < limiter.rate < 20.0
+
+    assert get_rate_limiter("test-backend", rate=5.0) is get_rate_limiter("test-backend")
+
+    responses = iter([httpx.Response(429), httpx.Response(200, json=[[["你好", "Hello"]]])])
+    shared = AdaptiveRateLimiter(rate=100.0, burst=5)
+    translator = GoogleTranslator(transport=httpx.MockTransport(lambda request: next(responses)), rate_limiter=shared)
+    assert translator.translate("Hello") == "你好"
+    assert shared.rate_limited == 1
+    translator.close()
+
+
+def test_local_translator_length_buckets():
+    log.info("\n=== Testing Local Translator Buckets ===")
+    from screen_translator.translator.local_translator import make_length_buckets
+
+    lengths = [40, 3, 5, 4, 38, 6]
+    buckets = make_length_buckets(lengths, max_batch_size=3, max_batch_tokens=80)
+
+    assert buckets == [[1, 3, 2], [5, 4], [0]]
+    assert sorted(idx for bucket in buckets for idx in bucket) == list(range(len(lengths)))
+
+
+def test_local_translator_rejects_unknown_engine():
+    log.info("\n=== Testing Local Translator Engines ===")
+    import pytest
+    from screen_translator.translator.local_translator import LocalTranslator
+
+    with pytest.raises(ValueError):
+        LocalTranslator(engine="tensorrt")
+    with pytest.raises(ValueError, match="model_dir"):
+        LocalTranslator(engine="onnx", load=False)
+
+
+def test_translator_registry_imports_lazily():
+    log.info("\n=== Testing Translator Registry ===")
+    import subprocess
+
+    code = (
+        "import sys\n"
+        "from screen_translator.config import AppConfig\n"
+        "from screen_translator.translator.registry import create_translator\n"
+        "translator = create_translator(AppConfig(translator={'type': 'no'}))\n"
+        "assert translator.__class__.__name__ == 'NoTranslator'\n"
+        "assert 'transformers' not in sys.modules\n"
+        "assert 'screen_translator.translator.local_translator' not in sys.modules\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_translator_manager_warm_up():
+    log.info("\n=== Testing Translator Warm-up ===")
+    from typing import List, Optional
+    from screen_translator.ocr_engine import OCREngine
+    from screen_translator.translator.translator import TranslatorBase, create_default_translator
+
+    class WarmTranslator(TranslatorBase):
+
+        def __init__(self, fail: bool = False):
+            self.fail = fail
+            self.warmed = False
+
+        def warm_up(self):
+            if self.fail:
+                raise RuntimeError("model missing")
+            self.warmed = True
+
+        def translate(self, text: str, target_lang: str = 'zh', source_lang: str = 'auto') -> Optional[str]:
+            return text
+
+        def translate_batch(self, texts: List[str], target_lang: str = 'zh',
+                            source_lang: str = 'auto') -> List[Optional[str]]:
+            return list(texts)
+
+    broken, working = WarmTranslator(fail=True), WarmTranslator()
+    translator = create_default_translator()
+    translator.add_translator(broken)
+    translator.add_translator(working)
+    translator.warm_up()
+    assert working.warmed
+
+    engine = OCREngine(load=False)
+    assert engine.ocr is None
+    engine.set_min_text_size(12)
+    assert engine.min_text_size == 12
+
+
+class FakeOCR:
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, image):
+        import cv2
+        import numpy as np
+
+        self.calls.append(image.shape[:2])
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        count, _, stats, _ = cv2.connectedComponentsWithStats((gray < 128).astype(np.uint8))
+        polys, texts = [], []
+        for label in range(1, count):
+            x, y, w, h = stats[label][:4]
+            polys.append(np.array([[x, y], [x + w, y], [x + w, y + h], [x, y + h]]))
+            texts.append(f"text {x} {y}")
+        return [{'rec_texts': texts, 'rec_polys': polys, 'rec_scores': [0.9] * len(texts)}]
+
+
+def test_ocr_engine_loads_on_demand():
+    log.info("\n=== Testing OCR On-Demand Load ===")
+    import numpy as np
+    from screen_translator.ocr_engine import OCREngine
+
+    engine = OCREngine(load=False)
+    loads = []
+
+    def fake_load():
+        loads.append(1)
+        engine.ocr = FakeOCR()
+
+    engine.load = fake_load
+    image = np.full((200, 300, 3), 255, dtype=np.uint8)
+    image[50:80, 50:250] = 0
+    assert [box.get_rect() for box in engine.recognize_text(image)] == [(50, 50, 200, 30)]
+    engine.recognize_text(image)
+    assert loads == [1]
+
+    # 加载失败后不在每帧重试，而是按指数退避
+    import screen_translator.ocr_engine as ocr_engine_module
+    attempts = []
+
+    def failing_import(name):
+        attempts.append(name)
+        raise ImportError("paddleocr missing")
+
+    failing = OCREngine(load=False)
+    original_import = ocr_engine_module.timed_import
+    ocr_engine_module.timed_import = failing_import
+    try:
+        for _ in range(5):
+            assert not len(failing.recognize_text(image))
+        assert len(attempts) == 1
+        failing.next_load_time = 0.0
+        failing.recognize_text(image)
+        assert len(attempts) == 2 and failing.load_failures == 2
+        assert failing.next_load_time - time.monotonic() > failing.load_retry_interval
+    finally:
+        ocr_engine_module.timed_import = original_import
+
+
+def test_ocr_preprocess_maps_back_to_screen():
+    log.info("\n=== Testing OCR Preprocessing ===")
+    import numpy as np
+    from screen_translator.ocr_engine import OCREngine
+
+    engine = OCREngine(load=False)
+    engine.ocr = FakeOCR()
+    engine.set_preprocess(scale=0.5, grayscale=True)
+    engine.set_crop_region([100, 100, 800, 600])
+
+    image = np.full((800, 1000, 3), 255, dtype=np.uint8)
+    image[300:340, 400:600] = 0
+    image[20:60, 20:200] = 0
+
+    boxes = engine.recognize_text(image)
+    assert engine.ocr.calls == [(300, 400)]
+    assert len(boxes) == 1
+    x, y, w, h = boxes[0].get_rect()
+    assert abs(x - 400) <= 2 and abs(y - 300) <= 2 and abs(w - 200) <= 2 and abs(h - 40) <= 2
+    assert set(engine.last_timings) == {'preprocess', 'ocr'}
+
+
+def test_incremental_ocr_merges_unchanged_boxes():
+    log.info("\n=== Testing Incremental OCR ===")
+    import numpy as np
+    from screen_translator.ocr_engine import OCREngine
+
+    engine = OCREngine(load=False)
+    engine.ocr = FakeOCR()
+    engine.set_incremental(True, tile_size=64, margin=16)
+
+    image = np.full((720, 1280, 3), 255, dtype=np.uint8)
+    image[100:130, 100:300] = 0
+    first = engine.recognize_text(image)
+    assert [box.get_rect() for box in first] == [(100, 100, 200, 30)]
+
+    image[500:530, 900:1100] = 0
+    second = engine.recognize_text(image)
+    assert sorted(box.get_rect() for box in second) == [(100, 100, 200, 30), (900, 500, 200, 30)]
+    assert engine.ocr.calls[0] == (720, 1280)
+    assert engine.ocr.calls[1][0] * engine.ocr.calls[1][1] < 720 * 1280 // 4
+
+    # 变化的图块只覆盖已有长文本的末尾，整行应重新识别而不是被截断或丢失
+    image[300:330, 100:600] = 0
+    engine.recognize_text(image)
+    image[300:330, 590:600] = 255
+    third = engine.recognize_text(image)
+    assert sorted(box.get_rect() for box in third) == [
+        (100, 100, 200, 30), (100, 300, 490, 30), (900, 500, 200, 30),
+    ]
+    assert engine.ocr.calls[-1][1] >= 490 and engine.ocr.calls[-1][0] < 720 // 4
+
+
+def test_split_ocr_recognition_cache():
+    log.info("\n=== Testing Split OCR Recognition Cache ===")
+    import numpy as np
+    from screen_translator.split_ocr import SplitOCR
+
+    class FakeDetector:
+
+        def predict(self, image):
+            return [{'dt_polys': [
+                np.array([[10, 10], [110, 10], [110, 40], [10, 40]]),
+                np.array([[10, 60], [110, 60], [110, 90], [10, 90]]),
+            ]}]
+
+    class FakeRecognizer:
+
+        def __init__(self):
+            self.batches = []
+
+        def predict(self, crops, batch_size=1):
+            self.batches.append(len(crops))
+            return [{'rec_text': f"line {int(crop.mean())}", 'rec_score': 0.9} for crop in crops]
+
+    recognizer = FakeRecognizer()
+    ocr = SplitOCR(FakeDetector(), recognizer)
+
+    image = np.full((100, 200, 3), 255, dtype=np.uint8)
+    image[60:90, 10:110] = 0
+    first = ocr.predict(image)[0]
+    assert first['rec_texts'] == ["line 255", "line 0"]
+
+    image[10:40, 10:110] = 0
+    second = ocr.predict(image)[0]
+    assert second['rec_texts'] == ["line 0", "line 0"]
+    assert recognizer.batches == [2]
+    stats = ocr.cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 2)
+
+
+def test_text_box_array_vectorized_geometry():
+    log.info("\n=== Testing TextBoxArray ===")
+    import numpy as np
+    from screen_translator.screen_translator import filter_text_boxes
+    from screen_translator.text_boxes import TextBox, TextBoxArray
+
+    polys = [
+        [[10, 10], [110, 12], [108, 42], [9, 40]],
+        [[200, 50], [205, 50], [205, 55], [200, 55]],
+        np.array([[300, 300], [400, 300], [400, 330], [350, 340], [300, 330]]),
+    ]
+    boxes = TextBoxArray.from_polys(["Start Game", "x", "12345"], polys, [0.9, 0.95, 0.3])
+
+    reference = TextBox("Start Game", polys[0], 0.9)
+    view = boxes[0]
+    assert view.get_rect() == reference.get_rect()
+    assert (view.center_x, view.center_y) == (reference.center_x, reference.center_y)
+    assert boxes.rects[2].tolist() == [300, 300, 100, 40]
+
+    assert boxes.filter(boxes.confidence_mask(0.5)).texts == ["Start Game", "x"]
+    assert boxes.filter(boxes.size_mask(10)).texts == ["Start Game", "12345"]
+    assert boxes.intersects_mask((100, 0, 120, 60)).tolist() == [True, True, False]
+    assert boxes.center_in_mask((0, 0, 100, 100)).tolist() == [True, False, False]
+
+    merged = TextBoxArray.concat([boxes, TextBoxArray.empty(), boxes.filter(np.array([True, False, False]))])
+    assert len(merged) == 4 and merged.texts[-1] == "Start Game"
+
+    filtered = filter_text_boxes(boxes, 2, 'zh')
+    assert [box.text for box in filtered] == ["Start Game"]
+
+
+def test_script_classifier_routes_source_languages():
+    log.info("\n=== Testing Script Classifier ===")
+    import numpy as np
+    from screen_translator.screen_translator import ScreenTranslator
+    from screen_translator.script_detect import ScriptClassifier, dominant_script, normalize_language
+    from screen_translator.translator.no_translator import NoTranslator
+
+    assert dominant_script("Start Game 2") == 'latin'
+    assert dominant_script("ゲーム開始") == 'kana'
+    assert dominant_script("Привет, мир") == 'cyrillic'
+    assert dominant_script("123 !!") is None
+    assert normalize_language("ch") == 'zh'
+
+    classifier = ScriptClassifier(['en', 'japan'])
+    assert classifier.classify_all(["Options", "設定", "게임 시작", "中文文本 ok"]) == ['en', 'ja', 'ko', 'ja']
+    assert ScriptClassifier(['en']).classify("中文文本") == 'zh'
+
+    # 同一文字对应多个配置语言时交给翻译器自动检测
+    assert ScriptClassifier(['en', 'fr']).classify("Bonjour le monde") == 'auto'
+    assert ScriptClassifier(['zh', 'ja']).classify("装備") == 'auto'
+    assert ScriptClassifier(['zh', 'ja']).classify("ゲーム開始") == 'ja'
+    # 未收录的配置语言不会被改标成同文字的其他语言
+    assert ScriptClassifier(['sv']).classify("Starta spelet") == 'sv'
+    assert ScriptClassifier(['chinese_cht']).classify("開始遊戲") == 'zh-tw'
+    assert ScriptClassifier(['xx']).classify("Start") == 'xx'
+    assert ScriptClassifier(['en', 'xx']).classify("Start") == 'auto'
+    assert 'auto' in ScriptClassifier(['en', 'fr']).accepted_languages
+
+    class ListOCR:
+
+        def predict(self, image):
+            texts = ["Start Game", "ゲーム開始", "开始游戏", "Начать игру"]
+            polys = [np.array([[0, i * 40], [200, i * 40], [200, i * 40 + 30], [0, i * 40 + 30]]) for i in range(4)]
+            return [{'rec_texts': texts, 'rec_polys': polys, 'rec_scores': [0.9] * 4}]
+
+    calls = []
+
+    class RecordingTranslator(NoTranslator):
+
+        def translate_batch(self, texts, target_lang='zh', source_lang='auto'):
+            calls.append((source_lang, target_lang, list(texts)))
+            return super().translate_batch(texts, target_lang, source_lang)
+
+    screen_translator = ScreenTranslator(['en', 'ja', 'ch', 'ru'], 'ch')
+    screen_translator.ocr_engine.ocr = ListOCR()
+    screen_translator.add_translator(RecordingTranslator())
+    manager = screen_translator.translator
+
+    image = np.zeros((200, 200, 3), dtype=np.uint8)
+    boxes = screen_translator.ocr_engine.recognize_text_with_filter(image, screen_translator.source_languages)
+    assert boxes.languages == ['en', 'ja', 'auto', 'ru']
+
+    filtered = screen_translator._filter_texts(boxes)
+    assert filtered.texts == ["Start Game", "ゲーム開始", "开始游戏", "Начать игру"]
+
+    translations = screen_translator._translate_texts(filtered)
+    assert [item[1] for item in translations] == ["[translate]" + text for text in filtered.texts]
+    assert sorted(calls) == [('auto', 'zh', ["开始游戏"]), ('en', 'zh', ["Start Game"]), ('ja', 'zh', ["ゲーム開始"]),
+                             ('ru', 'zh', ["Начать игру"])]
+    assert manager.translate("Start Game", 'zh', 'en') == "[translate]Start Game"
+    assert len(calls) == 4
+
+
+def test_text_tracker_reuses_translations():
+    log.info("\n=== Testing Text Tracker ===")
+    import numpy as np
+    from screen_translator.screen_translator import ScreenTranslator
+    from screen_translator.text_boxes import TextBoxArray
+    from screen_translator.text_tracker import GridIndex
+    from screen_translator.translator.no_translator import NoTranslator
+
+    def frame(lines):
+        texts = [text for text, _, _ in lines]
+        polys = [[[x, y], [x + 200, y], [x + 200, y + 30], [x, y + 30]] for _, x, y in lines]
+        return TextBoxArray.from_polys(texts, polys, [0.9] * len(lines))
+
+    index = GridIndex(100)
+    index.insert(0, (0, 0, 50, 50))
+    index.insert(1, (450, 450, 50, 50))
+    assert index.query((40, 40, 20, 20)) == {0}
+
+    calls = []
+
+    class RecordingTranslator(NoTranslator):
+
+        def translate_batch(self, texts, target_lang='zh', source_lang='auto'):
+            calls.append(list(texts))
+            return super().translate_batch(texts, target_lang, source_lang)
+
+    screen_translator = ScreenTranslator(["en"], "ch")
+    screen_translator.translator.set_cache_enabled(False)
+    screen_translator.add_translator(RecordingTranslator())
+
+    first = frame([("Start Game", 100, 100), ("Options", 100, 200)])
+    first_ids = screen_translator.tracker.update(first)
+    screen_translator._translate_texts(first, first_ids)
+    assert calls == [["Start Game", "Options"]]
+
+    second = frame([("Options", 101, 201), ("Start Game", 100, 99), ("Load Game", 600, 400)])
+    second_ids = screen_translator.tracker.update(second)
+    assert second_ids.tolist()[:2] == [first_ids[1], first_ids[0]]
+    translations = screen_translator._translate_texts(second, second_ids)
+    assert calls[-1] == ["Load Game"]
+    assert [item[1] for item in translations] == ["[translate]Options", "[translate]Start Game", "[translate]Load Game"]
+    assert screen_translator.stats['reused_translations'] == 2
+
+    third = frame([("Start Gane!", 100, 100)])
+    third_ids = screen_translator.tracker.update(third)
+    assert third_ids[0] == first_ids[0]
+    screen_translator._translate_texts(third, third_ids)
+    assert calls[-1] == ["Start Gane!"]
+    assert screen_translator.tracker.get_stats()['changed'] == 1
+
+
+def test_overlay_reuses_labels():
+    log.info("\n=== Testing Overlay Label Pool ===")
+    from screen_translator.overlay_display import DisplayManager
+
+    display_manager = DisplayManager()
+    display_manager.initialize()
+    overlay = display_manager.overlay_window
+
+    overlay.update_translations([("Start", "开始", 100, 100, 80, 20), ("Options", "选项", 100, 200, 80, 20)])
+    first = list(overlay.translation_labels)
+    assert len(first) == 2
+
+    overlay.update_translations([("Options", "选项", 100, 200, 80, 20), ("Start!", "开始！", 102, 101, 80, 20)])
+    assert overlay.translation_labels[0] is first[1]
+    assert overlay.translation_labels[1] is first[0]
+    assert first[0].text() == "开始！"
+    assert not overlay.label_pool
+
+    overlay.update_translations([("Options", "选项", 100, 200, 80, 20)])
+    assert overlay.label_pool == [first[0]] and first[0].isHidden()
+
+    overlay.update_translations([("Quit", "退出", 500, 500, 80, 20), ("Options", "选项", 100, 200, 80, 20)])
+    assert overlay.translation_labels[1] is first[0] and not first[0].isHidden()
+
+    for label in overlay.translation_labels:
+        label.fade_deadline = 0
+        label.opacity = 0.1
+    overlay._fade_tick()
+    assert not overlay.translation_labels and len(overlay.label_pool) == 2
+    assert not overlay.fade_timer.isActive()
+
+    display_manager.quit()
+
+
+def test_overlay_persists_while_frame_unchanged(tmp_path):
+    log.info("\n=== Testing Overlay Keep-Alive ===")
+    import time
+    import numpy as np
+    from screen_translator.frame_replay import ReplayCapture, SessionRecorder
+    from screen_translator.screen_translator import ScreenTranslator
+    from screen_translator.translator.no_translator import NoTranslator
+
+    recorder = SessionRecorder(str(tmp_path / "session"))
+    image = np.full((240, 320, 3), 255, dtype=np.uint8)
+    image[20:40, 20:200] = 0
+    for idx in range(6):
+        recorder.record(image, timestamp=float(idx))
+    recorder.close()
+
+    translator = ScreenTranslator(["en"], "ch")
+    translator.ocr_engine.ocr = FakeOCR()
+    translator.add_translator(NoTranslator())
+    translator.ready_event.set()
+    translator.display_manager.set_display_options('labels', display_duration=200)
+    translator.display_manager.initialize()
+    translator.update_signal.connect(translator.display_manager.show_translations)
+    translator.keep_alive_signal.connect(translator.display_manager.keep_alive)
+    translator.set_frame_source(ReplayCapture(str(tmp_path / "session"), pace='fast'))
+    translator.screen_capture.start_capture()
+    overlay = translator.display_manager.overlay_window
+
+    assert translator.process_frame()
+    assert len(overlay.translation_labels) == 1
+
+    # 连续 5 帧画面未变化，总时长超过显示时间，翻译仍应保持显示
+    for _ in range(5):
+        time.sleep(0.1)
+        assert not translator.process_frame()
+        overlay._fade_tick()
+    assert translator.screen_capture.skipped_frames == 5
+    assert len(overlay.translation_labels) == 1 and not overlay.translation_labels[0].isHidden()
+
+    time.sleep(0.25)
+    for _ in range(12):
+        overlay._fade_tick()
+    assert not overlay.translation_labels
+
+    translator.display_manager.quit()
+
+
+def test_painter_overlay_repaints_changed_rects():
+    log.info("\n=== Testing Painter Overlay ===")
+    from screen_translator.overlay_display import DisplayManager
+
+    display_manager = DisplayManager()
+    display_manager.set_display_options('painter', display_duration=1000, font_size=16, background_opacity=200)
+    display_manager.initialize()
+    overlay = display_manager.overlay_window
+    assert overlay.render_mode == 'painter' and overlay.display_duration == 1000
+    assert overlay.background_color.alpha() == 200
+
+    lines = [(f"line {i}", f"第{i}行", 10, i * 30, 100, 20) for i in range(300)]
+    display_manager.show_translations(lines)
+    assert len(overlay.painted) == 300 and not overlay.translation_labels
+    overlay.grab()
+
+    changed = list(lines)
+    changed[5] = ("line 5", "第五行", 10, 150, 100, 20)
+    display_manager.show_translations(changed)
+    region = overlay.last_update_region.boundingRect()
+    assert region.y() == 150 + 20 + 5 and region.height() < 60
+
+    display_manager.show_translations(changed)
+    assert overlay.last_update_region.isEmpty()
+    assert overlay.static_text_cache["第五行"] is overlay.painted[("line 5", 10, 150, 100, 20)].static_text
+
+    for item in overlay.painted.values():
+        item.fade_deadline = 0
+    overlay._fade_tick()
+    assert not overlay.painted and not overlay.fade_timer.isActive()
+
+    display_manager.quit()
+
+
+def test_capture_backends_ring_buffer(tmp_path):
+    log.info("\n=== Testing Capture Backends ===")
+    import cv2
+    import numpy as np
+    from screen_translator.capture_backends import FrameRingBuffer, write_frame
+    from screen_translator.screen_capture import ContinuousCapture, ScreenCapture
+
+    bgra = np.zeros((4, 4, 4), dtype=np.uint8)
+    bgra[..., 0], bgra[..., 2], bgra[..., 3] = 10, 30, 255
+    ring = FrameRingBuffer(slots=2)
+    out = ring.acquire(4, 4)
+    write_frame(bgra, 'BGRA', out)
+    assert out[0, 0].tolist() == [10, 0, 30]
+    write_frame(bgra[..., [2, 1, 0, 3]].copy(), 'RGBA', out)
+    assert out[0, 0].tolist() == [10, 0, 30]
+
+    capture = ScreenCapture('synthetic', ring_slots=3, width=640, height=360, lines=["Start Game"])
+    frames = [capture.capture_screen() for _ in range(3)]
+    assert len({id(frame) for frame in frames}) == 3
+    assert frames[1].shape == (360, 640, 3) and (frames[1] < 128).any()
+    # 所有槽位都未归还时临时分配，不覆盖使用中的帧
+    extra = capture.capture_screen()
+    assert all(extra is not frame for frame in frames)
+    capture.release_frame(frames[1])
+    assert capture.capture_screen() is frames[1]
+    stats = capture.get_stats()
+    assert stats['backend'] == 'synthetic' and stats['captures'] == 5
+    assert stats['allocated_bytes_per_capture'] == 0
+    assert stats['ring']['fallback_allocations'] == 1 and stats['ring']['in_use'] == 3
+    assert stats['ring']['allocated_bytes'] == 4 * 640 * 360 * 3
+
+    capture.set_capture_region(10, 20, 100, 50)
+    assert capture.capture_screen().shape == (50, 100, 3)
+
+    image = np.full((120, 200, 3), 255, dtype=np.uint8)
+    image[10:20, 10:50] = (255, 0, 0)
+    cv2.imwrite(str(tmp_path / "frame_000.png"), image)
+    file_capture = ScreenCapture('file', path=str(tmp_path))
+    assert file_capture.get_screen_size() == (200, 120)
+    assert file_capture.capture_screen()[15, 15].tolist() == [255, 0, 0]
+
+    continuous = ContinuousCapture(capture_interval=0)
+    assert continuous.screen_capture is None
+    continuous.set_backend('synthetic', ring_slots=4, width=320, height=240)
+    continuous.start_capture()
+    assert continuous.get_latest_screenshot().shape == (240, 320, 3)
+    assert continuous.get_latest_screenshot() is None
+    assert continuous.get_stats()['ring']['slots'] == 4
+
+    # OCR 处理中的帧在后续截图和队列丢帧时都不能被覆盖
+    from screen_translator.screen_translator import ScreenTranslator
+    translator = ScreenTranslator(["en"], "ch", capture_interval=0)
+    translator.ocr_engine.ocr = FakeOCR()
+    translator.set_capture_backend('synthetic', ring_slots=2, width=320, height=240)
+    translator.set_change_detection(False)
+    translator.screen_capture.start_capture()
+    in_ocr = translator._capture_stage()
+    snapshot = in_ocr[1].copy()
+    for idx in range(5):
+        translator.screen_capture.screen_capture.backend.set_lines([f"Frame {idx}"])
+        frame = translator._capture_stage()
+        assert frame[1] is not in_ocr[1]
+        translator.ocr_queue.put(frame)
+    assert np.array_equal(in_ocr[1], snapshot)
+    translator._ocr_stage(in_ocr)
+    translator.ocr_queue.reset()
+    assert translator.screen_capture.get_stats()['ring']['in_use'] == 0
+
+
+def test_replay_session_drives_pipeline(tmp_path):
+    log.info("\n=== Testing Frame Replay ===")
+    import cv2
+    import numpy as np
+    from screen_translator.frame_replay import ReplayCapture, SessionRecorder
+    from screen_translator.screen_translator import ScreenTranslator
+    from screen_translator.translator.no_translator import NoTranslator
+
+    recorder = SessionRecorder(str(tmp_path / "session"))
+    image = np.full((240, 320, 3), 255, dtype=np.uint8)
+    for idx, t in enumerate([0.0, 0.5, 0.6, 100.0]):
+        image[20 + idx * 40:40 + idx * 40, 20:200] = 0
+        recorder.record(image, timestamp=t)
+    recorder.record(image, timestamp=101.0)
+    recorder.close()
+
+    realtime = ReplayCapture(str(tmp_path / "session"), pace='realtime', capture_interval=0)
+    realtime.start_capture()
+    frame = realtime.get_latest_screenshot()
+    assert realtime.position == 1 and frame[25, 25].tolist() == [0, 0, 0]
+    realtime.start_time -= 1
+    realtime.get_latest_screenshot()
+    assert realtime.position == 3 and realtime.get_latest_screenshot() is None
+
+    translator = ScreenTranslator(["en"], "ch")
+    translator.ocr_engine.ocr = FakeOCR()
+    translator.add_translator(NoTranslator())
+    translator.ready_event.set()
+    translator.set_frame_source(ReplayCapture(str(tmp_path / "session"), pace='fast'))
+
+    emitted = []
+    translator.update_signal.connect(emitted.append)
+    assert translator.run_replay() == 4
+    assert translator.screen_capture.finished
+    assert translator.stats['skipped_frames'] == 1
+    assert [len(item) for item in emitted] == [1, 2, 3, 4]
+    assert emitted[-1][-1][1] == "[translate]text 20 140"
+
+    # 视频帧数元数据可能不准，回放以读取失败为结尾
+    video_path = str(tmp_path / "replay.avi")
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+    for idx in range(4):
+        writer.write(np.full((48, 64, 3), idx * 60, dtype=np.uint8))
+    writer.release()
+
+    class MisreportedCapture:
+
+        def __init__(self, capture):
+            self.capture = capture
+
+        def get(self, prop):
+            return 100.0 if prop == cv2.CAP_PROP_FRAME_COUNT else self.capture.get(prop)
+
+        def __getattr__(self, name):
+            return getattr(self.capture, name)
+
+    replay = ReplayCapture(video_path, pace='fast', loop=True)
+    replay.source.capture = MisreportedCapture(replay.source.capture)
+    replay.start_capture()
+    frames = [replay.get_latest_screenshot() for _ in range(6)]
+    assert [frame is not None for frame in frames] == [True, True, True, True, False, True]
+    assert replay.source.frame_count == 4 and not replay.finished
+
+    replay = ReplayCapture(video_path, pace='realtime', capture_interval=0)
+    replay.start_capture()
+    replay.start_time -= 100
+    assert replay.get_latest_screenshot() is None and replay.source.frame_count == 4
+    assert replay.get_latest_screenshot() is None and replay.finished
+
+
+def test_pipeline_benchmark_reports_regressions():
+    log.info("\n=== Testing Pipeline Benchmark ===")
+    import copy
+    from benchmarks.pipeline import compare_with_baseline, create_ocr_engine, create_translators, run_scenario
+
+    engine, known = create_ocr_engine('known')
+    translators = create_translators(0.0, 2)
+    report = {'scenarios': [
+        run_scenario(640, 360, 20, 3, engine, known, translators, {}),
+        run_scenario(320, 180, 5, 2, engine, known, translators, {}),
+    ]}
+    scenario = report['scenarios'][0]
+    assert set(scenario['stages']) == {'ocr', 'filter', 'translate:no', 'translate:http'}
+    assert set(scenario['fps']) == {'no', 'http'} and all(fps > 0 for fps in scenario['fps'].values())
+    assert scenario['stages']['ocr']['p99_ms'] >= scenario['stages']['ocr']['p50_ms']
+
+    baseline = copy.deepcopy(report)
+    baseline['scenarios'][0]['stages']['ocr']['p95_ms'] = scenario['stages']['ocr']['p95_ms'] / 10 - 5
+    baseline['scenarios'][0]['fps']['http'] = scenario['fps']['http'] * 10
+    regressions = compare_with_baseline(report, baseline, tolerance=0.2)
+    assert {item['metric'] for item in regressions} == {'ocr.p95_ms', 'fps:http'}
+    assert not compare_with_baseline(report, report, tolerance=0.2)
+
+
+def test_pipeline_metrics_export(tmp_path):
+    log.info("\n=== Testing Pipeline Metrics ===")
+    import json
+    import urllib.request
+    import numpy as np
+    from screen_translator.frame_replay import ReplayCapture, SessionRecorder
+    from screen_translator.metrics import MetricsFileWriter, MetricsRegistry, MetricsServer, metrics
+    from screen_translator.screen_translator import ScreenTranslator
+    from screen_translator.translator.no_translator import NoTranslator
+
+    registry = MetricsRegistry(prefix='test')
+    for value in [0.002] * 90 + [0.2] * 10:
+        registry.observe('stage_seconds', value, {'stage': 'ocr'})
+    registry.inc('errors_total', labels={'stage': 'ocr'})
+    registry.register_callback('dropped_frames_total', lambda: 3, {'queue': 'ocr'})
+    snapshot = registry.to_json()['histograms']['stage_seconds{stage="ocr"}']
+    assert snapshot['count'] == 100 and 0.001 < snapshot['p50'] <= 0.0025 and 0.1 < snapshot['p95'] <= 0.25
+    text = registry.to_prometheus()
+    assert 'test_stage_seconds_bucket{stage="ocr",le="0.0025"} 90' in text
+    assert 'test_stage_seconds_bucket{stage="ocr",le="+Inf"} 100' in text
+    assert 'test_errors_total{stage="ocr"} 1' in text and 'test_dropped_frames_total{queue="ocr"} 3' in text
+
+    server = MetricsServer(registry, 0)
+    server.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics.json") as response:
+            assert json.load(response)['counters']['dropped_frames_total{queue="ocr"}'] == 3
+    finally:
+        server.stop()
+
+    writer = MetricsFileWriter(registry, str(tmp_path / "metrics.prom"))
+    writer.write()
+    assert (tmp_path / "metrics.prom").read_text(encoding="utf-8") == text
+
+    recorder = SessionRecorder(str(tmp_path / "session"))
+    image = np.full((240, 320, 3), 255, dtype=np.uint8)
+    for idx in range(3):
+        image[20 + idx * 40:40 + idx * 40, 20:200] = 0
+        recorder.record(image, timestamp=float(idx))
+    recorder.close()
+
+    metrics.reset()
+    translator = ScreenTranslator(["en"], "ch")
+    translator.ocr_engine.ocr = FakeOCR()
+    translator.add_translator(NoTranslator())
+    translator.ready_event.set()
+    translator.set_frame_source(ReplayCapture(str(tmp_path / "session"), pace='fast'))
+    assert translator.run_replay() == 3
+
+    exported = metrics.to_json()
+    for stage in ('capture', 'ocr', 'filter', 'translate'):
+        assert exported['histograms'][f'stage_seconds{{stage="{stage}"}}']['count'] == 3
+    assert exported['histograms']['translation_seconds{backend="NoTranslator"}']['count'] == 3
+    assert exported['counters']['frames_total'] == 3
+    assert exported['counters']['cache_misses_total{cache="translation"}'] == 3
+    assert 'frame_seconds' in translator.get_stats()['latency']
+
+
+def test_sampling_profiler_tags_stages(tmp_path):
+    log.info("\n=== Testing Sampling Profiler ===")
+    import threading
+    from screen_translator.profiler import SamplingProfiler, parse_hotkey
+    from screen_translator.screen_translator import ScreenTranslator
+
+    stop = threading.Event()
+
+    def busy_ocr_loop():
+        while not stop.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=busy_ocr_loop, daemon=True)
+    worker.start()
+    profiler = SamplingProfiler(str(tmp_path), 0.001, lambda: {worker.ident: 'ocr'})
+    assert profiler.start(0.2)
+    assert not profiler.start(0.2)
+
+    # 采样期间其他线程照常运行
+    iterations = 0
+    while profiler.is_running:
+        iterations += 1
+    stop.set()
+
+    assert iterations > 0 and profiler.sample_count > 10
+    with open(profiler.last_output, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines and all(line.startswith('ocr;') for line in lines)
+    assert any('busy_ocr_loop' in line for line in lines)
+    assert sum(int(line.rsplit(' ', 1)[1]) for line in lines) == profiler.stage_totals()['ocr']
+
+    translator = ScreenTranslator(["en"], "ch")
+    translator._start_stages()
+    try:
+        assert set(translator.get_thread_stages().values()) == {'display', 'ocr', 'translate'}
+    finally:
+        translator._stop_stages()
+
+    assert parse_hotkey("ctrl+alt+p") == (0x3, ord('P'))
+    assert parse_hotkey("shift+F5") == (0x4, 0x74)
+
+
+def test_profile_signal_wakes_event_loop():
+    log.info("\n=== Testing Profile Signal Trigger ===")
+    import os
+    import signal
+    import time
+    from PyQt6.QtCore import QEventLoop, QTimer
+    from PyQt6.QtWidgets import QApplication
+    from screen_translator.profiler import SignalTrigger
+
+    if not hasattr(signal, 'SIGUSR1'):
+        return
+
+    app = QApplication.instance() or QApplication([])
+    calls = []
+    trigger = SignalTrigger(signal.SIGUSR1, lambda: calls.append(time.monotonic()))
+    previous = signal.getsignal(signal.SIGUSR1)
+    trigger.start()
+    try:
+        # 事件循环中没有任何 Python 定时器，信号仍应及时被处理
+        loop = QEventLoop()
+        QTimer.singleShot(0, lambda: os.kill(os.getpid(), signal.SIGUSR1))
+        deadline = time.monotonic() + 2
+        while not calls and time.monotonic() < deadline:
+            loop.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents, 100)
+        assert len(calls) == 1
+    finally:
+        trigger.stop()
+        signal.signal(signal.SIGUSR1, previous)